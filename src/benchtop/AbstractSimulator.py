@@ -24,6 +24,15 @@ class AbstractSimulator(ABC):
 
         """
         self.tool = type("Tool", (), {})()  # lightweight empty object
+        self._load_args = (args, kwargs)
+        self.load(*args, **kwargs)
+
+    def reset(self) -> None:
+        """
+        Returns the tool to its freshly loaded state between replicate cells.
+        Reloads by default; children override with a cheaper tool-specific reset.
+        """
+        args, kwargs = self._load_args
         self.load(*args, **kwargs)
 
     @abstractmethod
@@ -53,4 +62,44 @@ class AbstractSimulator(ABC):
         step : float
             Simulation step size.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def set_values(self, names, values) -> None:
+        """
+        Assigns several model components (species or parameters) at once.
+        Children override this with a single bulk tool call; the default
+        applies `modify` to each component in turn.
+
+        Parameters
+        ----------
+        names : list of str
+            Component identifiers.
+        values : list of float
+            New values, one per name.
+        """
+        for name, value in zip(names, values):
+            self.modify(name, value)
+
+    def select(self, columns) -> None:
+        """
+        Optional method restricting the recorded output to the given columns
+        (species identifiers). The default records everything; the Worker drops
+        unselected columns after simulating.
+        """
+        pass
+
+    def simulate_at(self, timepoints):
+        """
+        Optional method simulating with output only at the given timepoints.
+        Integrators step internally, so output size scales with the number of
+        requested timepoints rather than the horizon divided by the step size.
+
+        Parameters
+        ----------
+        timepoints : np.ndarray
+            Sorted output times, starting at the simulation start time.
+
+        Returns one row per timepoint. Simulators that do not override this
+        are run on the dense `simulate` grid instead.
+        """
+        raise NotImplementedError
@@ -13,18 +13,27 @@ author: Jonah R. Huggins
 import os
 import sys
 import logging
-import pickle as pkl
 from datetime import date
-from typing import Union
+from typing import Mapping, Optional, Sequence, Union
 import multiprocessing as mp
 
+import pandas as pd
+
 sys.path.append(os.path.dirname(__file__))
 from Worker import worker_method
 from Record import Record
 from Organizer import Organizer
 import ObservableCalculator as obs
 from file_loader import FileLoader
+from ProblemSnapshot import DEFAULT_SNAPSHOT_DIR
+from ResultsStore import ResultsStore
+from PopulationStats import PopulationAggregator
+from FormulaCompiler import formula_symbols
+from TaskPlan import Task, TaskPlan
 from AbstractSimulator import AbstractSimulator
+from SharedTables import forks_share_memory
+import SimulatorRegistry
+import ParameterDesign
 
 
 logging.basicConfig(
@@ -41,7 +50,10 @@ class Experiment:
                  cores: int = os.cpu_count(),
                  cache_dir: str = './.cache',
                  load_index: bool = False,
-                 verbose = False
+                 verbose = False,
+                 snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR,
+                 compact_ids: bool = False,
+                 chunksize: Optional[int] = None
                  ) -> None:
         """
         Class object describing a single experiment. 
@@ -54,6 +66,18 @@ class Experiment:
         cores : int, optional
             number of cores to allocate to benchmarking for parallel performance
 
+        snapshot_dir : str, optional
+            directory of parsed PEtab problem snapshots, reused by later
+            experiments on unchanged files; None (the default, unless
+            BENCHTOP_SNAPSHOT_DIR is set) always parses the TSVs
+
+        compact_ids : bool, optional
+            read PEtab ID columns as categoricals and keep the tables read-only,
+            for measurement tables with millions of rows
+
+        chunksize : int, optional
+            parse PEtab tables this many rows at a time
+
         """
 
         self.org = Organizer(cores)
@@ -69,7 +93,12 @@ class Experiment:
 
         # Load the details of the experiment
         # !DotDict Notation! Loader contains configuration file and PEtab files.
-        self.loader = FileLoader(petab_yaml)
+        self.loader = FileLoader(
+            petab_yaml,
+            snapshot_dir=snapshot_dir,
+            compact_ids=compact_ids,
+            chunksize=chunksize
+        )
         self.loader._petab_files()
 
         self.details = self.loader.config ### slate to remove self-storage
@@ -83,6 +112,15 @@ class Experiment:
         # add one or more SBML files
         self.sbml_list = self.__sbml_getter()
 
+        # Population statistics across cells, filled by observable_calculation
+        self.observable_summary = None
+
+        # Streaming population statistics, filled during run(population_stats=True)
+        self.population = None
+
+        # Parameter sets of the sweep being run, one row per set; None simulates the model as loaded
+        self.parameter_sets = None
+
         # Loads jobs directory with results_dict class member
         self.record = Record(
             problem=self.loader.problems[0],
@@ -91,60 +129,274 @@ class Experiment:
             )
 
     def run(self,
-            simulator: AbstractSimulator,
+            simulator: Union[AbstractSimulator, str],
             *args, 
             start: float = 0.0,
             step: float = 30.0,
+            observables_only: bool = False,
+            population_stats: bool = False,
+            keep_cells: bool = True,
+            chunk_size: int = 1,
+            sparse_output: bool = False,
+            visualization_times: Sequence[float] = (),
+            project_columns: bool = False,
+            executor: str = "process",
             ) -> None:
         """
         Parameters
         ----------
-        simulator : AbstractSimulator
+        simulator : AbstractSimulator or str
             child class of abstract AbstractSimulator Class, defined as a
-            wrapper for a particular simulator
+            wrapper for a particular simulator, or its name in the simulator
+            registry (e.g. 'tellurium'), imported only once simulation starts
 
         args : tuple, optional
             Extra arguments to pass to function.
+
+        observables_only : bool, optional
+            Workers evaluate observables right after simulating and cache only
+            the observable arrays (plus final states needed for preequilibration)
+
+        population_stats : bool, optional
+            Streams each finished cell's observables into per-condition population
+            statistics (mean, variance, quantiles). Implies `observables_only`.
+
+        keep_cells : bool, optional
+            With `population_stats`, False keeps only the aggregates, so memory and
+            cache size stay constant in the number of cells
+
+        chunk_size : int, optional
+            Number of replicate cells of a condition simulated by a single task.
+            A chunk reuses one loaded model and is cached as a single shard.
+
+        sparse_output : bool, optional
+            Simulate only at each condition's measurement times and final time
+            (through `simulator.simulate_at`) instead of the dense `step` grid
+
+        visualization_times : sequence of float, optional
+            Extra output times kept in sparse runs, e.g. for plotting trajectories
+
+        project_columns : bool, optional
+            Record only the species referenced by observable formulas. Conditions
+            other conditions preequilibrate from still keep their full state.
+
+        executor : str, optional
+            'process' runs each round's tasks in a process pool, 'serial' runs
+            them one after another in this process (debugging and profiling)
         """
 
         logger.debug(f"Starting in-silico experiment across {self.size} cores.")
 
+        if population_stats:
+            observables_only = True
+            self.population = PopulationAggregator()
+
+        elif not keep_cells:
+            raise ValueError("keep_cells=False requires population_stats=True")
+
+        # A sweep's record holds a block of cells per parameter set, plain runs start afresh
+        if self.parameter_sets is None and os.path.exists(self.record.cache.parameter_sets_path):
+            self.record = Record(
+                problem=self.loader.problems[0],
+                cache_dir=self.record.cache.cache_dir,
+                cell_count=self.cell_count
+            )
+
+        # resume() continues with the same storage mode and output grid
+        self.record.cache.save_run_options({
+            "observables_only": observables_only,
+            "population_stats": population_stats,
+            "keep_cells": keep_cells,
+            "sparse_output": sparse_output,
+            "visualization_times": [float(t) for t in visualization_times],
+            "project_columns": project_columns,
+        })
+
+        calculator = obs.ObservableCalculator(self) if observables_only else None
+
+        output_times = tuple(visualization_times) if sparse_output else None
+
+        selection = self.__selection(project_columns)
+
         # Add sbmls from config to args tuple
         args = self.__add_sbml_to_args(args=args)
 
         num_rounds, job_index = self.org.task_organization(
             self.loader.problems[0].measurement_files[0],
-            self.cell_count
+            self.cell_count,
+            chunk_size=chunk_size
+        )
+
+        # Compile every task once, Workers receive them ready to simulate
+        plan = TaskPlan(
+            self.record,
+            (task for rank_jobs in job_index.values() for task in rank_jobs),
+            start=start,
+            output_times=output_times,
+            parameter_sets=self.parameter_sets,
+            replicates=self.__replicates()
         )
 
-        for round_i in range(num_rounds):
+        # Forked workers inherit the record (and its PEtab tables) instead of
+        # unpickling a copy with every task
+        self.record.share()
+        if calculator is not None:
+            calculator.share()
+
+        try:
+            simulator = self.__import_simulator(simulator)
+
+            for round_i in range(num_rounds):
+
+                # Get list of tasks for current round:
+                tasks = plan.tasks(self.org.task_assignment(
+                    rank_jobs_directory=job_index,
+                    round_i=round_i
+                ))
+
+                logger.debug(f"Tasks for round: {[task and task.label for task in tasks]}")
+
+                worker_args = [
+                    (
+                        task, 
+                        self.record,
+                        simulator,
+                        # lock,
+                        args, # !<-- Need to add sbml list back to args
+                        start,
+                        step, 
+                        calculator,
+                        keep_cells,
+                        output_times,
+                        selection,
+                    ) 
+                    for task in tasks]
+
+                # split workload across processes:
+                finished = self.__execute(worker_args, executor)
+
+                # update population statistics as each Worker's cells finish
+                if self.population is not None:
+                    for condition_id, _, observables in (cell for task in finished for cell in task):
+                        self.population.update(condition_id, observables)
+
+                # change simulation-complete status to `True`
+                self.__update_cache_for_round(tasks)
+
+        finally:
+            self.record.release()
+            if calculator is not None:
+                calculator.release()
+
+        # fold the journaled status updates back into cache_index.json
+        self.record.cache.compact()
+
+    def sweep(self,
+            simulator: Union[AbstractSimulator, str],
+            parameter_sets: Union[str, pd.DataFrame, Sequence[Mapping[str, float]]],
+            *args,
+            size: Optional[int] = None,
+            levels: int = 3,
+            parameters: Optional[Sequence[str]] = None,
+            seed: Optional[int] = None,
+            chunk_size: Optional[int] = None,
+            **kwargs,
+            ) -> pd.DataFrame:
+        """Runs the experiment's condition graph once per parameter set, in a
+        single run: the replicate cells of every set are simulated as cells of
+        one experiment, so rounds, process pools and loaded simulators are shared
+        by all sets. Cell ``c`` of the results simulates parameter set
+        ``(c - 1) // cell_count`` and replicate ``(c - 1) % cell_count + 1``.
 
-            # Get list of tasks for current round:
-            tasks = self.org.task_assignment(
-                rank_jobs_directory=job_index,
-                round_i=round_i
+        Parameters
+        ----------
+        simulator : AbstractSimulator or str
+            simulator wrapper class or registered name, as for `run`
+
+        parameter_sets : str, pd.DataFrame or sequence of dict
+            Design drawn from the PEtab parameter table ('grid', 'random' or
+            'lhs', see `ParameterDesign.parameter_sets`), or explicit parameter
+            sets with one column (key) per parameter
+
+        size, levels, parameters, seed : optional
+            Design options: sets of random and Latin hypercube designs, values per
+            parameter of grid designs, parameters to vary (default: estimated
+            ones; other estimated parameters keep their nominal value) and
+            random seed
+
+        chunk_size : int, optional
+            Cells (parameter sets) simulated per task; by default each condition
+            is split into about one task per core
+
+        kwargs : optional
+            Further `run` options (start, step, observables_only, ...)
+
+        Returns
+        -------
+        pd.DataFrame
+            The simulated parameter sets, indexed by parameter set
+        """
+
+        if isinstance(parameter_sets, str):
+            sets = ParameterDesign.parameter_sets(
+                self.loader.parameter_file,
+                design=parameter_sets,
+                size=size,
+                levels=levels,
+                parameters=parameters,
+                seed=seed,
+                measurement_df=self.loader.problems[0].measurement_files[0]
             )
+        else:
+            sets = pd.DataFrame(parameter_sets).reset_index(drop=True)
+            sets.index.name = "parameterSet"
+
+        if sets.empty:
+            raise ValueError("No parameter sets to simulate")
+
+        cell_count = self.__replicates() * len(sets)
+
+        logger.info(
+            f"Sweeping {len(sets)} parameter sets x {self.__replicates()} cells of experiment {self.name}"
+        )
+
+        # Results entries for every set and replicate, replacing the single-set cache
+        self.record = Record(
+            problem=self.loader.problems[0],
+            cache_dir=self.record.cache.cache_dir,
+            cell_count=cell_count
+        )
+
+        # resume() and save_results() read the sets from the cache
+        self.record.cache.save_parameter_sets(sets)
+
+        if chunk_size is None:
+            chunk_size = -(-cell_count // self.size)
+
+        # Only this run simulates the sweep, later runs simulate the model as loaded
+        self.parameter_sets, self.cell_count = sets, cell_count
+        try:
+            self.run(simulator, *args, chunk_size=chunk_size, **kwargs)
+        finally:
+            self.parameter_sets, self.cell_count = None, self.__replicates()
+
+        return sets
+
+    def __selection(self, project_columns: bool) -> Optional[list]:
+        """Columns Workers record, None keeps every state column"""
+
+        if not project_columns:
+            return None
 
-            logger.debug(f"Tasks for round: {tasks}")
-
-            worker_args = [
-                (
-                    task, 
-                    self.record,
-                    simulator,
-                    # lock,
-                    args, # !<-- Need to add sbml list back to args
-                    start,
-                    step, 
-                ) 
-                for task in tasks]
-            
-            # split workload across processes:
-            with mp.Pool(processes=self.size) as pool:
-                pool.starmap(worker_method, worker_args)
-                        
-            # change simulation-complete status to `True`
-            self.__update_cache_for_round(tasks)
+        observable_df = self.loader.problems[0].observable_files[0]
+        selection = formula_symbols(observable_df['observableFormula'])
+        logger.debug(f"Recording only columns: {selection}")
+
+        return selection
+
+    def __replicates(self) -> int:
+        """Replicate cells of the problem, simulated once per parameter set"""
+        return getattr(self.details.problems[0], "cell_count", 1)
 
     def __update_cache_for_round(self, task_list: list) -> None:
         """Receives task list for current round,
@@ -152,26 +404,55 @@ class Experiment:
         updates results_dict[complete] with True."""
         
         remaining = []
+        completed, shards = [], {}
 
         for task in task_list:
             if task is None:
                 continue
 
-            condition_id, cell = task.split("+")
+            if isinstance(task, Task):
+                keys = list(task.keys)
+            else:
+                condition_id, cells = Organizer.parse_task(task)
+
+                try:
+                    keys = list(self.record.entry_keys(condition_id, cells))
+                except KeyError:
+                    remaining.append(task)
+                    continue
 
-            matched = False
-            for key, record in self.record.cache.results_dict.items():
-                if str(record['conditionId']) == str(condition_id) \
-                and str(record['cell']) == str(cell):
-                    self.record.cache.update_cache_index(key=key, status=True)
-                    matched = True
-                    break
+            # Chunked tasks are cached together in one shard named after their first entry
+            if len(keys) > 1:
+                shards.update(dict.fromkeys(keys, Organizer.shard_name(keys)))
 
-            if not matched:
-                remaining.append(task)
+            completed.extend(keys)
+
+        # One index update per round rather than one per task
+        self.record.cache.update_cache_entries(completed, status=True, shards=shards)
 
         assert remaining == [], f"Error in simulation task updates: {remaining}"
 
+    def __execute(self, worker_args: list, executor: str = "process") -> list:
+        """Runs the Worker tasks of one round on the selected executor backend"""
+
+        if executor == "serial":
+            return [worker_method(*worker_args_i) for worker_args_i in worker_args]
+
+        if executor != "process":
+            raise ValueError(f"Unknown executor '{executor}', expected 'process' or 'serial'")
+
+        with mp.Pool(processes=self.size) as pool:
+            return pool.starmap(worker_method, worker_args)
+
+    def __import_simulator(self, simulator: Union[AbstractSimulator, str]):
+        """Imports a named simulator once in the parent when workers are forked
+        (they inherit it); otherwise each worker process imports it by name"""
+
+        if isinstance(simulator, str) and forks_share_memory():
+            return SimulatorRegistry.resolve(simulator)
+
+        return simulator
+
     def __add_sbml_to_args(self, args: tuple) -> tuple:
         """Adds sbml files stored in self to args tuple"""
         args_list = list(args)
@@ -193,59 +474,139 @@ class Experiment:
         
         return sbml_file_list
 
-    def save_results(self, args) -> None:
-        """Save the results of the simulation to a file
+    def save_results(self, args) -> str:
+        """Save the results of the simulation to a sharded results store
         input:
             None
         output:
-            returns the saved results as a nested dictionary within
-            a pickle file
+            returns the path of the results store: a manifest plus one NumPy
+            shard per results entry, readable lazily through `ResultsStore`
         """
 
         # Benchmark results are stored within the specified model directory
 
         results_directory = os.path.join(os.path.dirname(self.petab_yaml), "results")
 
-        if args is not None and 'output' in args:
+        if args is not None and getattr(args, 'output', None) is not None:
 
             results_directory = args.output
 
         if not os.path.exists(results_directory):
             os.makedirs(results_directory)
 
-        # Final output is saved in pickle format
-        results_path = os.path.join(results_directory, f"{date.today()}.pkl")
+        # Final output is saved as a results store directory
+        results_path = os.path.join(results_directory, f"{date.today()}")
 
         if self.name is not None:
-            results_path = os.path.join(results_directory, f"{self.name}.pkl")
+            results_path = os.path.join(results_directory, f"{self.name}")
+
+        ResultsStore.write(
+            self.record.cache.results_dict,
+            results_path,
+            name=self.name,
+            cache=self.record.cache,
+            summary=self.__summary()
+        )
 
-        with open(results_path, "wb") as f:
-            pkl.dump(self.record.cache.results_dict, f)
+        # Sweeps store the parameter set simulated by each block of cells
+        parameter_sets = self.record.cache.read_parameter_sets()
+        if parameter_sets is not None:
+            parameter_sets.to_csv(os.path.join(results_path, "parameter_sets.tsv"), sep="\t")
 
         self.record.cache.delete_cache()
 
+        return results_path
+
+
+    def __summary(self) -> dict:
+        """Population statistics to store with the results, if any were computed.
+        Statistics of observables calculated across cached cells take precedence
+        over the running aggregates, which remain for cells that were not kept."""
+        summary = self.population.result() if self.population is not None else {}
 
-    def observable_calculation(self, *args) -> None:
+        for condition_id, observables in (self.observable_summary or {}).items():
+            for obsId, stats in (observables or {}).items():
+                summary.setdefault(condition_id, {})[obsId] = stats
+
+        return summary or None
+
+    def observable_calculation(
+            self, 
+            *args, 
+            alignment: str = "nearest", 
+            summary: bool = False
+            ) -> None:
         """Calculate the observables and compare to the experimental data.
         input:
             results: dict - results of the SPARCED model unit test simulation
+            alignment: str - 'nearest', 'linear' or 'spline' measurement-time alignment
+            summary: bool - also store population statistics of each observable across cells
         output:
             returns the results of the SPARCED model unit test simulation
         """
-        self.record.cache.results_dict = obs.ObservableCalculator(self).run()
+        calculator = obs.ObservableCalculator(self, alignment=alignment, summary=summary)
+
+        self.record.cache.results_dict = calculator.run()
+
+        self.observable_summary = calculator.summary
 
-        self.save_results(args)
+        # launchers pass their parsed arguments namespace
+        self.save_results(args[0] if args else None)
 
         return # Proceeds to next command provided in launchers.py
 
     def resume(
         self,
-        simulator: AbstractSimulator,
+        simulator: Union[AbstractSimulator, str],
         *args, 
         start: float = 0.0,
         step: float = 30.0,
+        executor: str = "process",
+        observables_only: Optional[bool] = None,
+        population_stats: Optional[bool] = None,
+        keep_cells: Optional[bool] = None,
+        sparse_output: Optional[bool] = None,
+        visualization_times: Optional[Sequence[float]] = None,
+        project_columns: Optional[bool] = None,
     ) -> None:
-        """Starts Experiment from last completed simulation setting"""
+        """Starts Experiment from last completed simulation setting.
+
+        Storage and output options (`observables_only`, `population_stats`,
+        `keep_cells`, `sparse_output`, `visualization_times`, `project_columns`,
+        see `run`) left as None are those of the interrupted run; differing
+        values are refused, so the cache never mixes trajectory and observable
+        entries, output grids or recorded columns.
+        Interrupted sweeps continue with the parameter sets stored in their cache.
+        """
+
+        parameter_sets = self.record.cache.read_parameter_sets()
+
+        cell_count = self.cell_count
+        if parameter_sets is not None:
+            cell_count = self.record.cell_count = self.__replicates() * len(parameter_sets)
+
+        options = self.__resume_options(
+            observables_only=observables_only,
+            population_stats=population_stats,
+            keep_cells=keep_cells,
+            sparse_output=sparse_output,
+            visualization_times=None if visualization_times is None
+                else [float(t) for t in visualization_times],
+            project_columns=project_columns
+        )
+        keep_cells = options["keep_cells"]
+
+        output_times = tuple(options["visualization_times"]) if options["sparse_output"] else None
+
+        selection = self.__selection(options["project_columns"])
+
+        calculator = obs.ObservableCalculator(self) if options["observables_only"] else None
+
+        # Aggregates restart from the observables of the cells completed so far
+        if options["population_stats"]:
+            self.population = self.__cached_population(keep_cells)
+
+        args = self.__add_sbml_to_args(args=args)
         
         cache_index = self.record.cache.read_cache_index()
 
@@ -264,7 +625,7 @@ class Experiment:
         # --- 3. Retrieve all simulations + cell replicates ---
         total_tasks = self.org.total_tasks(
             tasks=topo_sorted,
-            cell_count=self.cell_count
+            cell_count=cell_count
         )
 
         # --- 4. Filter total_tasks to only include incomplete ones ---
@@ -280,7 +641,7 @@ class Experiment:
         delayed_tasks = self.org.delay_secondary_conditions(
             measurements_df=self.loader.problems[0].measurement_files[0],
             task_list=total_tasks,
-            cell_count=self.cell_count
+            cell_count=cell_count
         )
 
         logger.info(f"Resuming {len(total_tasks)} jobs for experiment '{self.name}'...")
@@ -288,33 +649,105 @@ class Experiment:
         # --- 7. Rebuild task index for parallel scheduling ---
         num_rounds = -(-len(delayed_tasks) // self.size)  # Ceiling division
 
-        for round_idx in range(num_rounds):
-            tasks = []
-            for _ in range(self.size):
-                if delayed_tasks:
-                    tasks.append(delayed_tasks.pop(0))
-                else:
-                    tasks.append(None)
-
-            logger.debug(f"Tasks for round {round_idx + 1}/{num_rounds}: {tasks}")
-
-            worker_args = [
-                (
-                    task, 
-                    self.record,
-                    simulator,
-                    *args,
-                    start,
-                    step
-                ) 
-                for task in tasks
-            ]
-
-            # --- 8. Parallel execution ---
-            with mp.Pool(processes=self.size) as pool:
-                pool.starmap(worker_method, worker_args)
-
-            logger.debug(f"Completed round {round_idx + 1}/{num_rounds}")
-
-        # --- 9. Store final results and cleanup ---
-        self._store_final_results()
+        plan = TaskPlan(
+            self.record,
+            delayed_tasks,
+            start=start,
+            output_times=output_times,
+            parameter_sets=parameter_sets,
+            replicates=self.__replicates()
+        )
+
+        self.record.share()
+        if calculator is not None:
+            calculator.share()
+
+        try:
+            simulator = self.__import_simulator(simulator)
+
+            for round_idx in range(num_rounds):
+                tasks = plan.tasks(delayed_tasks[round_idx*self.size:(round_idx+1)*self.size])
+                tasks += [None] * (self.size - len(tasks))
+
+                logger.debug(f"Tasks for round {round_idx + 1}/{num_rounds}: {[task and task.label for task in tasks]}")
+
+                worker_args = [
+                    (
+                        task, 
+                        self.record,
+                        simulator,
+                        args,
+                        start,
+                        step,
+                        calculator,
+                        keep_cells,
+                        output_times,
+                        selection,
+                    ) 
+                    for task in tasks
+                ]
+
+                # --- 8. Parallel execution ---
+                finished = self.__execute(worker_args, executor)
+
+                if self.population is not None:
+                    for condition_id, _, observables in (cell for task in finished for cell in task):
+                        self.population.update(condition_id, observables)
+
+                self.__update_cache_for_round(tasks)
+
+                logger.debug(f"Completed round {round_idx + 1}/{num_rounds}")
+
+        finally:
+            self.record.release()
+            if calculator is not None:
+                calculator.release()
+
+        # --- 9. Persist completion, results are stored by observable_calculation ---
+        self.record.cache.compact()
+
+    def __resume_options(self, **requested) -> dict:
+        """Storage options of the interrupted run, refusing explicitly different ones"""
+
+        # Defaults of run(), for caches written before an option was recorded
+        stored = {
+            "observables_only": False,
+            "population_stats": False,
+            "keep_cells": True,
+            "sparse_output": False,
+            "visualization_times": [],
+            "project_columns": False,
+            **(self.record.cache.read_run_options() or {}),
+        }
+
+        mismatched = {
+            name: value for name, value in requested.items()
+            if value is not None and value != stored.get(name)
+        }
+        if mismatched:
+            raise ValueError(
+                f"Cached results were simulated with {stored}, cannot resume with {mismatched}"
+            )
+
+        return stored
+
+    def __cached_population(self, keep_cells: bool) -> PopulationAggregator:
+        """Population statistics of the cells completed before the interruption"""
+
+        completed = [
+            (key, entry) for key, entry in self.record.cache.results_dict.items() if entry["complete"]
+        ]
+
+        # Runs keeping only aggregates lost those of completed cells with the parent process
+        if completed and not keep_cells:
+            raise ValueError(
+                "The interrupted run kept only population aggregates (keep_cells=False), "
+                "its completed cells cannot be aggregated again; run the experiment again"
+            )
+
+        population = PopulationAggregator()
+
+        for key, entry in completed:
+            population.update(entry["conditionId"], self.record.cache.load(key)["observables"])
+
+        return population
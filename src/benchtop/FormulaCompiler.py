@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parses PEtab observable formulas once into a validated syntax tree and compiles
+them into closures evaluating directly on NumPy column arrays.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import ast
+import math
+import operator
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Functions an observable formula may call, mapped onto their NumPy ufuncs
+ALLOWED_FUNCTIONS = {
+    "exp": np.exp,
+    "log": np.log,
+    "log2": np.log2,
+    "log10": np.log10,
+    "ln": np.log,
+    "sqrt": np.sqrt,
+    "abs": np.abs,
+    "sign": np.sign,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "arcsin": np.arcsin,
+    "arccos": np.arccos,
+    "arctan": np.arctan,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+    "pow": np.power,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+ALLOWED_CONSTANTS = {
+    "pi": np.pi,
+    "e": np.e,
+    "inf": np.inf,
+    "nan": np.nan,
+}
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.Mod: operator.mod,
+}
+
+UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+ALLOWED_OPERATORS = tuple(BINARY_OPERATORS) + tuple(UNARY_OPERATORS)
+
+# Values considered to mean "no formula" in the observables table
+NULL_FORMULAS = ('', '0', 'nan', 'None')
+
+
+class CompiledFormula:
+    """Observable formula compiled once, evaluated against any results table.
+
+    Calling the object binds the arrays of every species in `symbols` from the
+    provided dataset (anything indexable by column name) and evaluates a tree of
+    closures built from the validated syntax tree, calling only the allowed
+    NumPy functions. Constants (`pi`, `e`, ...) yield to dataset columns of the
+    same name, so model symbols take precedence.
+    """
+
+    __slots__ = ("formula", "symbols", "constants", "_evaluate")
+
+    def __init__(self, formula: str) -> None:
+
+        if not isinstance(formula, str):
+            raise TypeError("Input observable_formula must be a string.")
+
+        self.formula = formula
+
+        # PEtab math writes powers as `^`; string constants are rejected below,
+        # so a textual swap keeps Python's operator precedence for `**`
+        try:
+            tree = ast.parse(formula.strip().replace("^", "**"), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid observable formula '{formula}': {e.msg}") from e
+
+        self.symbols, self.constants = _validate(tree, formula)
+        self._evaluate = _closure(tree.body)
+
+    def __call__(self, dataset, length: Optional[int] = None) -> np.ndarray:
+
+        namespace = {}
+
+        for species in self.symbols:
+            try:
+                namespace[species] = np.asarray(dataset[species], dtype=float)
+            except KeyError:
+                raise KeyError(f"Species '{species}' not found in dataset.") from None
+
+        for constant in self.constants:
+            try:
+                namespace[constant] = np.asarray(dataset[constant], dtype=float)
+            except (KeyError, IndexError):
+                namespace[constant] = ALLOWED_CONSTANTS[constant]
+
+        result = self._evaluate(namespace)
+
+        # Constant formulas are broadcast over the simulated timepoints
+        if np.ndim(result) == 0 and length is not None:
+            result = np.full(length, result, dtype=float)
+
+        return result
+
+    def __reduce__(self):
+        # Closures cannot be pickled; processes recompile from the source
+        return (CompiledFormula, (self.formula,))
+
+    def __repr__(self) -> str:
+        return f"CompiledFormula({self.formula!r})"
+
+
+def compile_formula(formula) -> Optional[CompiledFormula]:
+    """Compiles an observable formula, returning None for null-like formulas"""
+
+    if formula is None:
+        return None
+
+    if isinstance(formula, (int, float, np.number)):
+        if math.isnan(formula) or formula == 0:
+            return None
+        formula = str(formula)
+
+    if str(formula).strip() in NULL_FORMULAS:
+        return None
+
+    return CompiledFormula(str(formula))
+
+
+def formula_symbols(formulas) -> Tuple[str, ...]:
+    """Species referenced by any of the given formulas, in order of first appearance
+    (constant names are included, in case the model defines them)"""
+
+    symbols = {}
+
+    for formula in formulas:
+        compiled = compile_formula(formula)
+        if compiled is not None:
+            symbols.update(dict.fromkeys(compiled.symbols + compiled.constants))
+
+    return tuple(symbols)
+
+
+def _validate(tree: ast.Expression, formula: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Rejects anything outside arithmetic on species, numbers and allowed functions.
+    Returns the species identifiers and the constants referenced by the formula,
+    in order of appearance."""
+
+    symbols, constants = [], []
+
+    for node in ast.walk(tree):
+
+        if isinstance(node, (ast.Expression, ast.Load)):
+            continue
+
+        if isinstance(node, (ast.BinOp, ast.UnaryOp)):
+            if not isinstance(node.op, ALLOWED_OPERATORS):
+                raise ValueError(
+                    f"Operator {type(node.op).__name__} not allowed in formula '{formula}'"
+                )
+
+        elif isinstance(node, ast.operator) or isinstance(node, ast.unaryop):
+            continue
+
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                raise ValueError(f"Constant {node.value!r} not allowed in formula '{formula}'")
+
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in ALLOWED_FUNCTIONS:
+                raise ValueError(f"Function call not allowed in formula '{formula}'")
+            if node.keywords:
+                raise ValueError(f"Keyword arguments not allowed in formula '{formula}'")
+
+        elif isinstance(node, ast.Name):
+            if node.id in ALLOWED_FUNCTIONS:
+                continue
+            names = constants if node.id in ALLOWED_CONSTANTS else symbols
+            if node.id not in names:
+                names.append(node.id)
+
+        else:
+            raise ValueError(
+                f"Expression {type(node).__name__} not allowed in formula '{formula}'"
+            )
+
+    return tuple(symbols), tuple(constants)
+
+
+def _closure(node: ast.AST):
+    """Builds a function of the {name: array} namespace evaluating a validated node"""
+
+    if isinstance(node, ast.BinOp):
+        op = BINARY_OPERATORS[type(node.op)]
+        left, right = _closure(node.left), _closure(node.right)
+        return lambda namespace: op(left(namespace), right(namespace))
+
+    if isinstance(node, ast.UnaryOp):
+        op, operand = UNARY_OPERATORS[type(node.op)], _closure(node.operand)
+        return lambda namespace: op(operand(namespace))
+
+    if isinstance(node, ast.Call):
+        function = ALLOWED_FUNCTIONS[node.func.id]
+        arguments = tuple(_closure(arg) for arg in node.args)
+        return lambda namespace: function(*[argument(namespace) for argument in arguments])
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda namespace: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        return lambda namespace: namespace[name]
+
+    raise ValueError(f"Expression {type(node).__name__} not allowed")
@@ -8,32 +8,79 @@ Author: Jonah R. Huggins
 Description: 
 """
 # -----------------------Package Import & Defined Arguements-------------------#
-import re
-import math
-from typing import List, Hashable
+import os
+import sys
+import multiprocessing as mp
+from typing import Dict, List, NamedTuple, Optional
 
 import numpy as np
 import pandas as pd
 
+sys.path.append(os.path.dirname(__file__))
+from FormulaCompiler import CompiledFormula, compile_formula
+from TimeAlignment import TimeAlignment, nearest_indices
+from SimulationResult import SimulationResult
+from SharedTables import ForkShared
+
 #-------------------------Initialization & Variables---------------------------#
 
-class ObservableCalculator:
+class ObservableSpec(NamedTuple):
+    """Everything needed to reduce a condition's results to one observable"""
+    observableId: str
+    formula: Optional[CompiledFormula]
+    experiment: np.ndarray
+    exp_time: np.ndarray
+    measured: bool
+
+# Calculator inherited by each pool process, set once by `_init_calculator`
+_calculator = None
+
+def _init_calculator(calculator) -> None:
+    """Pool initializer, stores the calculator once per process instead of per task"""
+    global _calculator
+    _calculator = calculator
+
+def _calculate_condition(task: tuple) -> tuple:
+    """Child process method; loads a condition's cache entries and returns observables only"""
+    conditionId, entries = task
+    return _calculator.calculate_condition(conditionId, entries)
+
+class ObservableCalculator(ForkShared):
     """Class object for calculating provided observable in PEtab Observables file.
     Uses composition and encapsulation properties of Experiment object to extend
     functionality."""
 
-    def __init__(self, parent):
+    # Cells of a condition loaded (and stacked) at a time, bounding memory use
+    batch_size = 256
+
+    def __init__(self, parent, alignment: str = "nearest", summary: bool = False):
 
         self.results_dict = parent.record.cache.results_dict
 
         self.cache = parent.record.cache
 
+        # Observables are computed across the experiment's worker count
+        self.size = getattr(parent, "size", 1) or 1
+
         self.observable_df = parent.loader.problems[0].observable_files[0]
         
         self.measurement_df = parent.loader.problems[0].measurement_files[0]
 
         self.data_groups = self._group_conditions_and_observables()
 
+        # observableId -> CompiledFormula (None for null formulas), parsed once
+        self.compiled_formulas = {}
+
+        # (conditionId, observableId) -> TimeAlignment, shared by every cell
+        self.alignment = alignment
+        self.alignments = {}
+
+        # conditionId -> [ObservableSpec, ...], run() only performs lookups
+        self.condition_index = self._build_condition_index()
+
+        # conditionId -> observableId -> population statistics across cells
+        self.summary = {} if summary else None
+
         self.observable_results = self._build_observable_results_dict()
 
     def _group_conditions_and_observables(self) -> pd.core.groupby.generic.DataFrameGroupBy:
@@ -48,7 +95,9 @@ class ObservableCalculator:
                 raise ValueError("PEtab DataFrame is empty. Cannot group empty dataframes")
 
             # Group conditions and observables in the measurement dataframe
-            grouped_df = self.measurement_df.groupby(["simulationConditionId", "observableId"])
+            grouped_df = self.measurement_df.groupby(
+                ["simulationConditionId", "observableId"], sort=False, observed=True
+            )
 
             return grouped_df
 
@@ -56,6 +105,37 @@ class ObservableCalculator:
             print(f"Error in group_conditions_and_observables: {e}")
             return pd.DataFrame()
 
+    def _build_condition_index(self) -> Dict[str, List[ObservableSpec]]:
+        """Maps every simulated condition to its observables, compiled formulas and
+        measurements in a single pass over the measurement groups."""
+
+        formulas = dict(zip(
+            self.observable_df['observableId'],
+            self.observable_df['observableFormula']
+        ))
+
+        condition_index = {}
+
+        if not isinstance(self.data_groups, pd.core.groupby.generic.DataFrameGroupBy):
+            return condition_index
+
+        for (conditionId, obsId), group in self.data_groups:
+
+            if obsId not in formulas:
+                raise KeyError(f"Observable '{obsId}' not defined in the observables file")
+
+            spec = ObservableSpec(
+                observableId=obsId,
+                formula=self._get_compiled_formula(obsId, formulas[obsId]),
+                experiment=self._get_experimental_data(group),
+                exp_time=group['time'].to_numpy(dtype=float),
+                measured=not group['measurement'].isna().all(),
+            )
+
+            condition_index.setdefault(conditionId, []).append(spec)
+
+        return condition_index
+
     def _build_observable_results_dict(self):
         """Constructs the results dictionary for data reduced, calculated observables 
         to be stored in.
@@ -75,248 +155,291 @@ class ObservableCalculator:
     def run(self):
         """Runtime function for executing the observable calculator and reducing results to bare minimum"""
 
+        # --- replicates of a condition share formulas and time alignment ---
+        conditions = {}
         for entry in self.results_dict:
+            conditions.setdefault(self.results_dict[entry]['conditionId'], []).append(entry)
+
+        tasks = list(conditions.items())
+
+        if self.size <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                self._merge(*self.calculate_condition(*task))
 
-            conditionId = self.results_dict[entry]['conditionId']
+            return self.observable_results
 
-            matched_formulas = self._get_entry_formulas(conditionId)
+        chunksize = max(1, len(tasks) // (self.size * 4))
+
+        with mp.Pool(
+            processes=self.size,
+            initializer=_init_calculator,
+            initargs=(self,)
+        ) as pool:
+            for results in pool.imap_unordered(_calculate_condition, tasks, chunksize):
+                self._merge(*results)
+
+        return self.observable_results
+
+    def _merge(self, conditionId: str, observables: dict, summary: Optional[dict]) -> None:
+        """Stores the observables of a condition's entries returned by a calculation"""
+
+        for entry, values in observables.items():
+            self.observable_results[entry].update(values)
+
+        if self.summary is not None:
+            self.summary[conditionId] = summary
+
+    def calculate_condition(self, conditionId: str, entries: list) -> tuple:
+        """Reduces every cell of a condition to its observables. Cells are loaded
+        `batch_size` at a time; cells of a batch simulated on the same time grid are
+        stacked (cells x time) so each formula is evaluated once per batch.
+
+        Returns:
+        - (conditionId, {entry: observables}, summary statistics or None)
+        """
+        observables = {}
+
+        for first in range(0, len(entries), self.batch_size):
+            observables.update(
+                self._calculate_batch(entries[first:first + self.batch_size], conditionId)
+            )
+
+        summary = None
+        if self.summary is not None:
+            summary = self._summarize([observables[entry] for entry in entries])
+
+        return conditionId, observables, summary
+
+    def _calculate_batch(self, entries: list, conditionId: str) -> dict:
+        """Loads a batch of a condition's entries and reduces them to their observables"""
+        observables = {}
+        pending = []
+
+        for entry in entries:
 
             # --- reduce I/O operations by loading per entry ---
             dataset = self.cache.load(entry)
 
-            # -- iterative process for downsampling to observable-only data ---
-            for observable_key, formula in matched_formulas.items():
+            # --- entries from observable-only runs were reduced by the Worker ---
+            if isinstance(dataset, dict) and "observables" in dataset:
+                observables[entry] = dataset["observables"]
+            else:
+                pending.append((entry, dataset))
 
-                self.observable_results[entry][observable_key] = {}
+        if len(pending) > 1 and self._shares_time_grid([dataset for _, dataset in pending]):
+            stacked = self.calculate_stacked([dataset for _, dataset in pending], conditionId)
+            observables.update(zip([entry for entry, _ in pending], stacked))
 
-                group = self.data_groups.get_group((conditionId, observable_key))
+        else:
+            for entry, dataset in pending:
+                observables[entry] = self.calculate_dataset(dataset, conditionId)
 
-                # --- PEtab measurements file defines experimental data ---
-                self.observable_results[entry][observable_key]['experiment'] = self._get_experimental_data(group)
+        return observables
 
-                self.observable_results[entry][observable_key]['simulation'] = self._calculate_formula(
-                    dataset, 
-                    formula, 
-                    group
-                    )
+    def calculate_entry(self, entry: str, conditionId: str) -> dict:
+        """Loads a single results entry and reduces it to its matched observables"""
 
-                # --- Timepoints are reduced to bare minimum if applicable ---
-                self.observable_results[entry][observable_key]['time'] = self._downsample_timepoints(
-                    dataset, 
-                    group
-                    )
+        # --- reduce I/O operations by loading per entry ---
+        dataset = self.cache.load(entry)
 
-        return self.observable_results
+        # --- entries from observable-only runs were reduced by the Worker ---
+        if isinstance(dataset, dict) and "observables" in dataset:
+            return dataset["observables"]
 
-    def _get_entry_formulas(self, conditionId: str):
-        """Takes an entry from a results dictionary and finds the corresponding observable formulas
-        for an entry"""
+        return self.calculate_dataset(dataset, conditionId)
 
-        matched_obsIds = self._get_condition_observables(conditionId)
+    def calculate_dataset(self, dataset: SimulationResult, conditionId: str) -> dict:
+        """Reduces a simulated dataset of a condition to its matched observables"""
 
-        formulas = {}
+        observables = {}
 
-        for obsId in matched_obsIds:
+        # -- iterative process for downsampling to observable-only data ---
+        for spec in self.condition_index.get(conditionId, []):
 
-            # Extraction Logic Statement
-            formula_i = self.observable_df['observableFormula']\
-                [self.observable_df['observableId'] == obsId].iloc[0] # This should be the first and only value in the series
+            alignment = self._get_alignment(conditionId, spec, dataset['time'])
 
-            formulas[obsId] = formula_i
+            observables[spec.observableId] = {
+                # --- PEtab measurements file defines experimental data ---
+                'experiment': spec.experiment,
+                'simulation': self._calculate_formula(dataset, spec.formula, alignment),
+                # --- Timepoints are reduced to bare minimum if applicable ---
+                'time': self._downsample_timepoints(dataset, alignment),
+            }
 
-        return formulas
+        return observables
 
-    def _get_condition_observables(self, conditionId):
-        """Get observableIds associated with conditionId"""
+    def calculate_stacked(self, datasets: list, conditionId: str) -> List[dict]:
+        """Evaluates each formula once over all replicates of a condition, stacking
+        every referenced species into a 2-D (cells x time) array."""
 
-        matched_observableIds = []
+        time = np.asarray(datasets[0]['time'])
+        shape = (len(datasets), len(time))
 
-        for (cond, obs), index in self.data_groups.groups.items():
+        columns = {}
+        observables = [{} for _ in datasets]
 
-            if cond == conditionId:
-                
-                matched_observableIds.append(obs)
+        for spec in self.condition_index.get(conditionId, []):
 
-        return matched_observableIds
+            alignment = self._get_alignment(conditionId, spec, time)
 
-    def _get_experimental_data(self, group):
-        """Gets experimental data from PEtab measurement file"""
-        
-        return np.array(group['measurement'])
+            simulation = [None] * len(datasets)
 
-    def _calculate_formula(self, dataset: pd.DataFrame, formula: str, 
-                           group: pd.core.groupby.generic.DataFrameGroupBy):
-        """Takes a formula string and returns the results of the intended mathematical
-        expression."""
+            if spec.formula is not None:
 
-        # List of values considered to mean "empty" or "skip"
-        acceptable_nulls = ['', None, 0, '0', float('nan'), np.nan]
+                # Constants are stacked too when the model defines a species of that name
+                for species in spec.formula.symbols + spec.formula.constants:
+                    if species not in columns:
+                        try:
+                            columns[species] = np.vstack([
+                                np.asarray(dataset[species], dtype=float) for dataset in datasets
+                            ])
+                        except KeyError:
+                            # missing species are reported by the formula itself
+                            continue
 
-        # Check if formula is in the null-like set
-        if formula in acceptable_nulls or (
-            isinstance(formula, float) and math.isnan(formula)
-            ):
-            return None
-        
-        species = self._get_valid_species(formula)
-        
-        for variable in species:
-            # At each iteration, the formula updates with each species array
-            formula = self.swap_species_for_array(
-                dataset, variable, formula
-            )
+                answer = np.broadcast_to(spec.formula(columns), shape)
 
-        formula_answer = eval(formula)
+                simulation = np.ascontiguousarray(self._downsample_results(answer, alignment))
 
-        formula_answer = self._downsample_results(formula_answer, dataset, group)
+            reduced_time = self._downsample_timepoints(datasets[0], alignment)
 
-        return formula_answer
+            for cell, cell_observables in enumerate(observables):
+                cell_observables[spec.observableId] = {
+                    'experiment': spec.experiment,
+                    'simulation': simulation[cell],
+                    'time': reduced_time,
+                }
+
+        return observables
 
     @staticmethod
-    def _get_valid_species(formula: str) -> List[str]:
-        """
-        Extract valid species identifiers from an observable formula based on PEtab naming conventions.
+    def _shares_time_grid(datasets: list) -> bool:
+        """True if all datasets were simulated on the same timepoints"""
+        time = np.asarray(datasets[0]['time'])
+        return all(np.array_equal(np.asarray(dataset['time']), time) for dataset in datasets[1:])
 
-        Parameters:
-        - observable_formula (str): The formula containing species and mathematical expressions.
+    @staticmethod
+    def _summarize(cell_observables: List[dict]) -> dict:
+        """Population statistics of each observable across the cells of a condition"""
 
-        Returns:
-        - List[str]: A list of valid species identifiers.
+        summary = {}
 
-        Raises:
-        - ValueError: If no valid species are found in the observable formula.
-        - TypeError: If the input is not a string.
-        """
-        if not isinstance(formula, str):
-            raise TypeError("Input observable_formula must be a string.")
-        
-        # Regex for PEtab-compliant species identifiers
-        valid_species = re.findall(r"[A-Za-z_]\w*", formula)
+        for obsId in cell_observables[0] if cell_observables else []:
 
-        if not valid_species:
-            raise ValueError("No valid species found in the observable formula.")
+            simulations = [observables[obsId]['simulation'] for observables in cell_observables]
 
-        return valid_species
+            if any(simulation is None for simulation in simulations) or \
+                len({np.shape(simulation) for simulation in simulations}) != 1:
+                continue
 
-    def swap_species_for_array(
-            self, 
-            dataset: pd.DataFrame, 
-            species_i: str, 
-            observable_formula: str
-            ) -> str:
-        """
-        Takes a species identifier and returns the corresponding array from the results_dict.
+            stack = np.vstack(simulations)
 
-        Parameters:
-        - dataset (pd.DataFrame): current experiment simulation loaded
-        - species_i (str): The species identifier.
-        - observable_formula (str): The formula containing species and mathematical expressions.
+            summary[obsId] = {
+                'time': np.asarray(cell_observables[0][obsId]['time']),
+                'mean': stack.mean(axis=0),
+                'std': stack.std(axis=0),
+                'min': stack.min(axis=0),
+                'max': stack.max(axis=0),
+            }
 
-        Returns:
-        - observable_formula (str): The observable formula with the species replaced by the array.
+        return summary
 
-        Raises:
-        - KeyError: If the species identifier is not found in the results dictionary.
-        - ValueError: If the replacement value cannot be converted to a NumPy array.
-        """
-        try:
-            # Validate inputs
-            if not isinstance(species_i, str):
-                raise TypeError("The species_i must be a string.")
-            if not isinstance(observable_formula, str):
-                raise TypeError("The observable_formula must be a string.")
+    def __getstate__(self) -> dict:
+        """Pool processes only need the inputs of the calculation, not its results"""
+        # ForkShared drops the registry token, copies are never registered themselves
+        state = super().__getstate__()
+        state['observable_results'] = None
+        # the condition index already holds everything taken from the groups
+        state['data_groups'] = None
+        return state
+
+    def _get_compiled_formula(self, obsId: str, formula: str):
+        """Returns the compiled formula of an observable, compiling on first request"""
 
-            # Retrieve species-specific results from current entry
-            replacement_value = dataset[species_i]
+        if obsId not in self.compiled_formulas:
+            self.compiled_formulas[obsId] = compile_formula(formula)
 
-            if replacement_value is None:
-                raise KeyError(f"Species '{species_i}' not found in dataset.")
+        return self.compiled_formulas[obsId]
 
-            # Convert to NumPy array
-            if isinstance(replacement_value, pd.Series):
-                replacement_value = replacement_value.to_numpy()
-            elif not isinstance(replacement_value, np.ndarray):
-                raise ValueError(f"Replacement value for species '{species_i}' is not a valid array or Series.")
+    def _get_experimental_data(self, group):
+        """Gets experimental data from PEtab measurement file"""
+        
+        return np.array(group['measurement'])
 
-            # Prepare replacement string
-            replacement_value_str = f"np.array({replacement_value.tolist()})"
+    def _get_alignment(self, conditionId: str, spec: ObservableSpec, sim_time) -> TimeAlignment:
+        """Returns the measurement-time alignment of a (condition, observable) group,
+        computed once per simulation time grid and reused across all cells.
+        Groups without experimental values keep the full trajectory (None)."""
 
-            # Replace only exact matches of the species name in the formula
-            observable_formula = re.sub(fr"\b{re.escape(species_i)}\b",
-                                        replacement_value_str,
-                                        observable_formula)
+        # Groups with no experimental values in their measurements keep all timepoints
+        if not spec.measured:
+            return None
 
-            return observable_formula
+        alignment = self.alignments.get((conditionId, spec.observableId))
 
-        except Exception as e:
-            print(f"Error in swap_species_for_array: {e}")
-            raise
+        if alignment is None or not alignment.matches(sim_time):
+            alignment = TimeAlignment(sim_time, spec.exp_time, method=self.alignment)
+            self.alignments[(conditionId, spec.observableId)] = alignment
+
+        return alignment
+
+    def _calculate_formula(self, dataset: SimulationResult, formula: CompiledFormula, 
+                           alignment: TimeAlignment = None):
+        """Takes a compiled formula and returns the results of the intended mathematical
+        expression, evaluated directly on the species arrays of the dataset."""
+
+        # Formulas considered to mean "empty" or "skip" compile to None
+        if formula is None:
+            return None
+
+        formula_answer = formula(dataset, length=len(dataset['time']))
+
+        formula_answer = self._downsample_results(formula_answer, alignment)
+
+        return formula_answer
 
     def _downsample_results(self, observable_answer: np.array, 
-                            dataset: pd.DataFrame, 
-                            group: pd.core.groupby.generic.DataFrameGroupBy
+                            alignment: TimeAlignment = None
                             ) -> np.array:
-        """Reduce the data to only the timepoints in the experimental data.
+        """Reduce the data to only the timepoints of the group's experimental data.
 
         Parameters:
         - observable_answer (np.array): The observable values from the simulation.
-        - dataset (pd.DataFrame): current experiment simulation loaded
-        - group (pd.DataFrameGroupBy): Grouped measurement dataframe.
+        - alignment (TimeAlignment): measurement-time alignment of the group, None
+            when the group holds no experimental values.
 
         Returns:
-        - observable_answer (np.array): The reduced observable values.
+        - observable_answer (np.array): The reduced observable values, one per measurement.
         """
-        # Ensure first that there is no experimental values in the group's measurement
-        # before reducing the timepoints, if none are found, return the original
-        if group["measurement"].isna().all():
+        if alignment is None:
             return observable_answer
 
-        exp_time = self.measurement_df["time"].unique()
-
-        time = dataset['time']
-
-        sim_equivalent_indicies = self._get_exp_time_indicies(exp_time, time)
-
-        # Reduce the observable_answer to only the timepoints in the experimental data
-        observable_answer = observable_answer[sim_equivalent_indicies]
-
-        return observable_answer
+        return alignment.values(observable_answer)
 
     @staticmethod
     def _get_exp_time_indicies(exp_time:np.array, sim_time:np.array):
         """Returns indicies of simulation time trajectories closest to experimental 
         equivalent timepoint recordings"""
 
-        sim_timepoint_indicies = []
-
-        for t in exp_time:
-            closest_idx = np.argmin(np.abs(sim_time - t))
-            sim_timepoint_indicies.append(closest_idx)
-
-        return sim_timepoint_indicies
+        return nearest_indices(sim_time, exp_time)
 
     def _downsample_timepoints(
             self, 
-            dataset: pd.DataFrame,
-            group: pd.core.groupby.generic.DataFrameGroupBy
+            dataset: SimulationResult,
+            alignment: TimeAlignment = None
             ) -> np.array:
         """Reduce the number of timepoints in the simulation results. to match
             the number of timepoints in the experimental data.
 
         Parameters:
-        - dataset (pd.DataFrame): current experiment simulation loaded
+        - dataset (SimulationResult): current experiment simulation loaded
+        - alignment (TimeAlignment): measurement-time alignment of the group
 
         Returns:
         - time (np.array): The reduced timepoints.
         """
 
-        time = dataset['time']
-
-        if group["measurement"].isna().all():
-            return time
-
-        exp_time = self.measurement_df["time"].unique()
-
-        sim_equivalent_indicies = self._get_exp_time_indicies(exp_time, time)
+        if alignment is None:
+            return np.asarray(dataset['time'])
 
-        return np.unique(np.array(time[sim_equivalent_indicies]))
+        return alignment.time()
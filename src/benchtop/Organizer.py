@@ -21,7 +21,8 @@ class Organizer:
     def task_organization(
         self, 
         measurement_df: pd.DataFrame, 
-        cell_count: int
+        cell_count: int,
+        chunk_size: int = 1,
     ) -> dict:
         """Assigns tasks to each rank
         Input:
@@ -35,22 +36,20 @@ class Organizer:
         size = self.workers
 
         topological_list = self.topologic_sort(measurements_df=measurement_df)
-        total_tasks = self.total_tasks(tasks=topological_list, cell_count=cell_count)
+        total_tasks = self.total_tasks(
+            tasks=topological_list, 
+            cell_count=cell_count, 
+            chunk_size=chunk_size
+            )
         delayed_list = self.delay_secondary_conditions(
             measurements_df=measurement_df, 
             task_list=total_tasks,
-            cell_count=cell_count
+            # each condition spans one task per block of cells
+            cell_count=-(-cell_count // max(chunk_size, 1))
             )
 
-        rank_jobs_directory = {}
-
-        for i in range(size):
-            
-            rank_ids = self.assign_tasks(i, len(delayed_list))
-
-            jobs_list = [delayed_list[job] for job in rank_ids]
-
-            rank_jobs_directory[i] = jobs_list
+        # Round-robin: rank i runs jobs i, i + size, i + 2*size, ... (see assign_tasks)
+        rank_jobs_directory = {i: delayed_list[i::size] for i in range(size)}
 
         # Assign each rank it's task for the round
         rounds_to_complete = -(-len(delayed_list) // size)
@@ -73,17 +72,18 @@ class Organizer:
             return measurements_df['simulationConditionId'].unique().tolist()   
            
         else:
-            # 1) Collect all nodes
-            nodes = set(measurements_df['simulationConditionId'].dropna()) \
-                | set(measurements_df['preequilibrationConditionId'].dropna())
-            
-            # 2) Build adjacency list and in‐degree map
+            # 1) Collect all nodes, in order of first appearance (deterministic)
+            pairs = measurements_df[['preequilibrationConditionId', 'simulationConditionId']]
+            nodes = pd.unique(pairs.to_numpy().ravel())
+            nodes = [n for n in nodes if pd.notna(n)]
+
+            # 2) Build adjacency list and in‐degree map from the unique edges
             succs = defaultdict(list)   # prerequisite → [dependents…]
-            indegree = {n: 0 for n in nodes}
-            
-            for _, row in measurements_df.dropna(subset=['preequilibrationConditionId']).iterrows():
-                pre = row['preequilibrationConditionId']
-                sim = row['simulationConditionId']
+            indegree = dict.fromkeys(nodes, 0)
+
+            edges = pairs.dropna().drop_duplicates()
+
+            for pre, sim in zip(edges['preequilibrationConditionId'], edges['simulationConditionId']):
                 succs[pre].append(sim)
                 indegree[sim] += 1
             
@@ -104,6 +104,34 @@ class Organizer:
             
             return ordered
 
+    @staticmethod
+    def reachable_conditions(measurements_df: pd.DataFrame) -> set:
+        """
+        Conditions an experiment actually simulates: every simulationConditionId
+        plus, transitively, the preequilibration conditions they start from.
+        Other rows of the condition table are never scheduled.
+        """
+        reachable = set(measurements_df['simulationConditionId'].dropna())
+
+        if 'preequilibrationConditionId' not in measurements_df.columns:
+            return reachable
+
+        # simulation condition -> its preequilibration conditions
+        pairs = measurements_df[['simulationConditionId', 'preequilibrationConditionId']]\
+            .dropna().drop_duplicates()
+        prerequisites = defaultdict(set)
+        for sim, pre in zip(pairs['simulationConditionId'], pairs['preequilibrationConditionId']):
+            prerequisites[sim].add(pre)
+
+        queue = deque(reachable)
+        while queue:
+            for pre in prerequisites.pop(queue.popleft(), ()):
+                if pre not in reachable:
+                    reachable.add(pre)
+                    queue.append(pre)
+
+        return reachable
+
     def delay_secondary_conditions(
             self,
             measurements_df: pd.DataFrame, 
@@ -117,38 +145,79 @@ class Organizer:
         if 'preequilibrationConditionId' not in measurements_df.columns:
             return task_list
         
-        pre_conds = measurements_df['preequilibrationConditionId'].drop_duplicates().dropna().to_list()
+        pre_conds = set(measurements_df['preequilibrationConditionId'].dropna())
         # Since this is only called after topological sorting via Khan's alg., all 0-order conditions 
         # are first; the task_list is already ordered!
 
-        for idx, job in enumerate(task_list):
+        pause_ranks = max((self.workers - cell_count), 0)
+
+        if not pause_ranks:
+            return task_list
 
-            if job == None:
+        # Single pass: after the first job of a pre-condition, `pause_ranks` Nones are
+        # emitted once `cell_count` further slots (including that job) have been filled
+        delayed = []
+        pending = deque()   # [slots remaining, ...] per scheduled pause, in order
+
+        def emit(job) -> None:
+            delayed.append(job)
+            for schedule in pending:
+                schedule[0] -= 1
+            while pending and pending[0][0] <= 0:
+                pending.popleft()
+                for _ in range(pause_ranks):
+                    emit(None)
+
+        for job in task_list:
+
+            if job is None:
+                emit(job)
                 continue
 
-            cond_id = job.split("+")[0]
+            cond_id = job.rsplit("+", 1)[0]
 
             if cond_id in pre_conds:
+                pre_conds.discard(cond_id)
+                pending.append([cell_count])
+
+            emit(job)
+
+        # Pauses scheduled past the end of the list are appended
+        while pending:
+            pending.popleft()
+            delayed.extend([None] * pause_ranks)
+
+        return delayed
 
-                pause_ranks = max((self.workers - cell_count), 0)
+    def total_tasks(self, tasks: list, cell_count: int, chunk_size: int = 1) -> list:
+        """makes list of all tasks including replicate cells. With `chunk_size` > 1,
+        each task covers a contiguous block of cells: `cond+first-last`"""
+        if chunk_size <= 1:
+            cells = [str(cell) for cell in range(1, cell_count + 1)]
+            return [f"{cond}+{cell}" for cond in tasks for cell in cells]
 
-                while pause_ranks:
+        blocks = []
+        for first in range(1, cell_count + 1, chunk_size):
+            last = min(first + chunk_size - 1, cell_count)
+            blocks.append(f"{first}" if first == last else f"{first}-{last}")
 
-                    task_list.insert(idx+cell_count, None)
+        return [f"{cond}+{block}" for cond in tasks for block in blocks]
 
-                    pause_ranks -= 1
+    @staticmethod
+    def parse_task(task: str) -> tuple:
+        """Splits a task into its condition identifier and list of replicate cells"""
+        condition_id, cells = task.rsplit("+", 1)
 
-                pre_conds.pop(pre_conds.index(cond_id))
+        if "-" in cells:
+            first, last = cells.split("-")
+            return condition_id, list(range(int(first), int(last) + 1))
 
-        return task_list
+        return condition_id, [int(cells)]
 
-    def total_tasks(self, tasks: list, cell_count: int) -> list:
-        """makes list of all tasks including replicate cells"""
-        list_of_jobs = []
-        for cond in tasks:
-            for cell in range(1, cell_count + 1):
-                list_of_jobs.append(f"{cond}+{cell}")
-        return list_of_jobs
+    @staticmethod
+    def shard_name(shard) -> str:
+        """Cache shard of a chunked task, named after the first results entry it holds"""
+        return f"shard-{next(iter(shard))}"
 
     def assign_tasks(
             self, 
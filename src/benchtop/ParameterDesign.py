@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parameter set designs drawn from a PEtab parameter table. Varied parameters
+are sampled between their `lowerBound` and `upperBound` (on their
+`parameterScale`), single-level grids and estimated parameters the design holds
+fixed take their `nominalValue`. Every other model component keeps the value it
+has in the model and its conditions; noise and observable parameters are not
+model components and never appear in a set.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import logging
+import itertools
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DESIGNS = ("grid", "random", "lhs")
+
+# parameterScale -> (to scale, from scale)
+SCALES = {
+    "lin": (lambda x: x, lambda x: x),
+    "log": (np.log, np.exp),
+    "log10": (np.log10, lambda x: np.power(10.0, x)),
+}
+
+
+def parameter_sets(
+        parameter_df: pd.DataFrame,
+        design: str = "lhs",
+        size: Optional[int] = None,
+        levels: int = 3,
+        parameters: Optional[Sequence[str]] = None,
+        seed: Optional[int] = None,
+        measurement_df: Optional[pd.DataFrame] = None,
+        ) -> pd.DataFrame:
+    """Parameter sets of a design, one row per set and one column per varied
+    (or fixed estimated) parameter.
+
+    Parameters
+    ----------
+    parameter_df : pd.DataFrame
+        PEtab parameter table.
+
+    design : str, optional
+        'grid' (`levels` evenly spaced values per parameter, every
+        combination), 'random' (uniform) or 'lhs' (Latin hypercube).
+
+    size : int, optional
+        Number of parameter sets of random and Latin hypercube designs.
+
+    levels : int, optional
+        Values per parameter of grid designs; a single level is the nominal value.
+
+    parameters : sequence of str, optional
+        Parameters to vary; defaults to those with ``estimate == 1``. Other
+        estimated parameters are held at their nominal value.
+
+    seed : int, optional
+        Seed of random and Latin hypercube designs.
+
+    measurement_df : pd.DataFrame, optional
+        PEtab measurement table; parameters its `noiseParameters` and
+        `observableParameters` refer to are left out of the defaults.
+    """
+    if design not in DESIGNS:
+        raise ValueError(f"Unknown design '{design}', expected one of {', '.join(DESIGNS)}")
+
+    table = parameter_df.set_index("parameterId")
+
+    observation = _observation_parameters(measurement_df)
+
+    estimated = [
+        par for par in (table.index[table["estimate"].astype(int) == 1] if "estimate" in table.columns else [])
+        if par not in observation
+    ]
+
+    parameters = estimated if parameters is None else list(parameters)
+
+    missing = [par for par in parameters if par not in table.index]
+    if missing:
+        raise KeyError(f"Parameters {missing} not found in the parameter table")
+
+    if not parameters:
+        raise ValueError("No parameters to vary: set `estimate` to 1 or pass `parameters`")
+
+    lower, upper = _scaled_bounds(table.loc[parameters])
+
+    if design == "grid":
+        if levels < 1:
+            raise ValueError("Grid designs need at least one level per parameter")
+        if levels == 1:
+            unit = np.full((1, len(parameters)), np.nan)
+        else:
+            axes = [np.linspace(0.0, 1.0, levels)] * len(parameters)
+            unit = np.array(list(itertools.product(*axes)), dtype=float)
+
+    else:
+        if size is None or size < 1:
+            raise ValueError(f"'{design}' designs need the number of parameter sets (size)")
+
+        rng = np.random.default_rng(seed)
+
+        if design == "random":
+            unit = rng.random((size, len(parameters)))
+        else:
+            unit = _latin_hypercube(size, len(parameters), rng)
+
+    scaled = lower + unit * (upper - lower)
+
+    scales = table.loc[parameters, "parameterScale"] if "parameterScale" in table.columns \
+        else pd.Series("lin", index=parameters)
+
+    nominal = table["nominalValue"].astype(float) if "nominalValue" in table.columns \
+        else pd.Series(np.nan, index=table.index)
+
+    # Single-level grids (NaN unit positions) hold every parameter at its nominal value
+    values = {
+        par: np.where(np.isnan(unit[:, i]), nominal[par], SCALES[scales[par]][1](scaled[:, i]))
+        for i, par in enumerate(parameters)
+    }
+
+    # Estimated parameters the design does not vary keep their nominal value
+    values.update({par: np.full(len(unit), nominal[par]) for par in estimated if par not in values})
+
+    unset = [par for par, column in values.items() if np.isnan(column).any()]
+    if unset:
+        raise ValueError(f"Parameters {unset} need a nominalValue")
+
+    # Columns in parameter table order
+    sets = pd.DataFrame({str(par): values[par] for par in table.index if par in values})
+
+    sets.index.name = "parameterSet"
+
+    logger.debug(f"Designed {len(sets)} parameter sets ({design}) over {parameters}")
+
+    return sets
+
+
+def _observation_parameters(measurement_df: Optional[pd.DataFrame]) -> set:
+    """Parameter IDs referenced by the noise and observable parameters of measurements"""
+
+    if measurement_df is None:
+        return set()
+
+    referenced = set()
+
+    for col in ("noiseParameters", "observableParameters"):
+        if col in measurement_df.columns:
+            for value in measurement_df[col].dropna().astype(str):
+                referenced.update(par.strip() for par in value.split(";"))
+
+    return referenced
+
+
+def _scaled_bounds(table: pd.DataFrame) -> tuple:
+    """Lower and upper bounds of each parameter on its parameterScale"""
+
+    scales = table["parameterScale"] if "parameterScale" in table.columns \
+        else pd.Series("lin", index=table.index)
+
+    unknown = sorted(set(scales) - set(SCALES))
+    if unknown:
+        raise ValueError(f"Unsupported parameterScale {unknown}, expected one of {list(SCALES)}")
+
+    lower = table["lowerBound"].to_numpy(dtype=float)
+    upper = table["upperBound"].to_numpy(dtype=float)
+
+    if (lower > upper).any():
+        raise ValueError(f"lowerBound exceeds upperBound for {table.index[lower > upper].tolist()}")
+
+    logarithmic = (scales != "lin").to_numpy()
+    if (lower[logarithmic] <= 0).any():
+        raise ValueError("Log-scaled parameters need positive bounds")
+
+    to_scale = [SCALES[scale][0] for scale in scales]
+
+    return (
+        np.array([f(x) for f, x in zip(to_scale, lower)]),
+        np.array([f(x) for f, x in zip(to_scale, upper)]),
+    )
+
+
+def _latin_hypercube(size: int, dimensions: int, rng: np.random.Generator) -> np.ndarray:
+    """One point in every one of `size` equal strata of each dimension, within [0, 1)"""
+
+    strata = np.array([rng.permutation(size) for _ in range(dimensions)]).T
+
+    return (strata + rng.random((size, dimensions))) / size
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming population statistics of observables across cell replicates. Each
+cell's trajectory updates running moments (Welford) and a mergeable quantile
+sketch, so memory stays constant in the number of cells simulated.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class RunningMoments:
+    """Welford mean and variance of trajectories, elementwise over time"""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+
+    def update(self, values) -> None:
+        """Adds one trajectory, or a (cells x time) batch of trajectories"""
+
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+
+        batch = RunningMoments()
+        batch.count = values.shape[0]
+        batch.mean = values.mean(axis=0)
+        batch.m2 = ((values - batch.mean) ** 2).sum(axis=0)
+
+        self.merge(batch)
+
+    def merge(self, other: "RunningMoments") -> None:
+        """Combines moments of two populations (Chan et al. parallel update)"""
+
+        if other.count == 0:
+            return
+
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean.copy(), other.m2.copy()
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / count)
+        self.count = count
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Population variance across cells"""
+        return self.m2 / self.count
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch over trajectories (KLL-style compactors).
+
+    Level `h` holds trajectories that each stand for 2**h cells. When a level
+    exceeds `capacity`, each timepoint is sorted and every other value is
+    promoted to the next level, keeping memory logarithmic in the cell count.
+    """
+
+    __slots__ = ("capacity", "levels", "_rng")
+
+    def __init__(self, capacity: int = 128, seed: Optional[int] = None) -> None:
+        self.capacity = capacity
+        self.levels = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> None:
+        """Adds one trajectory, or a (cells x time) batch of trajectories"""
+        self._add(0, np.atleast_2d(np.asarray(values, dtype=float)))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Combines the sketch of another population into this one"""
+        for level, items in enumerate(other.levels):
+            if items is not None:
+                self._add(level, items)
+
+    def _add(self, level: int, items: np.ndarray) -> None:
+
+        while len(self.levels) <= level:
+            self.levels.append(None)
+
+        current = self.levels[level]
+        items = items if current is None else np.vstack([current, items])
+
+        if len(items) <= self.capacity:
+            self.levels[level] = items
+            return
+
+        # Keep an even number of items for compaction, the remainder stays
+        keep = len(items) % 2
+        remainder, items = items[:keep], np.sort(items[keep:], axis=0)
+
+        self.levels[level] = remainder if keep else None
+        self._add(level + 1, items[self._rng.integers(2)::2])
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> np.ndarray:
+        """Returns a (len(qs) x time) array of approximate quantiles"""
+
+        values = [items for items in self.levels if items is not None]
+        weights = [
+            np.full(len(items), 2.0 ** level)
+            for level, items in enumerate(self.levels) if items is not None
+        ]
+
+        values = np.vstack(values)
+        weights = np.concatenate(weights)
+
+        order = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        cumulative = np.cumsum(weights[order], axis=0)
+        total = cumulative[-1]
+
+        quantiles = []
+        for q in qs:
+            # first item whose cumulative weight reaches the requested rank
+            rank = np.argmax(cumulative >= q * total, axis=0)
+            quantiles.append(sorted_values[rank, np.arange(values.shape[1])])
+
+        return np.vstack(quantiles)
+
+
+class PopulationAggregator:
+    """Streaming statistics per (condition, observable), updated cell by cell"""
+
+    def __init__(self, quantiles: Sequence[float] = DEFAULT_QUANTILES, capacity: int = 128) -> None:
+        self.qs = tuple(quantiles)
+        self.capacity = capacity
+
+        # conditionId -> observableId -> [time, RunningMoments, QuantileSketch]
+        self.groups = {}
+
+    def update(self, conditionId: str, observables: dict) -> None:
+        """Adds one cell's observables ({observableId: {'simulation', 'time'}})"""
+
+        condition = self.groups.setdefault(conditionId, {})
+
+        for obsId, values in observables.items():
+
+            simulation = values.get('simulation')
+            if simulation is None:
+                continue
+
+            if obsId not in condition:
+                condition[obsId] = [
+                    np.asarray(values.get('time')),
+                    RunningMoments(),
+                    QuantileSketch(self.capacity),
+                ]
+
+            _, moments, sketch = condition[obsId]
+            moments.update(simulation)
+            sketch.update(simulation)
+
+    def merge(self, other: "PopulationAggregator") -> None:
+        """Combines the statistics of another aggregator, e.g. from another process"""
+
+        for conditionId, observables in other.groups.items():
+            condition = self.groups.setdefault(conditionId, {})
+
+            for obsId, (time, moments, sketch) in observables.items():
+                if obsId not in condition:
+                    condition[obsId] = [time, RunningMoments(), QuantileSketch(self.capacity)]
+                condition[obsId][1].merge(moments)
+                condition[obsId][2].merge(sketch)
+
+    def result(self) -> Dict[str, Dict[str, Dict[str, np.ndarray]]]:
+        """Returns {conditionId: {observableId: {statistic: array}}} for storage"""
+
+        summary = {}
+
+        for conditionId, observables in self.groups.items():
+            summary[conditionId] = {}
+
+            for obsId, (time, moments, sketch) in observables.items():
+                stats = {
+                    'time': time,
+                    'count': np.array([moments.count]),
+                    'mean': moments.mean,
+                    'variance': moments.variance,
+                    'std': moments.std,
+                }
+                for q, values in zip(self.qs, sketch.quantiles(self.qs)):
+                    stats[f'q{q:g}'] = values
+
+                summary[conditionId][obsId] = stats
+
+        return summary
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Binary snapshot cache of parsed PEtab problems. The first load pickles the
+parsed tables (protocol 5) with their array buffers stored out-of-band and
+aligned in the same file; later loads memory-map the file and rebuild the
+tables over those buffers, without parsing any TSV again.
+
+Snapshots are keyed by the path, size, modification time and content hash of
+every input file, so editing a table simply yields a new snapshot.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import mmap
+import pickle
+import struct
+import hashlib
+import logging
+import tempfile
+from typing import Any, Iterable, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BTSNAP01"
+FORMAT_VERSION = 1
+
+# Out-of-band buffers start on cache-line boundaries
+ALIGNMENT = 64
+
+# Snapshots are opt-in: set BENCHTOP_SNAPSHOT_DIR (or pass a directory) to
+# share them between experiments, e.g. ~/.cache/benchtop/petab
+DEFAULT_SNAPSHOT_DIR = os.environ.get("BENCHTOP_SNAPSHOT_DIR")
+
+
+class ProblemSnapshot:
+    """Snapshot of the objects parsed from a set of input files.
+
+    Parameters
+    ----------
+    snapshot_dir : str
+        Directory holding the snapshots.
+
+    paths : iterable of str
+        Every file the parsed objects were read from.
+
+    options : tuple, optional
+        Parsing options that change the parsed objects.
+    """
+
+    def __init__(
+            self,
+            snapshot_dir: Union[str, os.PathLike],
+            paths: Iterable[Union[str, os.PathLike]],
+            options: tuple = ()
+            ) -> None:
+
+        self.snapshot_dir = os.path.abspath(snapshot_dir)
+        self.key = fingerprint(paths, options)
+        self.path = os.path.join(self.snapshot_dir, f"{self.key}.snap")
+
+    def load(self) -> Optional[Any]:
+        """Returns the snapshot contents, None when there is no usable snapshot"""
+
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, 'rb') as f:
+                # Private mapping: pages are shared until a table is modified in place
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+            view = memoryview(mapped)
+
+            if bytes(view[:len(MAGIC)]) != MAGIC:
+                raise ValueError("not a problem snapshot")
+
+            count, payload_size = struct.unpack_from("<QQ", view, len(MAGIC))
+            table = struct.unpack_from(f"<{2 * count}Q", view, len(MAGIC) + 16)
+
+            payload_start = len(MAGIC) + 16 + 16 * count
+            payload = view[payload_start:payload_start + payload_size]
+            buffers = [view[offset:offset + size] for offset, size in zip(table[::2], table[1::2])]
+
+            contents = pickle.loads(payload, buffers=buffers)
+
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable problem snapshot {self.path}: {e}")
+            return None
+
+        logger.debug(f"Loaded problem snapshot {self.path}")
+
+        return contents
+
+    def save(self, contents: Any) -> None:
+        """Writes the snapshot atomically; failures only cost the next load a parse"""
+
+        buffers = []
+        payload = pickle.dumps(contents, protocol=5, buffer_callback=buffers.append)
+        buffers = [buffer.raw() for buffer in buffers]
+
+        offset = len(MAGIC) + 16 + 16 * len(buffers) + len(payload)
+        table = []
+        for buffer in buffers:
+            offset = _aligned(offset)
+            table.extend((offset, buffer.nbytes))
+            offset += buffer.nbytes
+
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+
+            # Concurrent jobs may write the same snapshot, the last rename wins
+            fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(struct.pack(f"<QQ{len(table)}Q", len(buffers), len(payload), *table))
+                f.write(payload)
+
+                for buffer, start in zip(buffers, table[::2]):
+                    f.write(b"\0" * (start - f.tell()))
+                    f.write(buffer)
+
+            os.replace(tmp_path, self.path)
+
+        except OSError as e:
+            if 'tmp_path' in locals() and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            logger.warning(f"Could not write problem snapshot {self.path}: {e}")
+            return
+
+        logger.debug(f"Saved problem snapshot {self.path}")
+
+
+def fingerprint(paths: Iterable[Union[str, os.PathLike]], options: tuple = ()) -> str:
+    """Hash of the path, size, mtime and contents of each file (plus the
+    parsing options, snapshot format and pandas version the tables are
+    pickled with)"""
+
+    digest = hashlib.sha256(f"{FORMAT_VERSION}\0{pd.__version__}\0{options!r}\0".encode())
+
+    for path in paths:
+        stat = os.stat(path)
+
+        # Paths are hashed as given too, parsed problems keep (SBML) paths relative to them
+        digest.update(f"{path}\0{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
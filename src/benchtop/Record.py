@@ -9,10 +9,14 @@ Author: Jonah R. Huggins
 
 import uuid
 import logging
+from typing import Optional
 
 import pandas as pd
 
+from Organizer import Organizer
 from ResultsCacher import ResultCache
+from SimulationResult import SimulationResult
+from SharedTables import ForkShared
 
 logging.basicConfig(
     level=logging.INFO, # Overriden if Verbose Arg. True
@@ -21,17 +25,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class Record:
+class Record(ForkShared):
     """Records results dictionary access across processes."""
     def __init__(
             self, 
             problem: dict,
             cache_dir: str = './.cache', 
-            load_index: bool = False
+            load_index: bool = False,
+            cell_count: Optional[int] = None
             ) -> None:
 
         self.problem = problem
 
+        # Sweeps simulate the problem's replicate cells once per parameter set
+        self.cell_count = problem.cell_count if cell_count is None else cell_count
+
+        # (conditionId, cell) -> results entry key, built on first lookup
+        self._entry_index = None
+
         # --- initial dictionary, replaced if cached index present ---
         results_dict = self.__results_dictionary()
 
@@ -54,24 +65,31 @@ class Record:
         conditions_df = self.problem.condition_files[0]
         measurement_df = self.problem.measurement_files[0]
 
-        results = {}
-
-        for idx, condition in conditions_df.iterrows():
-
-            condition_id = condition["conditionId"]
+        # Conditions no measurement reaches (shared condition libraries) get no entries
+        reachable = Organizer.reachable_conditions(measurement_df)
+        condition_ids = [cond for cond in conditions_df["conditionId"].tolist() if cond in reachable]
 
-            for cell in range(1, self.problem.cell_count+1):
-                if "datasetId" in measurement_df.columns:
-                    identifier = measurement_df["datasetId"]\
-                        [measurement_df["simulationConditionId"] == condition_id].values[0]
-                else:
-                    identifier = self.__identifier_generator()
-
-                results[identifier] = {
-                    "conditionId": condition_id,
-                    "cell": cell,
-                    "complete": False
-                }
+        if len(condition_ids) < len(conditions_df):
+            logger.debug(
+                f"Pruned {len(conditions_df) - len(condition_ids)} unreferenced condition rows"
+            )
+        cells = range(1, self.cell_count+1)
+
+        # One lookup table instead of filtering the measurements per (condition, cell)
+        datasets = {}
+        if "datasetId" in measurement_df.columns:
+            first = measurement_df.drop_duplicates("simulationConditionId")
+            datasets = dict(zip(first["simulationConditionId"], first["datasetId"]))
+
+        results = {
+            datasets.get(condition_id) or self.__identifier_generator(): {
+                "conditionId": condition_id,
+                "cell": cell,
+                "complete": False
+            }
+            for condition_id in condition_ids
+            for cell in cells
+        }
 
         return results
     
@@ -79,17 +97,57 @@ class Record:
             self, 
             condition_id: str, 
             cell: int
-            ) -> pd.DataFrame:
+            ) -> SimulationResult:
         """Indexes results dictionary on condition id, returns results"""
-        # results keys should all be species names paired with single numpy arrays. 
-        for key in self.cache.results_dict.keys():
-            if str(self.cache.results_dict[key]['conditionId']) == str(condition_id)\
-                and str(self.cache.results_dict[key]['cell']) == str(cell):
-                logger.debug(f"results found for {condition_id} and cell {cell}")
-                return self.cache.load(key)
-            
-        logger.error(f"No prior results found for {condition_id} at cell {cell}")
+        try:
+            key = self.entry_key(condition_id, cell)
+        except KeyError:
+            logger.error(f"No prior results found for {condition_id} at cell {cell}")
+            return None
+
+        logger.debug(f"results found for {condition_id} and cell {cell}")
+
+        return self.load_results(key)
+
+    def load_results(self, key: str) -> SimulationResult:
+        """Loads cached results of an entry by key"""
+        results = self.cache.load(key)
+
+        # observable-only entries keep just the final state of the simulation
+        if isinstance(results, dict):
+            return results.get("state")
+
+        return results
                     
+    def entry_key(
+            self,
+            condition_id: str,
+            cell: int
+            ) -> str:
+        """Returns the results dictionary key of a condition and replicate cell"""
+        return self.entry_keys(condition_id, (cell,))[0]
+
+    def entry_keys(
+            self,
+            condition_id: str,
+            cells
+            ) -> tuple:
+        """Returns the results dictionary keys of several cells of one condition"""
+
+        if self._entry_index is None:
+            self._entry_index = {
+                (str(entry['conditionId']), str(entry['cell'])): key
+                for key, entry in self.cache.results_dict.items()
+            }
+
+        index, condition_id = self._entry_index, str(condition_id)
+
+        try:
+            return tuple([index[(condition_id, str(cell))] for cell in cells])
+        except KeyError:
+            missing = next(cell for cell in cells if (condition_id, str(cell)) not in index)
+            raise KeyError(f"No results entry for {condition_id} at cell {missing}") from None
+
     def condition_cell_id(
         self,
         rank_task: str, 
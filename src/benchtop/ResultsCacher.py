@@ -3,7 +3,7 @@ import os
 import json
 import pickle
 import shutil
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
@@ -19,6 +19,18 @@ class ResultCache:
         self.cache_dir = os.path.abspath(cache_dir)
 
         self.cache_index_path = os.path.join(self.cache_dir, "cache_index.json")
+
+        # Status updates are appended here between compactions of the index
+        self.journal_path = os.path.join(self.cache_dir, "cache_index.journal")
+
+        # Storage options the cached results were simulated with, checked on resume
+        self.run_options_path = os.path.join(self.cache_dir, "run_options.json")
+
+        # Parameter sets of a sweep, cell blocks of the index simulate one set each
+        self.parameter_sets_path = os.path.join(self.cache_dir, "parameter_sets.tsv")
+
+        # Most recently read shard of a chunked task, entries are read consecutively
+        self._shard = (None, None)
         
         if load_index == False:
             if results_dict is None:
@@ -33,8 +45,7 @@ class ResultCache:
                 os.makedirs(self.cache_dir, exist_ok=False)
 
             # Write new cache index
-            with open(self.cache_index_path, 'w') as f:
-                json.dump(self.results_dict, f, indent=2)
+            self.compact()
 
         else:
             # Load existing cache index
@@ -44,8 +55,7 @@ class ResultCache:
                     "Run once with load_index=False to create it."
                 )
 
-            with open(self.cache_index_path, 'r') as f:
-                self.results_dict = json.load(f)
+            self.results_dict = self.read_cache_index()
 
 
     def _key_to_path(self, key: str) -> str:
@@ -53,40 +63,132 @@ class ResultCache:
 
         return os.path.join(self.cache_dir, f"{key}.pkl")
 
-    def update_cache_index(self, key: str, status: bool) -> None:
-        # Read the current cache
-        with open(self.cache_index_path, 'r') as f:
-            cache_data = json.load(f)
+    def update_cache_index(self, key: str, status: bool, shard: Optional[str] = None) -> None:
+        self.update_cache_entries([key], status, {key: shard} if shard is not None else None)
+
+    def update_cache_entries(
+            self, 
+            keys: List[str], 
+            status: bool, 
+            shards: Optional[Dict[str, str]] = None
+        ) -> None:
+        """Updates the completion status (and cache shard) of several entries.
+
+        The in-memory index is updated and a single line is appended to the
+        journal, so the cost of a round does not grow with the experiment size.
+        Entries completed without a shard were saved on their own, a shard they
+        were read from before (resumed chunked runs) no longer holds them.
+        """
+        shards = shards or {}
+
+        # Workers of later rounds read shards from the in-memory index
+        for key in keys:
+            entry = self.results_dict[key]
+            entry['complete'] = status
+
+            if key in shards:
+                entry['shard'] = shards[key]
+            elif status:
+                entry.pop('shard', None)
+
+        with open(self.journal_path, 'a') as f:
+            f.write(json.dumps({"keys": list(keys), "complete": status, "shards": shards}) + "\n")
 
-        # Update the entry
-        cache_data[key]['complete'] = status
+    def compact(self) -> None:
+        """Writes the full index to cache_index.json and clears the journal"""
 
-        # Write it back
+        # json.dumps without indent uses the C encoder, json.dump never does
         with open(self.cache_index_path, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+            f.write(json.dumps(self.results_dict))
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def save_run_options(self, options: Dict[str, Any]) -> None:
+        """Records the options the cached entries are simulated with"""
+        with open(self.run_options_path, 'w') as f:
+            json.dump(options, f, indent=2)
+
+    def read_run_options(self) -> Optional[Dict[str, Any]]:
+        """Options recorded by the run that filled the cache, None if unknown"""
+        if not os.path.exists(self.run_options_path):
+            return None
 
-    def save(self, key: str, df: pd.DataFrame) -> None:
-        """Save a single DataFrame under a key"""
+        with open(self.run_options_path, 'r') as f:
+            return json.load(f)
+
+    def save_parameter_sets(self, parameter_sets: pd.DataFrame) -> None:
+        """Records the parameter sets of a sweep filling the cache"""
+        parameter_sets.to_csv(self.parameter_sets_path, sep="\t")
+
+    def read_parameter_sets(self) -> Optional[pd.DataFrame]:
+        """Parameter sets of the sweep that filled the cache, None for plain runs"""
+        if not os.path.exists(self.parameter_sets_path):
+            return None
+
+        return pd.read_csv(self.parameter_sets_path, sep="\t", index_col="parameterSet")
+
+    def save(self, key: str, df: Any) -> None:
+        """Save a single simulation result (or observable payload) under a key"""
         path = self._key_to_path(key)
 
         with open(path, 'wb') as f:
             pickle.dump(df, f)
 
-    def load(self, key: str) -> pd.DataFrame:
-        """Load a single DataFrame by key"""
+    def save_shard(self, shard: str, payloads: Dict[str, Any]) -> None:
+        """Save the results of several entries (one chunked task) as a single file"""
+        path = self._key_to_path(shard)
+
+        with open(path, 'wb') as f:
+            pickle.dump(payloads, f)
+
+    def load(self, key: str) -> Any:
+        """Load a single simulation result by key"""
+
+        entry = self.results_dict.get(key)
+        shard = entry.get('shard') if isinstance(entry, dict) else None
+
+        if shard is not None:
+            return self._load_shard(shard)[key]
 
         path = self._key_to_path(key)
 
         with open(path, 'rb') as f:
             return pickle.load(f)
 
+    def _load_shard(self, shard: str) -> Dict[str, Any]:
+        """Loads a shard, reusing the last one read"""
+
+        if self._shard[0] != shard:
+            with open(self._key_to_path(shard), 'rb') as f:
+                self._shard = (shard, pickle.load(f))
+
+        return self._shard[1]
+
     def delete_cache(self) -> None:
         """Removes cache directory after results have been saved."""
         shutil.rmtree(self.cache_dir, ignore_errors=False)
 
     def read_cache_index(self) -> Dict[str, Any]:
-        """Read cache_index.json as dictionary"""
+        """Read cache_index.json as dictionary, including journaled updates"""
         with open(self.cache_index_path, 'r') as file:
             cache_index = json.load(file)
 
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r') as file:
+                for line in file:
+                    # A partially written final line is an update that never completed
+                    try:
+                        update = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+
+                    shards = update.get("shards", {})
+                    for key in update["keys"]:
+                        cache_index[key]['complete'] = update["complete"]
+                        if key in shards:
+                            cache_index[key]['shard'] = shards[key]
+                        elif update["complete"]:
+                            cache_index[key].pop('shard', None)
+
         return cache_index
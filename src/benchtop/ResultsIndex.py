@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indexed query layer over saved experiment results. Series metadata is kept in
+an SQLite table and values in flat, memory-mapped NumPy arrays, so filtering
+by condition, cell, observable and time range never loads a full experiment.
+
+Usage: python ResultsIndex.py <results store or archive> --observable LR-complex
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import sys
+import sqlite3
+import logging
+import argparse
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(__file__))
+from ResultsStore import ResultsStore, MANIFEST
+
+logger = logging.getLogger(__name__)
+
+INDEX_DB = "index.sqlite"
+VALUES_FILE = "values.npy"
+TIME_FILE = "time.npy"
+
+QUERY_COLUMNS = ["experiment", "conditionId", "cell", "observableId", "time", "simulation"]
+
+
+class ResultsIndex:
+    """Queryable index of a single results store (see `ResultsStore`)."""
+
+    def __init__(self, store_path: Union[str, os.PathLike], rebuild: bool = False) -> None:
+
+        self.store = ResultsStore(store_path)
+        self.path = self.store.path
+
+        self.db_path = os.path.join(self.path, INDEX_DB)
+
+        if rebuild or not os.path.exists(self.db_path):
+            self.build()
+
+        self.connection = sqlite3.connect(self.db_path)
+
+        # Values are only paged in for the rows a query selects
+        self.values = np.load(os.path.join(self.path, VALUES_FILE), mmap_mode='r')
+        self.time = np.load(os.path.join(self.path, TIME_FILE), mmap_mode='r')
+
+    def build(self) -> None:
+        """Reads every shard once, writing series metadata and concatenated values"""
+
+        rows = []
+        values = []
+        times = []
+        offset = 0
+
+        for key, metadata in self.store.manifest["entries"].items():
+
+            entry = self.store.entry(key)
+
+            for observable, simulation, time in _entry_series(entry):
+
+                if simulation is None or time is None:
+                    continue
+
+                if len(simulation) != len(time):
+                    logger.warning(
+                        "Skipping %s of entry %s: %d values for %d timepoints",
+                        observable, key, len(simulation), len(time)
+                    )
+                    continue
+
+                length = len(simulation)
+
+                rows.append((
+                    self.store.name,
+                    key,
+                    str(metadata["conditionId"]),
+                    int(metadata["cell"]),
+                    observable,
+                    offset,
+                    length,
+                    float(np.min(time)) if length else None,
+                    float(np.max(time)) if length else None,
+                ))
+
+                values.append(np.asarray(simulation, dtype=float))
+                times.append(np.asarray(time, dtype=float))
+                offset += length
+
+        np.save(os.path.join(self.path, VALUES_FILE), _concatenate(values))
+        np.save(os.path.join(self.path, TIME_FILE), _concatenate(times))
+
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(
+                """CREATE TABLE series (
+                    experiment TEXT,
+                    entry TEXT,
+                    conditionId TEXT,
+                    cell INTEGER,
+                    observableId TEXT,
+                    offset INTEGER,
+                    length INTEGER,
+                    t_min REAL,
+                    t_max REAL
+                )"""
+            )
+            connection.executemany(
+                "INSERT INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            connection.execute("CREATE INDEX idx_condition ON series (conditionId)")
+            connection.execute("CREATE INDEX idx_observable ON series (observableId)")
+
+        logger.info("Indexed %d series in %s", len(rows), self.path)
+
+    def series(
+            self,
+            conditionId: Union[str, Iterable[str], None] = None,
+            cell: Union[int, Iterable[int], None] = None,
+            observableId: Union[str, Iterable[str], None] = None,
+            time_range: Optional[Tuple[float, float]] = None,
+            ) -> pd.DataFrame:
+        """Returns the metadata rows of all series matching the filters"""
+
+        clauses = []
+        params = []
+
+        for column, value in (("conditionId", conditionId), ("cell", cell), ("observableId", observableId)):
+            if value is None:
+                continue
+            value = [value] if isinstance(value, (str, int, np.integer)) else list(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+            params.extend(str(v) if column != "cell" else int(v) for v in value)
+
+        if time_range is not None:
+            # Series overlapping the requested window
+            clauses.append("t_max >= ? AND t_min <= ?")
+            params.extend([float(time_range[0]), float(time_range[1])])
+
+        statement = "SELECT * FROM series"
+        if clauses:
+            statement += " WHERE " + " AND ".join(clauses)
+
+        return pd.read_sql_query(statement, self.connection, params=params)
+
+    def query(
+            self,
+            conditionId: Union[str, Iterable[str], None] = None,
+            cell: Union[int, Iterable[int], None] = None,
+            observableId: Union[str, Iterable[str], None] = None,
+            time_range: Optional[Tuple[float, float]] = None,
+            ) -> pd.DataFrame:
+        """Returns matching values in long format, one row per series timepoint
+
+        Parameters
+        ----------
+        conditionId, cell, observableId : optional
+            Single value or iterable of values to keep.
+
+        time_range : (float, float), optional
+            Inclusive window of simulation time to keep.
+        """
+        matches = self.series(conditionId, cell, observableId, time_range)
+
+        frames = []
+
+        for row in matches.itertuples(index=False):
+
+            window = slice(row.offset, row.offset + row.length)
+            time = np.asarray(self.time[window])
+            simulation = np.asarray(self.values[window])
+
+            if time_range is not None:
+                mask = (time >= time_range[0]) & (time <= time_range[1])
+                time, simulation = time[mask], simulation[mask]
+
+            frames.append(pd.DataFrame({
+                "experiment": row.experiment,
+                "conditionId": row.conditionId,
+                "cell": row.cell,
+                "observableId": row.observableId,
+                "time": time,
+                "simulation": simulation,
+            }))
+
+        if not frames:
+            return pd.DataFrame(columns=QUERY_COLUMNS)
+
+        return pd.concat(frames, ignore_index=True)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def find_stores(directory: Union[str, os.PathLike]) -> List[str]:
+    """Recursively lists results stores within an archive directory"""
+    stores = []
+    for root, _, files in os.walk(directory):
+        if MANIFEST in files:
+            stores.append(root)
+    return sorted(stores)
+
+
+def query_archive(directory: Union[str, os.PathLike], **filters) -> pd.DataFrame:
+    """Runs the same query over every results store found under `directory`"""
+
+    frames = []
+
+    for store_path in find_stores(directory):
+        index = ResultsIndex(store_path)
+        frames.append(index.query(**filters))
+        index.close()
+
+    if not frames:
+        return pd.DataFrame(columns=QUERY_COLUMNS)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _entry_series(entry):
+    """Yields (observableId, simulation, time) for an entry of either kind"""
+
+    if entry.kind == "trajectory":
+        time = entry["time"] if "time" in entry else None
+        for column in entry:
+            if column != "time":
+                yield column, entry[column], time
+        return
+
+    for observable in entry:
+        values = entry[observable]
+        yield observable, values["simulation"], values["time"]
+
+
+def _concatenate(arrays: list) -> np.ndarray:
+    if not arrays:
+        return np.empty(0, dtype=float)
+    return np.concatenate(arrays)
+
+
+def main(argv: Optional[list] = None) -> None:
+
+    parser = argparse.ArgumentParser(description="Query saved Benchtop results")
+    parser.add_argument("path", help="results store, or directory of results stores")
+    parser.add_argument("--condition", nargs="+", default=None, help="conditionId(s) to keep")
+    parser.add_argument("--cell", nargs="+", type=int, default=None, help="cell number(s) to keep")
+    parser.add_argument("--observable", nargs="+", default=None, help="observableId(s) to keep")
+    parser.add_argument("--time", nargs=2, type=float, default=None, metavar=("START", "STOP"),
+                        help="inclusive simulation time window")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild indexes before querying")
+    parser.add_argument("--output", default=None, help="write results to a .csv or .tsv file")
+    args = parser.parse_args(argv)
+
+    filters = dict(
+        conditionId=args.condition,
+        cell=args.cell,
+        observableId=args.observable,
+        time_range=args.time,
+    )
+
+    if args.rebuild:
+        for store_path in find_stores(args.path):
+            ResultsIndex(store_path, rebuild=True).close()
+
+    results = query_archive(args.path, **filters)
+
+    if args.output is None:
+        results.to_csv(sys.stdout, sep="\t", index=False)
+    else:
+        sep = "," if args.output.endswith(".csv") else "\t"
+        results.to_csv(args.output, sep=sep, index=False)
+
+
+if __name__ == '__main__':
+
+    main()
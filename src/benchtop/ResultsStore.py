@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sharded, lazily readable storage for final experiment results. Every results
+entry is written to its own NumPy archive (.npz) alongside a JSON manifest, so
+that opening a single observable never requires loading the whole experiment.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import json
+import shutil
+import logging
+from collections.abc import Mapping
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+SUMMARY = "summary.npz"
+FORMAT_VERSION = 1
+
+# Fields stored for every calculated observable
+OBSERVABLE_FIELDS = ("experiment", "simulation", "time")
+
+# Metadata keys of a results (or cache index) entry, everything else is an observable
+ENTRY_METADATA = ("conditionId", "cell", "complete", "shard")
+
+
+class ResultsStore(Mapping):
+    """Read-only view over a sharded results directory.
+
+    Indexing follows ``store[conditionId][cell][observableId]``; nothing is read
+    from disk until an observable (or trajectory column) is requested.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+
+        self.path = os.path.abspath(path)
+
+        manifest_path = os.path.join(self.path, MANIFEST)
+
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No results manifest found at {manifest_path}")
+
+        with open(manifest_path, 'r') as f:
+            self.manifest = json.load(f)
+
+        self.name = self.manifest.get("name")
+
+        # conditionId -> cell -> entry key
+        self._conditions = {}
+        for key, entry in self.manifest["entries"].items():
+            self._conditions.setdefault(str(entry["conditionId"]), {})[int(entry["cell"])] = key
+
+    def __getitem__(self, condition_id: str) -> "ConditionView":
+        return ConditionView(self, condition_id, self._conditions[str(condition_id)])
+
+    def __iter__(self):
+        return iter(self._conditions)
+
+    def __len__(self) -> int:
+        return len(self._conditions)
+
+    def entry(self, key: str) -> "EntryView":
+        """Returns the lazy view of a single results entry by its identifier"""
+        return EntryView(self, key)
+
+    def summary(self, condition_id: str) -> Dict[str, Dict[str, np.ndarray]]:
+        """Population statistics of each observable across the cells of a condition"""
+
+        observables = self.manifest.get("summary", {}).get(str(condition_id))
+
+        if observables is None:
+            raise KeyError(f"No summary statistics stored for condition {condition_id}")
+
+        with np.load(os.path.join(self.path, SUMMARY)) as shard:
+            return {
+                obs: {
+                    stat: shard[f"{condition_id}/{obs}/{stat}"]
+                    for stat in stats
+                }
+                for obs, stats in observables.items()
+            }
+
+    def shard_path(self, key: str) -> str:
+        """Absolute path of the shard holding a results entry"""
+        return os.path.join(self.path, self.manifest["entries"][key]["shard"])
+
+    @staticmethod
+    def write(
+            results_dict: Dict[str, Any],
+            directory: Union[str, os.PathLike],
+            name: Optional[str] = None,
+            cache=None,
+            summary: Optional[dict] = None,
+            ) -> str:
+        """Writes a results dictionary as a manifest plus one shard per entry.
+
+        Parameters
+        ----------
+        results_dict : dict
+            Either calculated observables (``ObservableCalculator.run``) or the
+            bare results index, in which case trajectories are read from `cache`.
+
+        directory : str
+            Store location. An existing results store there is replaced, any
+            other non-empty path raises FileExistsError.
+
+        cache : ResultCache, optional
+            Simulation cache used for entries without calculated observables.
+
+        summary : dict, optional
+            {conditionId: {observableId: {statistic: array}}} population statistics.
+
+        Returns
+        -------
+        str
+            Absolute path of the written store.
+        """
+        directory = os.path.abspath(directory)
+
+        # Only a previous results store is replaced, never an unrelated directory
+        if os.path.exists(os.path.join(directory, MANIFEST)):
+            shutil.rmtree(directory)
+        elif os.path.exists(directory) and (not os.path.isdir(directory) or os.listdir(directory)):
+            raise FileExistsError(f"{directory} exists and is not a results store, not replacing it")
+        os.makedirs(directory, exist_ok=True)
+
+        entries = {}
+
+        for key, entry in results_dict.items():
+
+            observables = {
+                obs: value for obs, value in entry.items()
+                if obs not in ENTRY_METADATA
+            }
+
+            if observables:
+                kind = "observables"
+                arrays = _flatten_observables(observables)
+                fields = list(observables)
+
+            elif cache is not None:
+                dataset = cache.load(key)
+
+                if isinstance(dataset, dict) and "observables" in dataset:
+                    # Reduced to observables by the Worker (observable-only runs)
+                    kind = "observables"
+                    arrays = _flatten_observables(dataset["observables"])
+                    fields = list(dataset["observables"])
+
+                    # Runs keeping only population aggregates store no cells
+                    if not fields:
+                        continue
+                else:
+                    kind = "trajectory"
+                    # DataFrames and SimulationResults both list their columns via keys()
+                    arrays = {col: _as_array(dataset[col]) for col in dataset.keys()}
+                    fields = list(arrays)
+
+            else:
+                raise ValueError(
+                    f"Entry {key} holds no observables and no cache was provided"
+                )
+
+            shard = f"{key}.npz"
+            np.savez(os.path.join(directory, shard), **arrays)
+
+            entries[key] = {
+                "conditionId": entry["conditionId"],
+                "cell": int(entry["cell"]),
+                "kind": kind,
+                "shard": shard,
+                "fields": fields,
+            }
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "name": name,
+            "entries": entries,
+        }
+
+        if summary:
+            arrays = {
+                f"{condition_id}/{obs}/{stat}": _as_array(value)
+                for condition_id, observables in summary.items()
+                for obs, stats in (observables or {}).items()
+                for stat, value in stats.items()
+            }
+            np.savez(os.path.join(directory, SUMMARY), **arrays)
+
+            manifest["summary"] = {
+                str(condition_id): {obs: list(stats) for obs, stats in (observables or {}).items()}
+                for condition_id, observables in summary.items()
+            }
+
+        with open(os.path.join(directory, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        logger.info("Saved %d results entries to %s", len(entries), directory)
+
+        return directory
+
+
+class ConditionView(Mapping):
+    """Cells of a single condition, keyed by cell number"""
+
+    def __init__(self, store: ResultsStore, condition_id: str, cells: dict) -> None:
+        self.store = store
+        self.condition_id = condition_id
+        self._cells = cells
+
+    def __getitem__(self, cell: int) -> "EntryView":
+        return EntryView(self.store, self._cells[int(cell)])
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+
+class EntryView(Mapping):
+    """Single results entry; observables are read from the shard on access"""
+
+    def __init__(self, store: ResultsStore, key: str) -> None:
+        self.store = store
+        self.key = key
+        self.metadata = store.manifest["entries"][key]
+
+    @property
+    def kind(self) -> str:
+        return self.metadata["kind"]
+
+    def __getitem__(self, field: str):
+
+        if field not in self.metadata["fields"]:
+            raise KeyError(field)
+
+        with np.load(self.store.shard_path(self.key)) as shard:
+
+            if self.kind == "trajectory":
+                return shard[field]
+
+            return {
+                name: shard[f"{field}/{name}"] if f"{field}/{name}" in shard.files else None
+                for name in OBSERVABLE_FIELDS
+            }
+
+    def __contains__(self, field) -> bool:
+        # Answered from the manifest, without opening the shard
+        return field in self.metadata["fields"]
+
+    def __iter__(self):
+        return iter(self.metadata["fields"])
+
+    def __len__(self) -> int:
+        return len(self.metadata["fields"])
+
+
+def _flatten_observables(observables: dict) -> Dict[str, np.ndarray]:
+    """Flattens {observableId: {field: array}} into npz-compatible keys"""
+    arrays = {}
+    for obs, values in observables.items():
+        for name in OBSERVABLE_FIELDS:
+            value = values.get(name)
+            # Formulas defined as null have no simulation values to store
+            if value is None:
+                continue
+            arrays[f"{obs}/{name}"] = _as_array(value)
+    return arrays
+
+
+def _as_array(value) -> np.ndarray:
+    """Converts results values to numeric arrays that can be stored without pickling"""
+    array = np.asarray(value)
+
+    if array.dtype == object:
+        # PEtab measurement columns may hold placeholders such as 'None'
+        array = pd.to_numeric(pd.Series(array.ravel()), errors='coerce')\
+            .to_numpy(dtype=float).reshape(array.shape)
+
+    return array
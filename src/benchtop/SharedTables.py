@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory-efficient PEtab tables for very large experiments. ID columns are read
+as categoricals (integer codes plus one copy of every distinct ID), optionally
+chunk by chunk, row indexes by condition and observable are built once, and
+tables are handed to forked worker processes through a registry instead of
+being pickled for every task.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import logging
+import multiprocessing as mp
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+logger = logging.getLogger(__name__)
+
+# PEtab columns holding identifiers, repeated on (up to millions of) rows
+ID_COLUMNS = (
+    "conditionId",
+    "simulationConditionId",
+    "preequilibrationConditionId",
+    "observableId",
+    "datasetId",
+)
+
+# Measurement table columns indexed by TableIndex
+MEASUREMENT_INDEX_COLUMNS = ("simulationConditionId", "preequilibrationConditionId", "observableId")
+
+# Objects shared with forked worker processes, by registry token
+_REGISTRY = {}
+
+
+def read_table(
+        path: Union[str, os.PathLike],
+        compact_ids: bool = False,
+        chunksize: Optional[int] = None,
+        ) -> pd.DataFrame:
+    """Reads a PEtab TSV table.
+
+    Parameters
+    ----------
+    compact_ids : bool, optional
+        Read ID columns as categoricals and return the table read-only.
+
+    chunksize : int, optional
+        Parse this many rows at a time, so only one chunk of raw strings is
+        held in memory before its IDs are converted to categorical codes.
+    """
+    dtype = dict.fromkeys(ID_COLUMNS, "category") if compact_ids else None
+
+    if chunksize is None:
+        table = pd.read_csv(path, sep="\t", dtype=dtype)
+    else:
+        with pd.read_csv(path, sep="\t", dtype=dtype, chunksize=chunksize) as reader:
+            table = _concat_chunks(list(reader))
+
+    return freeze_table(table) if compact_ids else table
+
+
+def freeze_table(table: pd.DataFrame) -> pd.DataFrame:
+    """Returns the table over read-only NumPy columns (categorical codes are
+    read-only already); in-place assignments raise instead of diverging
+    between processes"""
+
+    columns = {}
+    for col in table.columns:
+        values = table[col].array
+
+        if isinstance(values, pd.arrays.NumpyExtensionArray):
+            values = values.to_numpy().view()
+            values.flags.writeable = False
+
+        columns[col] = values
+
+    return pd.DataFrame(columns, index=table.index, copy=False)
+
+
+def _concat_chunks(chunks: list) -> pd.DataFrame:
+    """Concatenates chunks column by column, uniting the categories of ID columns"""
+
+    if len(chunks) == 1:
+        return chunks[0]
+
+    columns = {}
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            columns[col] = union_categoricals(_matching_categories([chunk[col] for chunk in chunks]))
+        else:
+            columns[col] = pd.concat([chunk[col] for chunk in chunks], ignore_index=True)
+
+    return pd.DataFrame(columns)
+
+
+def _matching_categories(parts: list) -> list:
+    """Chunks without any ID in a column (e.g. no preequilibration) infer empty
+    float categories; they take the categories dtype of the other chunks"""
+
+    dtypes = [part.cat.categories.dtype for part in parts if len(part.cat.categories)]
+
+    if not dtypes:
+        return parts
+
+    return [
+        part if len(part.cat.categories) else
+        part.cat.set_categories(pd.Index([], dtype=dtypes[0]))
+        for part in parts
+    ]
+
+
+class TableIndex:
+    """Row positions of a table grouped by the values of its ID columns.
+
+    Parameters
+    ----------
+    table : pd.DataFrame
+        Indexed table, e.g. a PEtab measurement table.
+
+    columns : sequence of str
+        ID columns to index; columns missing from the table are skipped.
+    """
+
+    def __init__(
+            self,
+            table: pd.DataFrame,
+            columns: Sequence[str] = MEASUREMENT_INDEX_COLUMNS
+            ) -> None:
+
+        # column -> ID -> sorted row positions
+        self.positions: Dict[str, Dict[str, np.ndarray]] = {
+            col: {
+                str(key): rows
+                for key, rows in table.groupby(col, sort=False, observed=True).indices.items()
+            }
+            for col in columns if col in table.columns
+        }
+
+    def rows(self, column: str, value: str) -> np.ndarray:
+        """Row positions where `column` equals `value`, empty if there are none"""
+        return self.positions.get(column, {}).get(str(value), np.empty(0, dtype=np.intp))
+
+    def by_condition(self, condition_id: str) -> np.ndarray:
+        """Measurement rows simulated under a condition"""
+        return self.rows("simulationConditionId", condition_id)
+
+    def by_observable(self, observable_id: str) -> np.ndarray:
+        """Measurement rows of an observable"""
+        return self.rows("observableId", observable_id)
+
+    def is_preequilibration(self, condition_id: str) -> bool:
+        """True if any measurement preequilibrates from the condition"""
+        return len(self.rows("preequilibrationConditionId", condition_id)) > 0
+
+
+class ForkShared:
+    """Mixin for large objects handed to worker processes. Once shared, an
+    instance pickles as a registry token when workers are forked, and forked
+    children read the copy they inherited instead of unpickling one per task.
+    """
+
+    _fork_token = None
+
+    def share(self) -> "ForkShared":
+        """Registers the object; workers forked afterwards inherit it"""
+        self._fork_token = id(self)
+        _REGISTRY[self._fork_token] = self
+        return self
+
+    def release(self) -> None:
+        """Unregisters the object, later pickles carry its full state again"""
+        _REGISTRY.pop(self._fork_token, None)
+        self._fork_token = None
+
+    def __reduce_ex__(self, protocol):
+        if _REGISTRY.get(self._fork_token) is self and forks_share_memory():
+            return (_shared, (self._fork_token,))
+
+        return super().__reduce_ex__(protocol)
+
+    def __getstate__(self):
+        # Unpickled copies are never registered themselves
+        state = self.__dict__.copy()
+        state.pop("_fork_token", None)
+        return state
+
+
+def forks_share_memory() -> bool:
+    """True if worker processes are forked from (and so inherit) the parent"""
+    method = mp.get_start_method(allow_none=True) or mp.get_all_start_methods()[0]
+    return method == "fork"
+
+
+def _shared(token: int):
+    """Looks up an object inherited from the parent process"""
+    try:
+        return _REGISTRY[token]
+    except KeyError:
+        raise RuntimeError(
+            "Shared object not found in this process; it must be shared before "
+            "the worker pool is started"
+        ) from None
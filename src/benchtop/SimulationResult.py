@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact container for a single simulation: one contiguous (time x column) float
+array, its time vector and an interned tuple of column names. Columns are read
+as array views through a shared name -> index map, without any pandas overhead.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import sys
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Column tuples and their index maps, shared by every result of the same model
+_COLUMNS: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Dict[str, int]]] = {}
+
+
+class SimulationResult:
+    """Simulated trajectories of one replicate cell.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        (time x column) array of simulated values.
+
+    time : np.ndarray
+        Simulation timepoints, one per row of `values`.
+
+    columns : iterable of str
+        Column (species) names, one per column of `values`.
+    """
+
+    __slots__ = ("values", "time", "columns", "_index")
+
+    def __init__(self, values, time, columns: Iterable[str]) -> None:
+
+        self.values = np.ascontiguousarray(values, dtype=float)
+        self.time = np.asarray(time, dtype=float)
+        self.columns, self._index = _intern_columns(columns)
+
+        if self.values.ndim != 2 or self.values.shape != (len(self.time), len(self.columns)):
+            raise ValueError(
+                f"Values of shape {self.values.shape} do not match "
+                f"{len(self.time)} timepoints and {len(self.columns)} columns"
+            )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "SimulationResult":
+        """Converts a results DataFrame with a `time` column"""
+        columns = [col for col in frame.columns if col != "time"]
+        time = frame["time"] if "time" in frame.columns else np.arange(len(frame))
+
+        return cls(frame[columns].to_numpy(dtype=float), time, columns)
+
+    @classmethod
+    def from_output(cls, output, time) -> "SimulationResult":
+        """Wraps simulator output (SimulationResult, array with `colnames`, or
+        anything a DataFrame accepts) on the given timepoints; any simulator time
+        column is dropped"""
+
+        if isinstance(output, SimulationResult):
+            return cls(output.values, time, output.columns)
+
+        if hasattr(output, "colnames"):
+            # roadrunner NamedArray, headers are written as `[species]`
+            values = np.asarray(output, dtype=float)
+            columns = [str(col).strip("[]") for col in output.colnames]
+        else:
+            frame = output if isinstance(output, pd.DataFrame) else pd.DataFrame(output)
+            values, columns = frame.to_numpy(dtype=float), list(frame.columns)
+
+        if "time" in columns:
+            keep = [i for i, col in enumerate(columns) if col != "time"]
+            values, columns = values[:, keep], [columns[i] for i in keep]
+
+        # Outputs without any columns still record their timepoints
+        if not columns:
+            values = np.empty((len(time), 0))
+
+        return cls(values, time, columns)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        if column == "time":
+            return self.time
+        try:
+            return self.values[:, self._index[column]]
+        except KeyError:
+            raise KeyError(column) from None
+
+    def __contains__(self, column) -> bool:
+        return column == "time" or column in self._index
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def keys(self) -> Tuple[str, ...]:
+        """Column names including `time`, as stored by the results store"""
+        return ("time",) + self.columns
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    def select(self, columns: Iterable[str]) -> "SimulationResult":
+        """Result restricted to the given columns, in the order they are stored"""
+        columns = set(columns)
+        keep = [i for i, col in enumerate(self.columns) if col in columns]
+
+        return SimulationResult(self.values[:, keep], self.time, [self.columns[i] for i in keep])
+
+    def last(self) -> "SimulationResult":
+        """Final timepoint only, e.g. the state handed off to dependent conditions"""
+        return SimulationResult(self.values[-1:], self.time[-1:], self.columns)
+
+    def final_state(self) -> Dict[str, float]:
+        """{column: value} at the final timepoint"""
+        return dict(zip(self.columns, self.values[-1].tolist()))
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame with a leading `time` column"""
+        frame = pd.DataFrame(self.values, columns=list(self.columns))
+        frame.insert(0, "time", self.time)
+        return frame
+
+    def __reduce__(self):
+        # The index map is rebuilt (and re-shared) on unpickling
+        return (SimulationResult, (self.values, self.time, self.columns))
+
+    def __repr__(self) -> str:
+        return f"SimulationResult({len(self.time)} timepoints x {len(self.columns)} columns)"
+
+
+def as_result(results) -> SimulationResult:
+    """Coerces cached or user supplied results (e.g. DataFrames) to a SimulationResult"""
+
+    if results is None or isinstance(results, SimulationResult):
+        return results
+
+    return SimulationResult.from_frame(results)
+
+
+def _intern_columns(columns: Iterable[str]) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    """Returns the shared column tuple and index map of a column list"""
+
+    columns = tuple(sys.intern(str(col)) for col in columns)
+
+    shared = _COLUMNS.get(columns)
+    if shared is None:
+        shared = _COLUMNS[columns] = (columns, {col: i for i, col in enumerate(columns)})
+
+    return shared
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registry of simulator wrappers (AbstractSimulator subclasses) by name. Entries
+are import paths (``module:Class``) resolved on first use, so a wrapper and its
+heavy dependencies (tellurium, amici, compiled extensions) are only imported by
+the processes that actually simulate with it.
+
+Third-party wrappers register through the ``benchtop.simulators`` entry point
+group, e.g. in a plugin's pyproject.toml::
+
+    [project.entry-points."benchtop.simulators"]
+    mysim = "mypackage.wrapper:MySimulator"
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import sys
+import logging
+import importlib
+from importlib.metadata import entry_points
+from typing import Dict, List, Union
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "benchtop.simulators"
+
+# Wrappers shipped in the repository's wrappers/ directory
+_BUILTIN = {
+    "tellurium": "wrappers.tellurium_wrapper:WrapTellurium",
+    "sparced": "wrappers.sparced_wrapper:WrapSPARCED",
+    "singlecell": "wrappers.SingleCell:SingleCell",
+}
+
+# name -> import path or already resolved class
+_REGISTRY: Dict[str, Union[str, type]] = dict(_BUILTIN)
+
+_entry_points_loaded = False
+
+
+def register(name: str, target: Union[str, type]) -> None:
+    """Registers a simulator under `name`, as a class or a lazy ``module:Class`` path"""
+
+    if isinstance(target, str) and ":" not in target:
+        raise ValueError(f"Simulator import path must look like 'module:Class', got '{target}'")
+
+    _REGISTRY[name.lower()] = target
+
+
+def available() -> List[str]:
+    """Names of every registered simulator, without importing any of them"""
+    _load_entry_points()
+    return sorted(_REGISTRY)
+
+
+def resolve(simulator: Union[str, type]) -> type:
+    """Returns the simulator class registered under a name (classes pass through)"""
+
+    if not isinstance(simulator, str):
+        return simulator
+
+    name = simulator.lower()
+
+    if name not in _REGISTRY:
+        _load_entry_points()
+
+    try:
+        target = _REGISTRY[name]
+    except KeyError:
+        raise KeyError(
+            f"Unknown simulator '{simulator}', available simulators: {', '.join(available())}"
+        ) from None
+
+    if isinstance(target, str):
+        target = _REGISTRY[name] = _import(target)
+
+    return target
+
+
+def _import(path: str) -> type:
+    """Imports ``module:Class`` and checks it is a simulator wrapper"""
+
+    module_name, _, class_name = path.partition(":")
+
+    # Bundled wrappers import from the repository root and src/benchtop
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    for directory in (root, os.path.dirname(__file__)):
+        if directory not in sys.path:
+            sys.path.append(directory)
+
+    logger.debug(f"Importing simulator {path}")
+
+    cls = getattr(importlib.import_module(module_name), class_name)
+
+    # Compared by name: wrappers may import AbstractSimulator through another module path
+    if not isinstance(cls, type) or \
+            not any(base.__name__ == "AbstractSimulator" for base in cls.__mro__):
+        raise TypeError(f"{path} is not an AbstractSimulator subclass")
+
+    return cls
+
+
+def _load_entry_points() -> None:
+    """Adds plugin simulators from installed entry points (once, lazily)"""
+    global _entry_points_loaded
+
+    if _entry_points_loaded:
+        return
+
+    _entry_points_loaded = True
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # Explicit registrations take precedence over installed plugins
+        _REGISTRY.setdefault(entry_point.name.lower(), entry_point.value)
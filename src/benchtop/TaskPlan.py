@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compiles an experiment once, in the parent process, into an immutable plan of
+typed simulation tasks. Each task carries everything a Worker needs (condition
+overrides, stop and output times, cache keys of its cells and of the results it
+preequilibrates from), so no PEtab table is filtered on the simulation hot path.
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import sys
+import logging
+from collections.abc import Mapping
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(__file__))
+from Organizer import Organizer
+
+logger = logging.getLogger(__name__)
+
+# Condition table columns that are metadata rather than model overrides
+CONDITION_METADATA = ("conditionId", "conditionName")
+
+
+class Task(NamedTuple):
+    """A single (possibly chunked) simulation task of one condition"""
+
+    label: str
+    conditionId: str
+    cells: Tuple[int, ...]
+    keys: Tuple[str, ...]
+    names: Tuple[str, ...]
+    values: tuple
+    stop_time: float
+    output_times: Optional[np.ndarray]
+    preconditionId: Optional[str]
+    # Cache keys of the preequilibration results of each cell; None when the
+    # task was not compiled from the plan and the Worker resolves it itself
+    precondition_keys: Optional[Tuple[Optional[str], ...]]
+    # Other conditions preequilibrate from this one, so its full state is kept
+    preequilibration: bool
+    # Swept parameters and their values for each cell, assigned before the
+    # preequilibrated state and condition overrides (parameter sweeps only)
+    parameter_names: Tuple[str, ...] = ()
+    parameter_values: Optional[Tuple[tuple, ...]] = None
+
+
+class TaskPlan(Mapping):
+    """Task label (``cond+cell`` or ``cond+first-last``) -> compiled Task.
+
+    Parameters
+    ----------
+    record : Record
+        Experiment record providing the PEtab problem and results entry keys.
+
+    labels : iterable of str
+        Task labels produced by the Organizer (None placeholders are skipped).
+
+    start : float
+        Simulation start time.
+
+    output_times : sequence of float, optional
+        Extra output times of sparse runs; None keeps the dense `step` grid.
+
+    parameter_sets : pd.DataFrame, optional
+        Parameter sweep, one row per parameter set. Cell ``c`` simulates
+        parameter set ``(c - 1) // replicates``.
+
+    replicates : int, optional
+        Replicate cells simulated per parameter set.
+    """
+
+    def __init__(
+            self,
+            record,
+            labels: Iterable[Optional[str]],
+            start: float = 0.0,
+            output_times: Optional[Sequence[float]] = None,
+            parameter_sets: Optional[pd.DataFrame] = None,
+            replicates: int = 1,
+            ) -> None:
+
+        conditions_df = record.problem.condition_files[0]
+        measurement_df = record.problem.measurement_files[0]
+
+        # Only conditions the measurements reach are ever compiled into tasks
+        reachable = Organizer.reachable_conditions(measurement_df)
+        conditions_df = conditions_df[conditions_df["conditionId"].isin(reachable)]
+
+        overrides = conditions_df.drop_duplicates("conditionId").set_index("conditionId")
+        overrides = overrides.drop(columns=[col for col in CONDITION_METADATA if col in overrides])
+
+        grouped = measurement_df.groupby("simulationConditionId", sort=False, observed=True)["time"]
+        stop_times = grouped.max().to_dict()
+        measured_times = grouped.unique().to_dict() if output_times is not None else None
+
+        preconditions = _first_preconditions(measurement_df)
+
+        preequilibrations = set()
+        if "preequilibrationConditionId" in measurement_df.columns:
+            preequilibrations = set(measurement_df["preequilibrationConditionId"].dropna().astype(str))
+
+        names = tuple(str(col) for col in overrides.columns)
+        values = dict(zip(overrides.index, overrides.itertuples(index=False, name=None)))
+
+        parameter_names, parameter_values = (), None
+        if parameter_sets is not None:
+            parameter_names = tuple(str(col) for col in parameter_sets.columns)
+            parameter_values = list(parameter_sets.itertuples(index=False, name=None))
+
+        self._tasks = {}
+
+        # Condition-level fields are shared by every task (cell block) of a condition
+        compiled = {}
+
+        for label in labels:
+            if label is None or label in self._tasks:
+                continue
+
+            condition_id, cells = Organizer.parse_task(label)
+
+            condition = compiled.get(condition_id)
+            if condition is None:
+                condition = compiled[condition_id] = self.__compile_condition(
+                    condition_id, values, stop_times, measured_times, start, output_times
+                )
+
+            stop_time, timepoints = condition
+            precondition_id = preconditions.get(condition_id)
+
+            self._tasks[label] = Task(
+                label=label,
+                conditionId=condition_id,
+                cells=tuple(cells),
+                keys=record.entry_keys(condition_id, cells),
+                names=names,
+                values=values[condition_id],
+                stop_time=stop_time,
+                output_times=timepoints,
+                preconditionId=precondition_id,
+                precondition_keys=_precondition_keys(record, precondition_id, cells),
+                preequilibration=condition_id in preequilibrations,
+                parameter_names=parameter_names,
+                parameter_values=None if parameter_values is None else tuple(
+                    parameter_values[(cell - 1) // replicates] for cell in cells
+                ),
+            )
+
+        logger.debug(f"Compiled {len(self._tasks)} tasks")
+
+    @staticmethod
+    def __compile_condition(
+            condition_id: str,
+            values: dict,
+            stop_times: dict,
+            measured_times: Optional[dict],
+            start: float,
+            output_times: Optional[Sequence[float]],
+            ) -> Tuple[float, Optional[np.ndarray]]:
+        """Stop time and (sparse runs) read-only output times of a condition"""
+
+        if condition_id not in values:
+            raise ValueError(f"Condition ID '{condition_id}' not found in conditions_df")
+
+        if condition_id not in stop_times:
+            raise ValueError(f"No simulation time defined for condition {condition_id}")
+
+        stop_time = float(stop_times[condition_id])
+
+        timepoints = None
+        if output_times is not None:
+            times = np.concatenate([
+                [start, stop_time],
+                np.asarray(measured_times[condition_id], dtype=float),
+                np.asarray(output_times, dtype=float),
+            ])
+            timepoints = np.unique(times[(times >= start) & (times <= stop_time)])
+            timepoints.setflags(write=False)
+
+        return stop_time, timepoints
+
+    def __getitem__(self, label: str) -> Task:
+        return self._tasks[label]
+
+    def __iter__(self):
+        return iter(self._tasks)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def tasks(self, labels: Iterable[Optional[str]]) -> list:
+        """Compiled tasks of a round, keeping None placeholders"""
+        return [None if label is None else self._tasks[label] for label in labels]
+
+
+def _first_preconditions(measurement_df: pd.DataFrame) -> dict:
+    """{simulationConditionId: preequilibrationConditionId or None}, taken from the
+    first measurement row of each condition"""
+
+    if "preequilibrationConditionId" not in measurement_df.columns:
+        return {}
+
+    first = measurement_df.drop_duplicates("simulationConditionId")
+
+    return {
+        str(cond): (
+            str(pre) if pd.notna(pre) and str(pre).strip().lower() != "nan" else None
+        )
+        for cond, pre in zip(first["simulationConditionId"], first["preequilibrationConditionId"])
+    }
+
+
+def _precondition_keys(record, precondition_id: Optional[str], cells) -> tuple:
+    """Results entries the cells preequilibrate from, None without a known precondition"""
+
+    if precondition_id is None:
+        return (None,) * len(cells)
+
+    try:
+        return record.entry_keys(precondition_id, cells)
+    except KeyError:
+        pass
+
+    keys = []
+    for cell in cells:
+        try:
+            keys.append(record.entry_key(precondition_id, cell))
+        except KeyError:
+            logger.error(f"No prior results found for {precondition_id} at cell {cell}")
+            keys.append(None)
+
+    return tuple(keys)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aligns simulated trajectories to experimental measurement times. Alignments are
+computed once per simulation time grid with `np.searchsorted` and applied to any
+number of trajectories (1-D, or stacked with time along the last axis).
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import numpy as np
+
+ALIGNMENT_METHODS = ("nearest", "linear", "spline")
+
+
+class TimeAlignment:
+    """Mapping of a simulation time grid onto a set of experimental timepoints.
+
+    Parameters
+    ----------
+    sim_time : np.array
+        Monotonically increasing simulation timepoints.
+
+    exp_time : np.array
+        Experimental timepoints, one per measurement row (duplicates allowed).
+
+    method : str
+        'nearest' picks the closest simulated timepoint, 'linear' and 'spline'
+        interpolate the trajectory at the experimental timepoints.
+    """
+
+    __slots__ = ("method", "sim_time", "exp_time", "indices", "_left", "_right", "_weights")
+
+    def __init__(self, sim_time, exp_time, method: str = "nearest") -> None:
+
+        if method not in ALIGNMENT_METHODS:
+            raise ValueError(f"Unknown alignment method '{method}', expected one of {ALIGNMENT_METHODS}")
+
+        self.method = method
+        self.sim_time = np.asarray(sim_time, dtype=float)
+        self.exp_time = np.asarray(exp_time, dtype=float)
+
+        self.indices = nearest_indices(self.sim_time, self.exp_time)
+
+        # Bracketing indices and weights for linear interpolation
+        right = np.clip(np.searchsorted(self.sim_time, self.exp_time, side="right"), 1, len(self.sim_time) - 1)
+        left = right - 1
+        span = self.sim_time[right] - self.sim_time[left]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = np.where(span > 0, (self.exp_time - self.sim_time[left]) / span, 0.0)
+
+        # Outside the simulated window the trajectory is held constant
+        self._weights = np.clip(weights, 0.0, 1.0)
+        self._left = left
+        self._right = right
+
+    def matches(self, sim_time) -> bool:
+        """True if the alignment was computed for the given simulation time grid"""
+        # grids sharing length and endpoints still differ inside (adaptive, sparse steps)
+        return np.array_equal(np.asarray(sim_time, dtype=float), self.sim_time)
+
+    def values(self, trajectory) -> np.ndarray:
+        """Reduces a trajectory (time along the last axis) to the experimental timepoints"""
+
+        trajectory = np.asarray(trajectory)
+
+        if self.method == "nearest":
+            return trajectory[..., self.indices]
+
+        if self.method == "linear":
+            return trajectory[..., self._left] * (1.0 - self._weights) \
+                + trajectory[..., self._right] * self._weights
+
+        try:
+            from scipy.interpolate import CubicSpline
+        except ImportError as e:
+            raise ImportError("Spline alignment requires scipy to be installed") from e
+
+        return CubicSpline(self.sim_time, trajectory, axis=-1)(self.exp_time)
+
+    def time(self) -> np.ndarray:
+        """Timepoints of the reduced trajectory"""
+
+        if self.method == "nearest":
+            return self.sim_time[self.indices]
+
+        return self.exp_time.copy()
+
+
+def nearest_indices(sim_time, exp_time) -> np.ndarray:
+    """Returns indicies of simulation time trajectories closest to experimental
+    equivalent timepoint recordings. Ties resolve to the earlier timepoint."""
+
+    sim_time = np.asarray(sim_time, dtype=float)
+    exp_time = np.asarray(exp_time, dtype=float)
+
+    if len(sim_time) == 0:
+        raise ValueError("Cannot align measurements to an empty simulation time grid")
+
+    right = np.clip(np.searchsorted(sim_time, exp_time, side="left"), 0, len(sim_time) - 1)
+    left = np.clip(right - 1, 0, None)
+
+    use_left = np.abs(exp_time - sim_time[left]) <= np.abs(sim_time[right] - exp_time)
+
+    return np.where(use_left, left, right)
@@ -11,12 +11,17 @@ Description:
 import gc
 import logging
 import multiprocessing as mp
+from typing import Optional, Union
 
 import numpy as np
 import pandas as pd
 
 from Record import Record
+from Organizer import Organizer
 from AbstractSimulator import AbstractSimulator
+from SimulationResult import SimulationResult, as_result
+from TaskPlan import Task
+from SimulatorRegistry import resolve
 
 logging.basicConfig(
     level=logging.DEBUG, # Overriden if Verbose Arg. True
@@ -25,45 +30,85 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def worker_method(
-        task: str, 
+        task: Union[Task, str], 
         record: Record,
-        simulator: AbstractSimulator,
+        simulator: Union[AbstractSimulator, str],
         args: tuple = (), 
         start: float = 0.0, 
-        step: float = 30.0
+        step: float = 30.0,
+        observable_calculator = None,
+        keep_cells: bool = True,
+        output_times = None,
+        selection = None,
             ):
     """Child process method for avoiding Multiprocessing from serializing Worker object"""
     # Instantiate and run inside the child process
-    Worker(task, 
+    grunt = Worker(task, 
            record, 
            simulator, 
-           args, start, step)
-    return None  # avoid returning the Worker itself
+           args, start, step,
+           observable_calculator=observable_calculator,
+           keep_cells=keep_cells,
+           output_times=output_times,
+           selection=selection)
+    # avoid returning the Worker itself, only the compact observables (if any)
+    return grunt.observables
 
 class Worker:
 
     def __init__(
             self,
-            task: str, 
+            task: Union[Task, str], 
             record: Record,
-            simulator: AbstractSimulator,
+            simulator: Union[AbstractSimulator, str],
             args: tuple = (), 
             start: float = 0.0, 
             step: float = 30.0,
+            observable_calculator = None,
+            keep_cells: bool = True,
+            output_times = None,
+            selection = None,
         ):
         """
-        simulator : AbstractSimulator
+        simulator : AbstractSimulator or str
             child class of abstract AbstractSimulator Class, defined as a
-            wrapper for a particular simulator
+            wrapper for a particular simulator, or its registered name
+            (imported in this process on first use)
 
         args : tuple, optional
             Extra arguments to pass to function.
+
+        observable_calculator : ObservableCalculator, optional
+            When provided, results are reduced to the task's observables before
+            caching (observable-only storage mode)
+
+        keep_cells : bool, optional
+            In observable-only mode, False caches only the final state needed for
+            preequilibration; per-cell observables are just returned to the parent
+
+        output_times : sequence of float, optional
+            When provided, the simulator is asked (via `simulate_at`) for output only
+            at the condition's measurement times, these extra (e.g. visualization)
+            times and the final time, instead of the dense `step` grid
+
+        selection : sequence of str, optional
+            Columns (species) needed downstream. Simulators are asked to record only
+            these, except for conditions other conditions preequilibrate from,
+            which keep their full state for the handoff
         """
         # self.lock = lock
         self.record = record
 
+        self.observable_calculator = observable_calculator
+        self.keep_cells = keep_cells
+        self.output_times = output_times
+        self.selection = selection
+
+        # (conditionId, cell, observables) of each completed task, for streaming statistics
+        self.observables = []
+
         # Store an instance of the simulator in worker class
-        self.simulator = simulator(*args)
+        self.simulator = resolve(simulator)(*args)
 
         # Run individual simulation
         self.__run_task(task, start, step)
@@ -74,7 +119,7 @@ class Worker:
 
     def __run_task(
             self, 
-            task: str,
+            task: Union[Task, str],
             start: float = 0.0,
             step: float = 30.0,
             ) -> dict:
@@ -85,45 +130,158 @@ class Worker:
 
                 return # No need to save anything if no simulation task
 
-            # Retrieve worker task:
-            condition, cell, condition_id = self.record.condition_cell_id(
-                rank_task=task,
-                conditions_df=self.record.problem.condition_files[0]
-            )
+            # Tasks normally arrive compiled by the parent's TaskPlan
+            if isinstance(task, str):
+                task = self.__compile_task(task, start)
+
+            condition_id = task.conditionId
 
-            logger.info(f"{rank} running {condition_id} for replicate {cell}")
+            logger.info(f"{rank} running {condition_id} for replicates {task.cells}")
             logger.debug(
                 f"Conditions for {condition_id} are: "
-                f"{[f'{i}: {j}' for i, j in zip(condition.index, condition.values)]}"
+                f"{[f'{i}: {j}' for i, j in zip(task.names, task.values)]}"
             )
 
-            # Overwrite base-state with dependency final values
+            # Restrict recorded columns unless the full state is handed off
+            columns = None
+            if self.selection is not None and not task.preequilibration:
+                columns = list(self.selection)
+                self.simulator.select(columns)
+
+            shard = {}
+
+            # One loaded simulator is reset between the cells of a chunked task
+            for i, (cell, key) in enumerate(zip(task.cells, task.keys)):
+                if i > 0:
+                    self.simulator.reset()
+
+                shard[key] = self.__simulate_cell(task, i, start, step, columns)
+
+                logger.info(f"{rank} finished {condition_id} for cell {cell}")
+
+            if len(shard) == 1:
+                # Save code to .cache directory
+                self.record.cache.save(key=key, df=shard[key])
+            else:
+                # Save the whole block as a single cache shard
+                self.record.cache.save_shard(Organizer.shard_name(shard), shard)
+
+            logger.info(f"Rank {rank} has completed {task.label}")
+
+    def __compile_task(self, task: str, start: float) -> Task:
+        """Builds a Task from a bare `cond+cell` string outside of a TaskPlan"""
+
+        condition, _, condition_id = self.record.condition_cell_id(
+            rank_task=task,
+            conditions_df=self.record.problem.condition_files[0]
+        )
+
+        # Chunked tasks cover a contiguous block of replicate cells
+        _, cells = Organizer.parse_task(task)
+
+        stop_time = self.__get_simulation_time(condition)
+
+        timepoints = None
+        if self.output_times is not None:
+            timepoints = self.__get_output_times(condition, start, stop_time)
+
+        return Task(
+            label=task,
+            conditionId=condition_id,
+            cells=tuple(cells),
+            keys=tuple(self.record.entry_key(condition_id, cell) for cell in cells),
+            names=tuple(condition.keys()),
+            values=tuple(condition.values.tolist()),
+            stop_time=stop_time,
+            output_times=timepoints,
+            preconditionId=None,
+            precondition_keys=None,
+            preequilibration=self.__is_preequilibration(condition_id),
+        )
+
+    def __simulate_cell(
+            self,
+            task: Task,
+            index: int,
+            start: float,
+            step: float,
+            columns: Optional[list] = None,
+            ) -> Union[SimulationResult, dict]:
+        """Sets the model state of a single replicate cell, simulates and packages the results"""
+
+        condition_id, cell = task.conditionId, task.cells[index]
+
+        # Swept parameters first, preequilibrated states and conditions override them
+        if task.parameter_values is not None:
+            self.__setModelState(task.parameter_names, task.parameter_values[index])
+
+        # Overwrite base-state with dependency final values
+        if task.precondition_keys is None:
             precondition_results = self.__extract_preequilibration_results(condition_id, cell)
-            if precondition_results:
-                self.__setModelState(
-                    list(precondition_results.keys()), 
-                    list(precondition_results.values())
-                )
+        else:
+            precondition_results = self.__load_precondition(task.precondition_keys[index])
+
+        if precondition_results:
+            self.__setModelState(
+                list(precondition_results.keys()), 
+                list(precondition_results.values())
+            )
+
+        # Assign conditions of Worker task to model
+        self.__setModelState(task.names, task.values)
+
+        results = self.__simulate(start, task.stop_time, step, task.output_times)
+
+        # Simulators ignoring the selection are projected here
+        if columns is not None:
+            results = results.select(columns)
 
-            # Assign conditions of Worker task to model
-            self.__setModelState(condition.keys(), condition.values.tolist())
+        # Observable-only storage mode persists reduced results
+        if self.observable_calculator is not None:
+            results = self.__reduce_to_observables(results, condition_id, task.preequilibration)
+            self.observables.append((condition_id, int(cell), results["observables"]))
 
-            # Retrieve simulation duration, simulate
-            stop_time = self.__get_simulation_time(condition)
-            results_array = self.simulator.simulate(start, stop_time, step)
-            
-            results = pd.DataFrame(results_array)
-            results['time'] = np.arange(int(start), stop_time+step, int(step))
+            if not self.keep_cells:
+                results = {"observables": {}, "state": results["state"]}
 
-            # package into dictionary !!! <-- remnant from code dev
-            parcel = self.__package_results(results, condition_id, cell)
+        return results
 
-            logger.info(f"{rank} finished {condition_id} for cell {cell}")
+    def __load_precondition(self, key: Optional[str]) -> dict:
+        """Final state of the results a cell preequilibrates from, by cache key"""
 
-            # Save code to .cache directory
-            self.__cache_results(parcel)
+        if key is None:
+            return {}
 
-            logger.info(f"Rank {rank} has completed {condition_id} for process {cell}")
+        precondition = as_result(self.record.load_results(key))
+
+        return {} if precondition is None else precondition.final_state()
+
+    def __simulate(
+            self,
+            start: float,
+            stop_time: float,
+            step: float,
+            timepoints: Optional[np.ndarray] = None,
+            ) -> SimulationResult:
+        """Simulates at the requested output times if the simulator supports it,
+        otherwise on the dense `step` grid"""
+
+        # output_times is cleared once the simulator turns out not to support it
+        if timepoints is not None and self.output_times is not None:
+            try:
+                return SimulationResult.from_output(self.simulator.simulate_at(timepoints), timepoints)
+
+            except NotImplementedError as e:
+                logger.warning(
+                    f"{type(self.simulator).__name__} cannot simulate at explicit output "
+                    f"times ({e}), falling back to the dense simulation grid"
+                )
+                self.output_times = None
+
+        return SimulationResult.from_output(
+            self.simulator.simulate(start, stop_time, step),
+            np.arange(int(start), stop_time+step, int(step))
+        )
 
     def __extract_preequilibration_results(
             self, 
@@ -141,9 +299,13 @@ class Worker:
 
         if 'preequilibrationConditionId' in measurement_df.columns:
             # Filter matching simulationConditionId
-            precondition_matches = measurement_df[
-                measurement_df['simulationConditionId'] == condition_id
-            ]
+            index = self.__measurement_index()
+            if index is not None:
+                precondition_matches = measurement_df.iloc[index.by_condition(condition_id)]
+            else:
+                precondition_matches = measurement_df[
+                    measurement_df['simulationConditionId'] == condition_id
+                ]
 
             if not precondition_matches.empty:
                 # Use iloc[0] to safely get the first preequilibrationConditionId
@@ -156,26 +318,60 @@ class Worker:
                                  f"cell: {cell} (type {type(cell)})")
                                 )
                     
-                    precondition_df = self.record.results_lookup(precondition_id, cell)
+                    precondition = as_result(self.record.results_lookup(precondition_id, cell))
                     
-                    if precondition_df is not None:
+                    if precondition is not None:
 
                         logger.info((
                             f"Extracting preequilibration condition {precondition_id}",
                             f"for condition {condition_id}"
                         ))
 
-                        if "time" in precondition_df.columns: 
-                            precondition_df = precondition_df.drop("time", axis = 1)
-
-                        precondition_results = precondition_df.iloc[-1].to_list()
-                        precondition_keys = list(precondition_df.columns)
-
-                        # convert to dict to maintain order of results to keys:
-                        precondition_dict = dict(zip(precondition_keys,precondition_results))
+                        # final state, in column order of the results
+                        precondition_dict = precondition.final_state()
 
         return precondition_dict
     
+    def __reduce_to_observables(
+            self,
+            results: SimulationResult,
+            condition_id: str,
+            keep_state: Optional[bool] = None,
+            ) -> dict:
+        """
+        Evaluates the observables and measurement-time downsampling of a task. The 
+        final state is kept only when other conditions preequilibrate from it.
+        """
+        state = None
+
+        results = as_result(results)
+
+        if keep_state is None:
+            keep_state = self.__is_preequilibration(condition_id)
+
+        if keep_state:
+            state = results.last()
+
+        observables = self.observable_calculator.calculate_dataset(results, condition_id)
+
+        return {"observables": observables, "state": state}
+
+    def __is_preequilibration(self, condition_id: str) -> bool:
+        """True if other conditions preequilibrate from this condition's final state"""
+        index = self.__measurement_index()
+        if index is not None:
+            return index.is_preequilibration(condition_id)
+
+        measurement_df = self.record.problem.measurement_files[0]
+
+        return 'preequilibrationConditionId' in measurement_df.columns and \
+            bool((measurement_df['preequilibrationConditionId'] == condition_id).any())
+
+    def __measurement_index(self):
+        """TableIndex of the measurement table, None for problems loaded without one"""
+        indexes = getattr(self.record.problem, "measurement_index", None)
+        return indexes[0] if isinstance(indexes, list) and indexes else None
+
     def __setModelState(self, names: list, states: list) -> None:
         """Set model state with list of floats"""
         
@@ -187,16 +383,28 @@ class Worker:
         # Drop unwanted metadata keys
         blacklist_names = ["conditionId", "conditionName"]
 
-        for name, state in zip(names, states):
-            if name in blacklist_names:
-                continue
+        assignments = [
+            (name, state) for name, state in zip(names, states)
+            if name not in blacklist_names
+        ]
+
+        for name, _ in assignments:
             if not isinstance(name, str):
                 raise TypeError(f"Invalid component name type: {name} ({type(name)})")
-            logger.debug(f"Modifying variable {name} with value {state}")
-            
-            self.simulator.modify(name, state)
+
+        # Checked on the class, wrappers may import AbstractSimulator by another path
+        if getattr(type(self.simulator), "set_values", None) is not None:
+            # One bulk assignment per simulator instead of a call per component
+            self.simulator.set_values(
+                [name for name, _ in assignments],
+                [state for _, state in assignments]
+            )
+        else:
+            for name, state in assignments:
+                logger.debug(f"Modifying variable {name} with value {state}")
+                self.simulator.modify(name, state)
                 
-        logger.debug("Updated model state")
+        logger.debug(f"Updated model state ({len(assignments)} components)")
 
     def __get_simulation_time(
             self, 
@@ -205,11 +413,7 @@ class Worker:
         """
         Returns the simulation time for a condition. Raises an error if time is undefined.
         """
-        #Only supporting one problem per config file 
-        measurement_df = self.record.problem.measurement_files[0]
-        matching_times = measurement_df.loc[
-            measurement_df["simulationConditionId"].isin(condition), "time"
-        ]
+        matching_times = self.__get_measurement_times(condition)
 
         if matching_times.empty:
             raise ValueError(
@@ -218,42 +422,35 @@ class Worker:
 
         return matching_times.max()
 
-    def __cache_results(
-            self, 
-            parcel: dict
-            ) -> None:
-        """Saves simulation results to cache directory"""
-
-        condition_id = parcel['conditionId']
-        cell = parcel["cell"]
-        results = parcel['results']
-
-        for key in self.record.cache.results_dict.keys(): 
-
-            if str(self.record.cache.results_dict[key]['conditionId']) == str(condition_id) \
-                and str(self.record.cache.results_dict[key]['cell']) == str(cell): 
-
-                # Save results to temporary cache directory
-                self.record.cache.save(key=key, df=results)
+    def __get_measurement_times(
+            self,
+            condition: pd.Series
+            ) -> pd.Series:
+        """Returns the measurement times recorded for a condition"""
+        #Only supporting one problem per config file 
+        measurement_df = self.record.problem.measurement_files[0]
 
+        # Row positions precomputed in the parent, no scan of the measurement table
+        index = self.__measurement_index()
+        if index is not None:
+            return measurement_df["time"].iloc[index.by_condition(condition["conditionId"])]
 
-        # Saves individual simulation data in cache directory
+        return measurement_df.loc[
+            measurement_df["simulationConditionId"] == condition["conditionId"], "time"
+        ]
 
-    def __package_results(
+    def __get_output_times(
             self,
-            results: pd.DataFrame,
-            condition_id: str,
-            cell: str,
-        ) -> dict:
-        """
-        Combines results, condition identifier, and cell number into dict for storage, 
-        """
-
-        # make a dict entry in rank_results for every column in results
-        rank_results = {
-            "conditionId": condition_id,
-            "cell": int(cell),
-            "results": results,
-        }
-
-        return rank_results
+            condition: pd.Series,
+            start: float,
+            stop_time: float,
+            ) -> np.ndarray:
+        """Sorted unique output times: start, measurement and extra times, final time"""
+
+        times = np.concatenate([
+            [start, stop_time],
+            self.__get_measurement_times(condition).to_numpy(dtype=float),
+            np.asarray(self.output_times, dtype=float),
+        ])
+
+        return np.unique(times[(times >= start) & (times <= stop_time)])
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Runs the Benchtop command-line interface: ``python -m src.benchtop --help``
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+from cli import main
+
+if __name__ == '__main__':
+
+    main()
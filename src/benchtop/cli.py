@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Command-line interface of Benchtop.
+
+    python -m src.benchtop run path/to/experiment.yaml --simulator tellurium
+    python -m src.benchtop resume path/to/experiment.yaml --cache-dir ./.cache
+    python -m src.benchtop observables path/to/experiment.yaml
+    python -m src.benchtop bench path/to/experiment.yaml --repeats 3
+    python -m src.benchtop sweep path/to/experiment.yaml --design lhs --size 100
+    python -m src.benchtop cache stats ./.cache
+    python -m src.benchtop inspect-plan path/to/experiment.yaml --cores 64
+
+Every subcommand accepts --profile to write cProfile statistics of the
+command (use --executor serial to include the simulations themselves).
+
+Author: Jonah R. Huggins
+"""
+# -----------------------Package Import & Defined Arguements-------------------#
+import os
+import sys
+import json
+import time
+import pstats
+import logging
+import argparse
+import cProfile
+from typing import Optional
+
+sys.path.append(os.path.dirname(__file__))
+
+logger = logging.getLogger(__name__)
+
+# Experiment, Organizer, ... pull in pandas and the simulation stack; they are
+# imported by the subcommands that need them so `--help` returns immediately.
+
+
+def main(argv: Optional[list] = None) -> None:
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    if args.profile is None:
+        args.handler(args)
+        return
+
+    profiler = cProfile.Profile()
+    profiler.runcall(args.handler, args)
+    profiler.dump_stats(args.profile)
+
+    stats = pstats.Stats(profiler, stream=sys.stderr).sort_stats(args.profile_sort)
+    stats.print_stats(args.profile_top)
+
+
+def build_parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(prog="benchtop", description="In-silico experiments of biological models")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    common.add_argument("--profile", default=None, metavar="FILE",
+                        help="write cProfile statistics of the command to FILE")
+    common.add_argument("--profile-top", type=int, default=25, help="profile rows printed to stderr")
+    common.add_argument("--profile-sort", default="cumulative", help="pstats sort key")
+
+    # --- experiment loading ---
+    loading = argparse.ArgumentParser(add_help=False)
+    loading.add_argument("--cores", type=int, default=os.cpu_count(), help="worker processes")
+    loading.add_argument("--cache-dir", dest="cache_dir", default="./.cache", help="simulation cache directory")
+    # ProblemSnapshot.DEFAULT_SNAPSHOT_DIR, read here so `--help` does not import pandas
+    loading.add_argument("--snapshot-dir", default=os.environ.get("BENCHTOP_SNAPSHOT_DIR"),
+                         help="parsed PEtab snapshot directory (default: $BENCHTOP_SNAPSHOT_DIR, none)")
+    loading.add_argument("--no-snapshot", dest="snapshot_dir", action="store_const", const=None,
+                         help="always parse the PEtab tables")
+    loading.add_argument("--compact-ids", action="store_true",
+                         help="categorical, read-only PEtab ID columns (huge tables)")
+    loading.add_argument("--read-chunksize", dest="chunksize", type=int, default=None,
+                         help="PEtab table rows parsed at a time")
+
+    # --- simulation ---
+    simulation = argparse.ArgumentParser(add_help=False)
+    simulation.add_argument("--simulator", default="singlecell",
+                            help="registered simulator name (see `benchtop inspect-plan --simulators`)")
+    simulation.add_argument("--executor", choices=("process", "serial"), default="process",
+                            help="process pool per round, or serial in this process")
+    simulation.add_argument("--start-method", choices=("fork", "spawn", "forkserver"), default=None,
+                            help="multiprocessing start method of the process executor")
+    simulation.add_argument("--start", type=float, default=0.0, help="simulation start time")
+    simulation.add_argument("--step", type=float, default=30.0, help="dense output time step")
+
+    # --- observables ---
+    observables = argparse.ArgumentParser(add_help=False)
+    observables.add_argument("--alignment", choices=("nearest", "linear", "spline"), default="nearest",
+                             help="measurement-time alignment of simulations")
+    observables.add_argument("--summary", action="store_true",
+                             help="store population statistics of each observable")
+    observables.add_argument("--output", default=None, help="results directory")
+
+    # run
+    run = subparsers.add_parser("run", parents=[common, loading, simulation, observables],
+                                help="simulate an experiment and store its results")
+    run.add_argument("path", nargs="?", default=None, help="PEtab experiment YAML")
+    run.add_argument("--run-all", dest="run_all", default=None, metavar="DIR",
+                     help="run every experiment YAML found under DIR")
+    add_granularity_arguments(run)
+    run.add_argument("--observables-only", action="store_true",
+                     help="workers cache observables instead of trajectories")
+    run.add_argument("--population-stats", action="store_true",
+                     help="stream population statistics across cells")
+    run.add_argument("--no-keep-cells", dest="keep_cells", action="store_false",
+                     help="with --population-stats, keep only the aggregates")
+    run.add_argument("--sparse-output", action="store_true",
+                     help="simulate only at measurement times")
+    run.add_argument("--project-columns", action="store_true",
+                     help="record only species used by observables")
+    run.add_argument("--no-observables", dest="No_Observables", action="store_true",
+                     help="stop after simulating, keep the cache")
+    run.set_defaults(handler=run_command, load_index=False)
+
+    # resume
+    resume = subparsers.add_parser("resume", parents=[common, loading, simulation, observables],
+                                   help="finish the incomplete simulations of a cached experiment")
+    resume.add_argument("path", help="PEtab experiment YAML")
+    resume.add_argument("--observables-only", action="store_const", const=True, default=None,
+                        help="(default: storage mode of the interrupted run)")
+    resume.add_argument("--population-stats", action="store_const", const=True, default=None,
+                        help="(default: storage mode of the interrupted run)")
+    resume.add_argument("--no-keep-cells", dest="keep_cells", action="store_const", const=False,
+                        default=None, help="(default: storage mode of the interrupted run)")
+    resume.add_argument("--sparse-output", action="store_const", const=True, default=None,
+                        help="(default: output grid of the interrupted run)")
+    resume.add_argument("--project-columns", action="store_const", const=True, default=None,
+                        help="(default: recorded columns of the interrupted run)")
+    resume.add_argument("--no-observables", dest="No_Observables", action="store_true",
+                        help="stop after simulating, keep the cache")
+    resume.set_defaults(handler=resume_command)
+
+    # observables
+    observe = subparsers.add_parser("observables", parents=[common, loading, observables],
+                                    help="calculate observables of a completed cache and store results")
+    observe.add_argument("path", help="PEtab experiment YAML")
+    observe.set_defaults(handler=observables_command)
+
+    # sweep
+    sweep = subparsers.add_parser("sweep", parents=[common, loading, simulation, observables],
+                                  help="simulate an experiment over many parameter sets")
+    sweep.add_argument("path", help="PEtab experiment YAML")
+    sweep.add_argument("--design", choices=("grid", "random", "lhs"), default="lhs",
+                       help="parameter set design drawn from the PEtab parameter table")
+    sweep.add_argument("--size", type=int, default=None, help="parameter sets of random and lhs designs")
+    sweep.add_argument("--levels", type=int, default=3, help="values per parameter of grid designs")
+    sweep.add_argument("--parameters", nargs="+", default=None,
+                       help="parameters to vary (default: estimated parameters)")
+    sweep.add_argument("--seed", type=int, default=None, help="random seed of the design")
+    sweep.add_argument("--parameter-sets", dest="parameter_sets", default=None, metavar="TSV",
+                       help="explicit parameter sets (one column per parameter) instead of a design")
+    sweep.add_argument("--chunk-size", dest="chunk_size", type=int, default=None,
+                       help="parameter sets simulated per task (default: about one task per core)")
+    sweep.add_argument("--observables-only", action="store_true",
+                       help="workers cache observables instead of trajectories")
+    sweep.add_argument("--no-observables", dest="No_Observables", action="store_true",
+                       help="stop after simulating, keep the cache")
+    sweep.set_defaults(handler=sweep_command)
+
+    # bench
+    bench = subparsers.add_parser("bench", parents=[common, loading, simulation],
+                                  help="time loading, simulation and observables of an experiment")
+    bench.add_argument("path", help="PEtab experiment YAML")
+    bench.add_argument("--repeats", type=int, default=1, help="number of timed repetitions")
+    add_granularity_arguments(bench)
+    bench.add_argument("--observables-only", action="store_true",
+                       help="workers cache observables instead of trajectories")
+    bench.add_argument("--sparse-output", action="store_true",
+                       help="simulate only at measurement times")
+    bench.add_argument("--project-columns", action="store_true",
+                       help="record only species used by observables")
+    bench.add_argument("--json", action="store_true", help="one JSON object per repetition")
+    bench.set_defaults(handler=bench_command)
+
+    # cache
+    cache = subparsers.add_parser("cache", parents=[common], help="inspect and maintain a simulation cache")
+    cache.add_argument("action", choices=("stats", "gc", "export"))
+    cache.add_argument("cache_dir", nargs="?", default="./.cache", help="simulation cache directory")
+    cache.add_argument("--output", default=None, help="results store written by `export`")
+    cache.add_argument("--dry-run", action="store_true", help="`gc` only lists what it would delete")
+    cache.set_defaults(handler=cache_command)
+
+    # inspect-plan
+    inspect = subparsers.add_parser("inspect-plan", parents=[common, loading],
+                                    help="show the task plan of an experiment without simulating")
+    inspect.add_argument("path", nargs="?", default=None, help="PEtab experiment YAML")
+    add_granularity_arguments(inspect)
+    inspect.add_argument("--rounds", type=int, default=5, help="rounds listed in full")
+    inspect.add_argument("--simulators", action="store_true", help="list registered simulators")
+    inspect.set_defaults(handler=inspect_plan_command)
+
+    return parser
+
+
+def add_granularity_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--chunk-size", dest="chunk_size", type=int, default=1,
+                        help="replicate cells simulated per task")
+
+
+def run_command(args: argparse.Namespace) -> None:
+    """Runs experiments through the launcher's Experimentalist"""
+    from launcher import Experimentalist
+
+    set_start_method(args)
+
+    if args.path is None and args.run_all is None:
+        raise SystemExit("benchtop run: provide an experiment YAML or --run-all DIR")
+
+    Experimentalist(args)
+
+
+def resume_command(args: argparse.Namespace) -> None:
+
+    set_start_method(args)
+
+    experiment = load_experiment(args, load_index=True)
+    experiment.resume(
+        args.simulator,
+        start=args.start,
+        step=args.step,
+        executor=args.executor,
+        observables_only=args.observables_only,
+        population_stats=args.population_stats,
+        keep_cells=args.keep_cells,
+        sparse_output=args.sparse_output,
+        project_columns=args.project_columns,
+    )
+
+    if not args.No_Observables:
+        observables_for(experiment, args)
+
+
+def observables_command(args: argparse.Namespace) -> None:
+
+    experiment = load_experiment(args, load_index=True)
+
+    incomplete = sum(not entry["complete"] for entry in experiment.record.cache.results_dict.values())
+    if incomplete:
+        raise SystemExit(f"benchtop observables: {incomplete} simulations are incomplete, resume first")
+
+    observables_for(experiment, args)
+
+
+def sweep_command(args: argparse.Namespace) -> None:
+
+    set_start_method(args)
+
+    parameter_sets = args.design
+    if args.parameter_sets is not None:
+        import pandas as pd
+        parameter_sets = pd.read_csv(args.parameter_sets, sep="\t")
+
+    experiment = load_experiment(args)
+    experiment.sweep(
+        args.simulator,
+        parameter_sets,
+        size=args.size,
+        levels=args.levels,
+        parameters=args.parameters,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        start=args.start,
+        step=args.step,
+        observables_only=args.observables_only,
+        executor=args.executor,
+    )
+
+    if not args.No_Observables:
+        observables_for(experiment, args)
+
+
+def bench_command(args: argparse.Namespace) -> None:
+    """Times each stage of an experiment; the cache is removed after every repetition"""
+    from Experiment import Experiment
+
+    set_start_method(args)
+
+    for repeat in range(args.repeats):
+        timings = {"repeat": repeat}
+
+        started = time.perf_counter()
+        experiment = Experiment(
+            args.path,
+            cores=args.cores,
+            cache_dir=args.cache_dir,
+            snapshot_dir=args.snapshot_dir,
+            compact_ids=args.compact_ids,
+            chunksize=args.chunksize,
+        )
+        timings["load_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        experiment.run(
+            args.simulator,
+            start=args.start,
+            step=args.step,
+            chunk_size=args.chunk_size,
+            observables_only=args.observables_only,
+            sparse_output=args.sparse_output,
+            project_columns=args.project_columns,
+            executor=args.executor,
+        )
+        timings["simulate_s"] = time.perf_counter() - started
+
+        import ObservableCalculator as obs
+
+        started = time.perf_counter()
+        obs.ObservableCalculator(experiment).run()
+        timings["observables_s"] = time.perf_counter() - started
+
+        timings["tasks"] = len(experiment.record.cache.results_dict)
+        experiment.record.cache.delete_cache()
+
+        if args.json:
+            print(json.dumps(timings))
+        else:
+            print("\t".join(
+                f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                for key, value in timings.items()
+            ))
+
+
+def cache_command(args: argparse.Namespace) -> None:
+    from ResultsCacher import ResultCache
+
+    cache = ResultCache(cache_dir=args.cache_dir, load_index=True)
+    index = cache.results_dict
+
+    # files referenced by the index: one pickle per entry, or the entry's shard
+    referenced = {
+        f"{entry.get('shard') or key}.pkl" for key, entry in index.items()
+    }
+    files = {
+        name: os.path.getsize(os.path.join(cache.cache_dir, name))
+        for name in os.listdir(cache.cache_dir)
+        if name.endswith(".pkl")
+    }
+
+    if args.action == "stats":
+        complete = sum(bool(entry["complete"]) for entry in index.values())
+        stats = {
+            "entries": len(index),
+            "complete": complete,
+            "conditions": len({entry["conditionId"] for entry in index.values()}),
+            "shards": len({entry["shard"] for entry in index.values() if entry.get("shard")}),
+            "files": len(files),
+            "bytes": sum(files.values()),
+            "orphaned_files": len(set(files) - referenced),
+            "journaled": os.path.exists(cache.journal_path),
+        }
+        print(json.dumps(stats, indent=2))
+
+    elif args.action == "gc":
+        # results of incomplete entries are rewritten by resume, orphans are never read
+        complete = {
+            f"{entry.get('shard') or key}.pkl" for key, entry in index.items() if entry["complete"]
+        }
+        removable = sorted(name for name in files if name not in complete)
+
+        for name in removable:
+            print(name)
+            if not args.dry_run:
+                os.remove(os.path.join(cache.cache_dir, name))
+
+        if not args.dry_run:
+            cache.compact()
+
+        logger.info(f"{'Would remove' if args.dry_run else 'Removed'} {len(removable)} cache files "
+                    f"({sum(files[name] for name in removable)} bytes)")
+
+    elif args.action == "export":
+        from ResultsStore import ResultsStore
+
+        if args.output is None:
+            raise SystemExit("benchtop cache export: --output is required")
+
+        complete = {key: entry for key, entry in index.items() if entry["complete"]}
+        path = ResultsStore.write(complete, args.output, cache=cache)
+        print(path)
+
+
+def inspect_plan_command(args: argparse.Namespace) -> None:
+    """Prints the task organization of an experiment, without touching any cache"""
+
+    if args.simulators:
+        import SimulatorRegistry
+
+        print("\n".join(SimulatorRegistry.available()))
+        if args.path is None:
+            return
+
+    if args.path is None:
+        raise SystemExit("benchtop inspect-plan: provide an experiment YAML")
+
+    from file_loader import FileLoader
+    from Organizer import Organizer
+
+    loader = FileLoader(
+        args.path,
+        snapshot_dir=args.snapshot_dir,
+        compact_ids=args.compact_ids,
+        chunksize=args.chunksize,
+    )
+    loader._petab_files()
+
+    problem = loader.problems[0]
+    measurement_df = problem.measurement_files[0]
+    cell_count = getattr(problem, "cell_count", 1) or 1
+
+    organizer = Organizer(args.cores)
+    num_rounds, job_index = organizer.task_organization(
+        measurement_df, cell_count, chunk_size=args.chunk_size
+    )
+
+    rounds = [
+        organizer.task_assignment(rank_jobs_directory=job_index, round_i=round_i)
+        for round_i in range(num_rounds)
+    ]
+    tasks = sum(task is not None for round_tasks in rounds for task in round_tasks)
+
+    summary = {
+        "conditions": len(problem.condition_files[0]),
+        "simulated_conditions": len(Organizer.reachable_conditions(measurement_df)),
+        "cells": cell_count,
+        "workers": args.cores,
+        "chunk_size": args.chunk_size,
+        "tasks": tasks,
+        "rounds": num_rounds,
+        "idle_slots": num_rounds * args.cores - tasks,
+    }
+    print(json.dumps(summary, indent=2))
+
+    for round_i, round_tasks in enumerate(rounds[:args.rounds]):
+        print(f"round {round_i}: " + " ".join(task or "-" for task in round_tasks))
+
+
+def load_experiment(args: argparse.Namespace, load_index: bool = False):
+    from Experiment import Experiment
+
+    return Experiment(
+        args.path,
+        cores=args.cores,
+        cache_dir=args.cache_dir,
+        load_index=load_index,
+        verbose=args.verbose,
+        snapshot_dir=args.snapshot_dir,
+        compact_ids=args.compact_ids,
+        chunksize=args.chunksize,
+    )
+
+
+def observables_for(experiment, args: argparse.Namespace) -> None:
+    experiment.observable_calculation(args, alignment=args.alignment, summary=args.summary)
+
+
+def set_start_method(args: argparse.Namespace) -> None:
+    start_method = getattr(args, "start_method", None)
+
+    if start_method is not None:
+        import multiprocessing as mp
+        mp.set_start_method(start_method, force=True)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -8,19 +8,37 @@ author: Jonah R. Huggins
 """
 
 import os
+import sys
 import json
-from typing import Union
+from typing import Optional, Union
 from types import SimpleNamespace
 
 import yaml
 import pandas as pd
 
+sys.path.append(os.path.dirname(__file__))
+from ProblemSnapshot import ProblemSnapshot, DEFAULT_SNAPSHOT_DIR
+from SharedTables import TableIndex, freeze_table, read_table
+
 
 class FileLoader:
     """Generic Object for loading everything listed in a YAML config."""
-    def __init__(self, config_path: Union[str, os.PathLike]):
+    def __init__(
+            self,
+            config_path: Union[str, os.PathLike],
+            snapshot_dir: Optional[Union[str, os.PathLike]] = DEFAULT_SNAPSHOT_DIR,
+            compact_ids: bool = False,
+            chunksize: Optional[int] = None
+            ):
         self.config_path = config_path
 
+        # Parsed PEtab tables are cached here as binary snapshots, None disables it
+        self.snapshot_dir = snapshot_dir
+
+        # Categorical, read-only ID columns and chunked parsing of large tables
+        self.compact_ids = compact_ids
+        self.chunksize = chunksize
+
         # 1) load the raw YAML into a DotDict
         self.config = Config.file_loader(self.config_path)
         
@@ -31,8 +49,28 @@ class FileLoader:
         """Loads petab files for an experiment into memory"""
         yaml_dir = os.path.dirname(self.config_path)
 
-        # 2) load the parameter file
         param_fp = os.path.join(yaml_dir, self.config.parameter_file)
+
+        snapshot = None
+        if self.snapshot_dir is not None:
+            snapshot = ProblemSnapshot(
+                self.snapshot_dir,
+                self.__table_paths(yaml_dir, param_fp),
+                options=(self.compact_ids,)
+            )
+
+            contents = snapshot.load()
+            if contents is not None:
+                self.parameter_file, self.problems = contents
+
+                # Snapshots are mapped copy-on-write, compact tables are locked again
+                if self.compact_ids:
+                    self.__freeze_tables()
+
+                del self.config_path
+                return
+
+        # 2) load the parameter file
         self.parameter_file = pd.read_csv(param_fp, sep="\t")
 
         # 3) load each problem’s files into a list of namespaces
@@ -59,13 +97,44 @@ class FileLoader:
                         loaded.append(fp)
                     else:
                         # CSV/TSV → DataFrame
-                        loaded.append(pd.read_csv(fp, sep="\t"))
+                        loaded.append(read_table(fp, self.compact_ids, self.chunksize))
                 setattr(p, attr, loaded)
+
+            # Row positions by condition and observable, one per measurement table
+            p.measurement_index = [TableIndex(df) for df in getattr(p, "measurement_files", [])]
+
             self.problems.append(p)
 
+        if snapshot is not None:
+            snapshot.save((self.parameter_file, self.problems))
+
         # 4) clean up
         del self.config_path
 
+    def __freeze_tables(self) -> None:
+        """Locks the tables of every problem against in-place modification"""
+        for p in self.problems:
+            for attr in ("condition_files", "measurement_files", "observable_files", "visualization_df"):
+                tables = getattr(p, attr, None)
+                if tables is not None:
+                    setattr(p, attr, [
+                        freeze_table(table) if isinstance(table, pd.DataFrame) else table
+                        for table in tables
+                    ])
+
+    def __table_paths(self, yaml_dir: str, param_fp: str) -> list:
+        """Config and every parsed table, the files a snapshot depends on"""
+        paths = [self.config_path, param_fp]
+
+        for problem in self.config.problems:
+            for attr in ("condition_files", "measurement_files", "observable_files", "visualization_df"):
+                for rel in getattr(problem, attr, None) or []:
+                    fp = os.path.join(yaml_dir, rel)
+                    if os.path.splitext(fp)[1].lower() not in (".sbml", ".xml"):
+                        paths.append(fp)
+
+        return paths
+
     def _extract_model_build_files(self) -> SimpleNamespace:
         """returns input files as pandas dataframes, contained in an object for easy reference."""
 
@@ -166,7 +235,7 @@ class CSV(File):
     def loader(self, **kwargs): 
         """Load CSV/TSV file"""
         kwargs.setdefault("sep", "\t")
-        return pd.read_csv(filepath_or_buffer=self.file_path, engine = 'python', **kwargs)
+        return pd.read_csv(filepath_or_buffer=self.file_path, **kwargs)
     
 class DotDict(dict):
     """Converts JSON and YAML files into dot notation rather than square brackets"""
@@ -17,9 +17,8 @@ from types import SimpleNamespace
 
 sys.path.append(os.path.dirname(__file__))
 from Experiment import Experiment
+from ProblemSnapshot import DEFAULT_SNAPSHOT_DIR
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from wrappers.SingleCell import SingleCell
 logging.basicConfig(
     level=logging.INFO, # Overriden if Verbose Arg. True
     format="%(asctime)s - %(levelname)s - %(message)s"
@@ -94,14 +93,29 @@ class Experimentalist:
             logging.getLogger().setLevel(logging.DEBUG)
 
         experiment = Experiment(
-            petab_yaml=self.args.path, 
+            petab_yaml=config_path, 
             cores=self.args.cores, 
             cache_dir=self.args.cache_dir, 
             load_index=self.args.load_index,
-            verbose=self.args.verbose
+            verbose=self.args.verbose,
+            snapshot_dir=getattr(self.args, "snapshot_dir", DEFAULT_SNAPSHOT_DIR),
+            compact_ids=getattr(self.args, "compact_ids", False),
+            chunksize=getattr(self.args, "chunksize", None),
             )
 
-        experiment.run(SingleCell)
+        # Resolved by name from the simulator registry, imported only to simulate
+        experiment.run(
+            getattr(self.args, "simulator", "singlecell"),
+            start=getattr(self.args, "start", 0.0),
+            step=getattr(self.args, "step", 30.0),
+            chunk_size=getattr(self.args, "chunk_size", 1),
+            executor=getattr(self.args, "executor", "process"),
+            observables_only=getattr(self.args, "observables_only", False),
+            population_stats=getattr(self.args, "population_stats", False),
+            keep_cells=getattr(self.args, "keep_cells", True),
+            sparse_output=getattr(self.args, "sparse_output", False),
+            project_columns=getattr(self.args, "project_columns", False),
+            )
 
         logger.debug("Closed simulation method successfully.")
 
@@ -109,7 +123,11 @@ class Experimentalist:
             logger.debug("Saved Results successfully.")
 
         else:
-            experiment.observable_calculation(self.args)
+            experiment.observable_calculation(
+                self.args,
+                alignment=getattr(self.args, "alignment", "nearest"),
+                summary=getattr(self.args, "summary", False),
+            )
             logger.debug("Ran observableCalc. methods successfully")
 
 
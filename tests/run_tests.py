@@ -22,10 +22,19 @@ def run_tests() -> None:
     test_benchtop.test_run()
     test_benchtop.test_results_dict_inheritance()
     test_benchtop.test_results_saving()
+    test_benchtop.test_resume_storage_mode()
+    test_benchtop.test_population_summary_without_cells()
+    test_benchtop.test_failed_round_releases_shared_objects()
+    test_benchtop.test_resume_sparse_output()
+    test_benchtop.test_resume_project_columns()
 
     import test_cache
     test_cache.test_cache_constructor()
     test_cache.test_load_prior()
+    test_cache.test_journaled_index_updates()
+
+    import test_record
+    test_record.test_results_dictionary_prunes_unreferenced()
 
     import test_worker
     test_worker.test_worker_constructor()
@@ -34,14 +43,89 @@ def run_tests() -> None:
     test_worker.test_setModelState_basic()
     test_worker.test_get_simulation_time()
     test_worker.test_model_state_assignment()
+    test_worker.test_reduce_to_observables()
+    test_worker.test_sparse_output_times()
+    test_worker.test_bulk_model_state_assignment()
 
     import test_organizer
     test_organizer.test_organizer_constructor()
     test_organizer.test_topological_sorter()
+    test_organizer.test_reachable_conditions()
     test_organizer.test_delay_secondary_condition()
+    test_organizer.test_delay_secondary_condition_scale()
     test_organizer.test_total_tasks_basic()
+    test_organizer.test_total_tasks_chunked()
     test_organizer.test_total_tasks_empty_tasks()
     test_organizer.test_total_tasks_zero_cells()
+
+    import test_results_store
+    test_results_store.test_store_roundtrip()
+    test_results_store.test_store_trajectories_from_cache()
+    test_results_store.test_store_summary()
+    test_results_store.test_store_replaces_only_stores()
+
+    import test_results_index
+    test_results_index.test_query_filters()
+    test_results_index.test_query_archive()
+
+    import test_formula_compiler
+    test_formula_compiler.test_compiled_formula_evaluation()
+    test_formula_compiler.test_null_formulas()
+    test_formula_compiler.test_rejected_formulas()
+    test_formula_compiler.test_formula_symbols()
+    test_formula_compiler.test_model_symbols_shadow_constants()
+
+    import test_time_alignment
+    test_time_alignment.test_nearest_matches_argmin()
+    test_time_alignment.test_alignment_methods()
+
+    import test_population_stats
+    test_population_stats.test_running_moments_merge()
+    test_population_stats.test_quantile_sketch()
+    test_population_stats.test_population_aggregator()
+
+    import test_simulation_result
+    test_simulation_result.test_simulation_result_columns()
+    test_simulation_result.test_simulation_result_from_output()
+
+    import test_task_plan
+    test_task_plan.test_task_plan_compilation()
+    test_task_plan.test_task_plan_output_times()
+    test_task_plan.test_task_plan_parameter_sets()
+
+    import test_problem_snapshot
+    test_problem_snapshot.test_snapshot_roundtrip()
+    test_problem_snapshot.test_snapshot_out_of_band_buffers()
+
+    import test_shared_tables
+    test_shared_tables.test_compact_tables()
+    test_shared_tables.test_table_index()
+    test_shared_tables.test_fork_shared_pickling()
+
+    import test_simulator_registry
+    test_simulator_registry.test_registry_resolution()
+    test_simulator_registry.test_registry_is_lazy()
+
+    import test_tellurium_wrapper
+    test_tellurium_wrapper.test_model_compiled_once()
+    test_tellurium_wrapper.test_compiled_state_cache()
+
+    import test_observable_calculator
+    test_observable_calculator.test_condition_index()
+    test_observable_calculator.test_stacked_matches_per_cell()
+    test_observable_calculator.test_parallel_matches_serial()
+
+    import test_parameter_design
+    test_parameter_design.test_grid_design()
+    test_parameter_design.test_nominal_values()
+    test_parameter_design.test_sampled_designs()
+    test_parameter_design.test_sweep()
+
+    import test_cli
+    test_cli.test_inspect_plan()
+    test_cli.test_cli_import_is_lightweight()
+    test_cli.test_cache_stats_and_gc()
+    test_cli.test_cache_export_chunked()
     
 
 if __name__ == '__main__':
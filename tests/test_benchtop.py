@@ -3,16 +3,22 @@ import sys
 import json
 import shutil
 import random
+import tempfile
+from types import SimpleNamespace
 from multiprocessing import Manager
 
+import numpy as np
 import pandas as pd
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from src.benchtop.Experiment import Experiment
 from src.benchtop.Worker import Worker
 from src.benchtop.AbstractSimulator import AbstractSimulator
+from src.benchtop.ResultsStore import ResultsStore
 from wrappers.tellurium_wrapper import WrapTellurium
 from make_dummy import dummy_simulator
+# Workers pickle results under the flat module path added by Experiment
+from SimulationResult import SimulationResult
 
 def test_run() -> None: 
 
@@ -33,7 +39,7 @@ def test_run() -> None:
 
     experiment.run(WrapTellurium, step = 1)
 
-    assert len(os.listdir(cache_dir)) == 10 # 9 simulations + cache index JSON
+    assert len(os.listdir(cache_dir)) == 11 # 9 simulations + cache index JSON + run options
     for key in experiment.record.cache.results_dict.keys():
         assert key + '.pkl' in os.listdir(cache_dir)
 
@@ -187,10 +193,12 @@ def test_results_saving() -> None:
         if not os.path.exists(result_file):
             raise FileNotFoundError(f"Expected results file not found: {result_file}")
 
-        # Load pickled DataFrame
+        # Load pickled simulation result
         data = pd.read_pickle(result_file)
-        if not isinstance(data, pd.DataFrame):
-            raise ValueError(f"Expected DataFrame in {result_file}, got {type(data)}")
+        if not isinstance(data, SimulationResult):
+            raise ValueError(f"Expected SimulationResult in {result_file}, got {type(data)}")
+
+        data = data.to_frame()
 
         if "time" not in data.columns:
             raise KeyError(f"'time' column not found in results for {key}")
@@ -206,3 +214,180 @@ def test_results_saving() -> None:
     assert duplicates == 0, f"Found {duplicates} duplicate final results; results are being overwritten."
 
     print(f"✅ {len(verify_df)} result integrity verified — no overwriting detected.")
+
+def test_resume_storage_mode() -> None:
+    """Resumed cells are stored like those of the interrupted run"""
+    assert os.path.basename(os.getcwd()) == 'Benchtop'
+
+    cache_path = './tests/data/.cache'
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+    config_path = os.path.abspath("./tests/data/LR-benchmark.yaml")
+    experiment = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False)
+    experiment.run(WrapTellurium, step=30, executor="serial", observables_only=True)
+
+    # Interrupt the run: forget the first cell of every condition
+    interrupted = [
+        key for key, entry in experiment.record.cache.results_dict.items() if entry["cell"] == 1
+    ]
+    experiment.record.cache.update_cache_entries(interrupted, False)
+
+    resumed = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False, load_index=True)
+
+    try:
+        resumed.resume(WrapTellurium, step=30, executor="serial", observables_only=False)
+        raise AssertionError("Resuming with a different storage mode should fail")
+    except ValueError:
+        pass
+
+    resumed.resume(WrapTellurium, step=30, executor="serial")
+
+    for key in interrupted:
+        assert resumed.record.cache.results_dict[key]["complete"]
+        assert "observables" in resumed.record.cache.load(key)
+
+def test_population_summary_without_cells() -> None:
+    """Aggregates of runs that kept no cells survive a summarizing observable calculation"""
+    assert os.path.basename(os.getcwd()) == 'Benchtop'
+
+    cache_path = './tests/data/.cache'
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+    config_path = os.path.abspath("./tests/data/LR-benchmark.yaml")
+    experiment = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False)
+    experiment.run(
+        WrapTellurium, step=30, executor="serial",
+        observables_only=True, population_stats=True, keep_cells=False
+    )
+
+    # conditions without measurements have no observables to aggregate
+    expected = {
+        condition_id: observables
+        for condition_id, observables in experiment.population.result().items() if observables
+    }
+    assert expected
+
+    with tempfile.TemporaryDirectory() as tmp:
+        experiment.observable_calculation(SimpleNamespace(output=tmp), summary=True)
+
+        store = ResultsStore(os.path.join(tmp, os.listdir(tmp)[0]))
+
+        for condition_id, observables in expected.items():
+            stats = store.summary(condition_id)
+            assert stats.keys() == observables.keys()
+            for obsId, values in observables.items():
+                assert np.allclose(stats[obsId]["mean"], values["mean"], equal_nan=True)
+
+class FailingTellurium(WrapTellurium):
+    def simulate(self, start, stop, step):
+        raise RuntimeError("simulation failed")
+
+def test_failed_round_releases_shared_objects() -> None:
+    """Shared objects are released when a round of simulations fails"""
+    assert os.path.basename(os.getcwd()) == 'Benchtop'
+
+    cache_path = './tests/data/.cache'
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+    config_path = os.path.abspath("./tests/data/LR-benchmark.yaml")
+    experiment = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False)
+
+    try:
+        experiment.run(FailingTellurium, step=30, executor="serial")
+        raise AssertionError("The failing simulator should stop the run")
+    except RuntimeError as e:
+        assert str(e) == "simulation failed"
+
+    assert experiment.record._fork_token is None
+
+    try:
+        experiment.resume(FailingTellurium, step=30, executor="serial")
+        raise AssertionError("The failing simulator should stop the resumed run")
+    except RuntimeError as e:
+        assert str(e) == "simulation failed"
+
+    assert experiment.record._fork_token is None
+
+class CvodeTellurium(WrapTellurium):
+    """rk45 cannot simulate at explicit output times, CVODE can"""
+    def load(self, *args, **kwargs):
+        super().load(*args, **kwargs)
+        self.tool.setIntegrator("cvode")
+
+def test_resume_sparse_output() -> None:
+    """Resumed cells are simulated on the output grid of the interrupted run"""
+    assert os.path.basename(os.getcwd()) == 'Benchtop'
+
+    cache_path = './tests/data/.cache'
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+    config_path = os.path.abspath("./tests/data/LR-benchmark.yaml")
+    experiment = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False)
+    experiment.run(CvodeTellurium, step=1, executor="serial", sparse_output=True, visualization_times=(15.0,))
+
+    cache = experiment.record.cache
+    grids = {
+        (entry["conditionId"], entry["cell"]): cache.load(key)["time"].tolist()
+        for key, entry in cache.results_dict.items()
+    }
+
+    interrupted = [key for key, entry in cache.results_dict.items() if entry["cell"] == 1]
+    cache.update_cache_entries(interrupted, False)
+
+    resumed = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False, load_index=True)
+
+    try:
+        resumed.resume(CvodeTellurium, step=1, executor="serial", sparse_output=False)
+        raise AssertionError("Resuming with a different output grid should fail")
+    except ValueError:
+        pass
+
+    resumed.resume(CvodeTellurium, step=1, executor="serial")
+
+    for key in interrupted:
+        entry = resumed.record.cache.results_dict[key]
+        time = resumed.record.cache.load(key)["time"].tolist()
+        assert time == grids[(entry["conditionId"], 2)]
+        assert 15.0 in time and len(time) < 60
+
+def test_resume_project_columns() -> None:
+    """Resumed cells record the same columns as those of the interrupted run"""
+    assert os.path.basename(os.getcwd()) == 'Benchtop'
+
+    cache_path = './tests/data/.cache'
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+    config_path = os.path.abspath("./tests/data/LR-benchmark.yaml")
+    experiment = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False)
+    experiment.run(WrapTellurium, step=30, executor="serial", project_columns=True)
+
+    cache = experiment.record.cache
+    columns = {
+        (entry["conditionId"], entry["cell"]): list(cache.load(key).keys())
+        for key, entry in cache.results_dict.items()
+    }
+
+    interrupted = [key for key, entry in cache.results_dict.items() if entry["cell"] == 1]
+    cache.update_cache_entries(interrupted, False)
+
+    resumed = Experiment(config_path, cache_dir=cache_path, cores=1, verbose=False, load_index=True)
+
+    try:
+        resumed.resume(WrapTellurium, step=30, executor="serial", project_columns=False)
+        raise AssertionError("Resuming with different recorded columns should fail")
+    except ValueError:
+        pass
+
+    resumed.resume(WrapTellurium, step=30, executor="serial")
+
+    # conditions nothing preequilibrates from are projected
+    assert any(len(keys) < len(columns[("heterogenize", 2)]) for keys in columns.values())
+
+    for key in interrupted:
+        entry = resumed.record.cache.results_dict[key]
+        assert list(resumed.record.cache.load(key).keys()) == columns[(entry["conditionId"], 2)]
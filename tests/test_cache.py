@@ -117,4 +117,36 @@ def test_load_prior() -> None:
 
     assert results_keys == tester_keys, f"Experiment did not reload cache index: \
         Original_keys: {tester_keys}, \n Loaded Keys: {results_keys}"
-    
\ No newline at end of file
+    
+
+def test_journaled_index_updates() -> None:
+    """Status updates are journaled, replayed on reload and folded back by compact()"""
+
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    cache_path = os.path.join(base_dir, "tests", "data", ".cache-journal")
+
+    index = {
+        key: {"conditionId": "primary-condition", "cell": cell, "complete": False}
+        for cell, key in enumerate(["id1", "id2", "id3"], start=1)
+    }
+
+    cache = ResultCache(results_dict=index, cache_dir=cache_path)
+
+    cache.update_cache_index("id1", True)
+    cache.update_cache_entries(["id2", "id3"], True, shards={"id2": "shard-id2", "id3": "shard-id2"})
+
+    assert os.path.exists(cache.journal_path)
+
+    reloaded = ResultCache(cache_dir=cache_path, load_index=True)
+
+    assert all(entry["complete"] for entry in reloaded.results_dict.values())
+    assert reloaded.results_dict["id3"]["shard"] == "shard-id2"
+    assert "shard" not in reloaded.results_dict["id1"]
+
+    cache.compact()
+
+    assert not os.path.exists(cache.journal_path)
+    with open(cache.cache_index_path, 'r') as f:
+        assert json.load(f) == reloaded.results_dict
+
+    shutil.rmtree(cache_path, ignore_errors=True)
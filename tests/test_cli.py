@@ -0,0 +1,98 @@
+import io
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import contextlib
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop import cli
+from src.benchtop.ResultsCacher import ResultCache
+from src.benchtop.ResultsStore import ResultsStore
+from src.benchtop.Experiment import Experiment
+from wrappers.tellurium_wrapper import WrapTellurium
+
+
+def _output(argv: list) -> str:
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        cli.main(argv)
+    return stdout.getvalue()
+
+
+def test_inspect_plan() -> None:
+    """inspect-plan reports the task organization without simulating"""
+
+    config_path = os.path.join(os.path.dirname(__file__), "data", "LR-benchmark.yaml")
+
+    output = _output(["inspect-plan", config_path, "--cores", "4", "--no-snapshot", "--rounds", "1"])
+    summary = json.loads(output[:output.rindex("}") + 1])
+
+    assert summary["tasks"] == summary["conditions"] * summary["cells"]
+    assert summary["rounds"] * summary["workers"] == summary["tasks"] + summary["idle_slots"]
+    assert output.count("round ") == 1
+
+
+def test_cli_import_is_lightweight() -> None:
+    """Parsing arguments does not import pandas or the simulation stack"""
+
+    cli_dir = os.path.dirname(os.path.abspath(cli.__file__))
+    check = (
+        f"import sys; sys.path.insert(0, {cli_dir!r}); import cli; cli.build_parser(); "
+        "print(sorted({'pandas', 'numpy'} & set(sys.modules)))"
+    )
+
+    output = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]", output.stdout
+
+
+def test_cache_stats_and_gc() -> None:
+    """cache gc removes results that no complete entry reads"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        cache = ResultCache(
+            {
+                "a": {"conditionId": "c1", "cell": 1, "complete": False},
+                "b": {"conditionId": "c1", "cell": 2, "complete": False},
+            },
+            cache_dir=cache_dir,
+        )
+        cache.save("a", {"x": [1.0]})
+        cache.save("b", {"x": [2.0]})
+        cache.save("orphan", {"x": [3.0]})
+        cache.update_cache_index("a", True)
+
+        stats = json.loads(_output(["cache", "stats", cache_dir]))
+        assert stats["entries"] == 2 and stats["complete"] == 1
+        assert stats["orphaned_files"] == 1 and stats["journaled"]
+
+        assert _output(["cache", "gc", cache_dir]).split() == ["b.pkl", "orphan.pkl"]
+        assert sorted(os.listdir(cache_dir)) == ["a.pkl", "cache_index.json"]
+        assert ResultCache(cache_dir=cache_dir, load_index=True).load("a") == {"x": [1.0]}
+
+
+def test_cache_export_chunked() -> None:
+    """Chunked runs are exported and saved with every cell readable from the store"""
+
+    config_path = os.path.join(os.path.dirname(__file__), "data", "LR-benchmark.yaml")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        experiment = Experiment(config_path, cache_dir=cache_dir, cores=1, verbose=False)
+        experiment.run(WrapTellurium, step=30, executor="serial", chunk_size=3)
+
+        index = experiment.record.cache.read_cache_index()
+        assert all(entry.get("shard") for entry in index.values())
+
+        exported = ResultsStore(_output(["cache", "export", cache_dir, "--output", os.path.join(tmp, "export")]).strip())
+        saved = ResultsStore(experiment.save_results(SimpleNamespace(output=os.path.join(tmp, "results"))))
+
+        for store in (exported, saved):
+            assert sorted(store.manifest["entries"]) == sorted(index)
+            for key, entry in index.items():
+                cell = store[entry["conditionId"]][entry["cell"]]
+                assert cell.kind == "trajectory"
+                assert len(cell["time"]) > 0
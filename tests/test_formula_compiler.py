@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.FormulaCompiler import compile_formula, formula_symbols
+
+dataset = pd.DataFrame({
+    "time": [0.0, 30.0, 60.0],
+    "nuc_gene_a__RECEPTOR_": [1.0, 2.0, 3.0],
+    "nuc_gene_i__RECEPTOR_": [0.5, 0.5, np.nan],
+})
+
+def test_compiled_formula_evaluation() -> None:
+    """Formulas evaluate on the species columns, including PEtab power syntax"""
+
+    formula = compile_formula("nuc_gene_a__RECEPTOR_ + nuc_gene_i__RECEPTOR_")
+    assert formula.symbols == ("nuc_gene_a__RECEPTOR_", "nuc_gene_i__RECEPTOR_")
+
+    answer = formula(dataset)
+    assert answer[:2].tolist() == [1.5, 2.5]
+    assert np.isnan(answer[2]), "NaN trajectories should propagate, not fail"
+
+    power = compile_formula("2 * nuc_gene_a__RECEPTOR_^2 + log(exp(1))")
+    assert power(dataset).tolist() == [3.0, 9.0, 19.0]
+
+    constant = compile_formula("5")
+    assert constant(dataset, length=3).tolist() == [5.0, 5.0, 5.0]
+
+def test_null_formulas() -> None:
+    for formula in ["0", 0, "", None, float("nan")]:
+        assert compile_formula(formula) is None, f"{formula!r} should compile to None"
+
+def test_rejected_formulas() -> None:
+    """Anything beyond arithmetic on species and allowlisted functions is refused"""
+
+    for formula in ["__import__('os')", "nuc_gene_a__RECEPTOR_.sum()",
+                    "open('x')", "[1, 2]", "'species'", "lambda: 1"]:
+        try:
+            compile_formula(formula)
+        except ValueError:
+            continue
+        raise AssertionError(f"Formula {formula!r} should have been rejected")
+
+def test_formula_symbols() -> None:
+    """Columns needed by a set of observables, null formulas contribute nothing"""
+
+    formulas = ["0", "a + b", "log(b) * c", float("nan")]
+
+    assert formula_symbols(formulas) == ("a", "b", "c")
+
+def test_model_symbols_shadow_constants() -> None:
+    """Species named like a constant take precedence, absent ones keep the constant"""
+
+    formula = compile_formula("2 * e + pi")
+
+    assert formula.symbols == ()
+    assert set(formula.constants) == {"e", "pi"}
+    assert np.allclose(formula(dataset, length=3), 2 * np.e + np.pi)
+
+    shadowed = dataset.assign(e=[1.0, 2.0, 3.0])
+    assert np.allclose(formula(shadowed), [2.0 + np.pi, 4.0 + np.pi, 6.0 + np.pi])
+
+    assert formula_symbols(["e * a"]) == ("a", "e")
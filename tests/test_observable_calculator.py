@@ -0,0 +1,131 @@
+import os
+import sys
+import pickle
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.ObservableCalculator import ObservableCalculator
+from src.benchtop.FormulaCompiler import CompiledFormula
+from src.benchtop.ResultsCacher import ResultCache
+from SimulationResult import SimulationResult
+
+observable_df = pd.DataFrame({
+    "observableId": ["obs_a", "obs_b", "obs_c"],
+    "observableFormula": ["A + B", "2 * B^2", "C"],
+    "noiseFormula": [1, 1, 1],
+})
+
+measurement_df = pd.DataFrame({
+    "observableId": ["obs_a", "obs_a", "obs_b", "obs_c", "obs_a"],
+    "simulationConditionId": ["cond1", "cond1", "cond1", "cond2", "cond2"],
+    "measurement": [1.0, 2.0, 3.0, 4.0, np.nan],
+    "time": [10, 30, 20, 40, 50],
+})
+
+# cond1 cells share a time grid, one cond2 cell was simulated on a different grid
+CELLS = {
+    "cond1": [np.arange(0, 70, 10)] * 4,
+    "cond2": [np.arange(0, 70, 10), np.arange(0, 70, 10), np.arange(0, 65, 5)],
+}
+
+
+def _experiment(cache_dir: str, size: int = 1) -> SimpleNamespace:
+    """Experiment stand-in whose cache holds synthetic trajectories"""
+
+    results_dict = {
+        f"{condition}-{cell}": {"conditionId": condition, "cell": cell, "complete": True}
+        for condition, grids in CELLS.items()
+        for cell in range(1, len(grids) + 1)
+    }
+    cache = ResultCache(results_dict, cache_dir=cache_dir)
+
+    rng = np.random.default_rng(0)
+    for condition, grids in CELLS.items():
+        for cell, time in enumerate(grids, start=1):
+            cache.save(f"{condition}-{cell}", SimulationResult(rng.random((len(time), 3)), time, ["A", "B", "C"]))
+
+    problem = SimpleNamespace(observable_files=[observable_df], measurement_files=[measurement_df])
+
+    return SimpleNamespace(
+        record=SimpleNamespace(cache=cache),
+        loader=SimpleNamespace(problems=[problem]),
+        size=size,
+    )
+
+
+def _assert_same(observables: dict, expected: dict) -> None:
+    assert observables.keys() == expected.keys()
+    for obsId, values in expected.items():
+        for field in ("simulation", "time", "experiment"):
+            assert np.allclose(observables[obsId][field], values[field], equal_nan=True), (obsId, field)
+
+
+def test_condition_index() -> None:
+    """Each condition evaluates only its mapped observables, at its measured times"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        calculator = ObservableCalculator(_experiment(os.path.join(tmp, "cache")))
+
+        assert [spec.observableId for spec in calculator.condition_index["cond1"]] == ["obs_a", "obs_b"]
+        assert [spec.observableId for spec in calculator.condition_index["cond2"]] == ["obs_c", "obs_a"]
+
+        results = calculator.run()
+        dataset = calculator.cache.load("cond1-1")
+
+        assert set(results["cond1-1"]) == {"conditionId", "cell", "obs_a", "obs_b"}
+        assert results["cond1-1"]["obs_a"]["time"].tolist() == [10, 30]
+        assert np.allclose(results["cond1-1"]["obs_a"]["simulation"], (dataset["A"] + dataset["B"])[[1, 3]])
+        assert np.allclose(results["cond1-1"]["obs_b"]["simulation"], 2 * dataset["B"][[2]] ** 2)
+
+        # without experimental values the whole trajectory is kept
+        assert len(results["cond2-1"]["obs_a"]["simulation"]) == 7
+
+
+def test_stacked_matches_per_cell() -> None:
+    """Stacked (and batched) condition evaluation equals evaluating each cell alone"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        calculator = ObservableCalculator(_experiment(os.path.join(tmp, "cache")), summary=True)
+        calculator.batch_size = 3
+
+        results = calculator.run()
+
+        for entry, values in results.items():
+            expected = calculator.calculate_dataset(calculator.cache.load(entry), values["conditionId"])
+            _assert_same({obs: values[obs] for obs in expected}, expected)
+
+        # the ragged cond2 cell is evaluated on its own grid
+        assert len(results["cond2-3"]["obs_a"]["simulation"]) == 13
+        assert set(calculator.summary["cond1"]) == {"obs_a", "obs_b"}
+
+
+def test_parallel_matches_serial() -> None:
+    """Pool processes (with pickled compiled formulas) reproduce the serial results"""
+
+    formula = CompiledFormula("2 * B^2 + log(A)")
+    restored = pickle.loads(pickle.dumps(formula))
+    dataset = {"A": np.array([1.0, 2.0]), "B": np.array([3.0, 4.0])}
+
+    assert restored.formula == formula.formula and restored.symbols == formula.symbols
+    assert np.allclose(restored(dataset), formula(dataset))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # shared calculators pickle without their registry token
+        calculator = ObservableCalculator(_experiment(os.path.join(tmp, "shared"))).share()
+        state = calculator.__getstate__()
+        calculator.release()
+        assert "_fork_token" not in state and state["observable_results"] is None
+
+        serial = ObservableCalculator(_experiment(os.path.join(tmp, "serial"), size=1)).run()
+        parallel = ObservableCalculator(_experiment(os.path.join(tmp, "parallel"), size=2)).run()
+
+        assert serial.keys() == parallel.keys()
+        for entry, values in serial.items():
+            _assert_same(
+                {obs: parallel[entry][obs] for obs in values if obs.startswith("obs")},
+                {obs: values[obs] for obs in values if obs.startswith("obs")},
+            )
@@ -58,6 +58,22 @@ def test_topological_sorter() -> None:
 
     assert topo_null_check[0] != "serum_starve", f"First task ordered wrong: {topo_null_check}"
 
+def test_reachable_conditions() -> None:
+    """Simulation conditions and their transitive preequilibrations are reachable"""
+
+    m_df = pd.DataFrame({
+        "preequilibrationConditionId": [None, "serum_starve", "heterogenize"],
+        "simulationConditionId": ["primary_condition1", "primary_condition2", "serum_starve"],
+    })
+
+    reachable = Organizer.reachable_conditions(m_df)
+
+    assert reachable == {"primary_condition1", "primary_condition2", "serum_starve", "heterogenize"}
+
+    no_preequilibration = m_df.drop(columns=["preequilibrationConditionId"])
+    assert Organizer.reachable_conditions(no_preequilibration) == \
+        {"primary_condition1", "primary_condition2", "serum_starve"}
+
 def test_delay_secondary_condition() -> None:
 
     # 4 cores should see two None values for the first iteration
@@ -82,6 +98,31 @@ def test_delay_secondary_condition() -> None:
     assert delay_scc[2] == None
     assert delay_scc[3] == None
 
+def test_delay_secondary_condition_scale() -> None:
+    """Planning many chained conditions stays ordered and pauses each preequilibration"""
+
+    org = Organizer(8)
+
+    n = 2000
+    conditions = [f"cond{i}" for i in range(n)]
+
+    # cond0 <- cond1 <- ... a chain, so every condition but the last is a pre-condition
+    m_df = pd.DataFrame({
+        "preequilibrationConditionId": [None] + conditions[:-1],
+        "simulationConditionId": conditions,
+    })
+
+    order = org.topologic_sort(m_df)
+    assert order == conditions
+
+    tasks = org.total_tasks(order, 2)
+    delayed = org.delay_secondary_conditions(m_df, list(tasks), 2)
+
+    # 8 - 2 pauses after each of the n - 1 pre-conditions
+    assert [task for task in delayed if task is not None] == tasks
+    assert len(delayed) == len(tasks) + 6 * (n - 1)
+    assert delayed[2:8] == [None] * 6
+
 def test_total_tasks_basic():
     
     dummy = Organizer(1)
@@ -99,6 +140,18 @@ def test_total_tasks_basic():
     assert len(result) == len(tasks) * 3
 
 
+def test_total_tasks_chunked():
+
+    dummy = Organizer(1)
+
+    result = dummy.total_tasks(["condA"], 5, chunk_size=2)
+
+    assert result == ["condA+1-2", "condA+3-4", "condA+5"]
+
+    assert Organizer.parse_task(result[0]) == ("condA", [1, 2])
+    assert Organizer.parse_task(result[-1]) == ("condA", [5])
+
+
 def test_total_tasks_empty_tasks():
     dummy = type("D", (), {
         "total_tasks": lambda self, tasks, cell_count: [
@@ -0,0 +1,146 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop import ParameterDesign
+from src.benchtop.Experiment import Experiment
+from wrappers.tellurium_wrapper import WrapTellurium
+
+config_path = os.path.join(os.path.dirname(__file__), "data", "LR-benchmark.yaml")
+
+parameter_df = pd.DataFrame({
+    "parameterId": ["k1", "k2", "k3"],
+    "parameterScale": ["lin", "log10", "lin"],
+    "lowerBound": [0.0, 0.01, 5.0],
+    "upperBound": [1.0, 100.0, 5.0],
+    "nominalValue": [0.5, 1.0, 5.0],
+    "estimate": [1, 1, 0],
+})
+
+
+def test_grid_design() -> None:
+    """Grids combine evenly spaced values (on each parameter's scale)"""
+
+    sets = ParameterDesign.parameter_sets(parameter_df, "grid", levels=3)
+
+    assert sets.shape == (9, 2)
+    assert sorted(set(sets["k1"])) == [0.0, 0.5, 1.0]
+    assert np.allclose(sorted(set(sets["k2"])), [0.01, 1.0, 100.0])
+    # parameters that are not varied keep their model values, sets leave them out
+    assert list(sets.columns) == ["k1", "k2"]
+
+
+def test_nominal_values() -> None:
+    """Single-level grids and estimated parameters held fixed take their nominal value"""
+
+    single = ParameterDesign.parameter_sets(parameter_df, "grid", levels=1)
+    assert single.to_dict("records") == [{"k1": 0.5, "k2": 1.0}]
+
+    fixed = ParameterDesign.parameter_sets(parameter_df, "random", size=5, parameters=["k1"], seed=0)
+    assert list(fixed.columns) == ["k1", "k2"]
+    assert (fixed["k2"] == 1.0).all() and fixed["k1"].nunique() == 5
+
+    # noise parameters of the measurements are not model components
+    noisy = pd.concat([parameter_df, pd.DataFrame({
+        "parameterId": ["sd_obs"], "parameterScale": ["lin"], "lowerBound": [0.1],
+        "upperBound": [1.0], "nominalValue": [0.2], "estimate": [1],
+    })])
+    measurement_df = pd.DataFrame({"observableId": ["obs"], "noiseParameters": ["sd_obs"]})
+
+    sets = ParameterDesign.parameter_sets(noisy, "grid", levels=2, measurement_df=measurement_df)
+    assert list(sets.columns) == ["k1", "k2"]
+
+
+def test_sampled_designs() -> None:
+    """Random and Latin hypercube sets lie within bounds, LHS fills every stratum"""
+
+    for design in ("random", "lhs"):
+        sets = ParameterDesign.parameter_sets(parameter_df, design, size=20, seed=1)
+
+        assert sets.shape == (20, 2)
+        assert sets["k1"].between(0.0, 1.0).all()
+        assert sets["k2"].between(0.01, 100.0).all()
+
+    lhs = ParameterDesign.parameter_sets(parameter_df, "lhs", size=20, seed=1)
+
+    assert sorted(np.floor(lhs["k1"] * 20).astype(int)) == list(range(20))
+    assert sorted(np.floor((np.log10(lhs["k2"]) + 2) / 4 * 20).astype(int)) == list(range(20))
+
+    same = ParameterDesign.parameter_sets(parameter_df, "lhs", size=20, seed=1)
+    assert same.equals(lhs)
+
+    try:
+        ParameterDesign.parameter_sets(parameter_df, "lhs")
+    except ValueError as e:
+        assert "size" in str(e)
+    else:
+        raise AssertionError("Sampled designs require a size")
+
+
+def _trajectories(experiment: Experiment) -> dict:
+    cache = experiment.record.cache
+    return {
+        (entry["conditionId"], entry["cell"]): cache.load(key)
+        for key, entry in cache.results_dict.items()
+    }
+
+
+def _same(result, expected) -> bool:
+    return list(result.keys()) == list(expected.keys()) and all(
+        np.allclose(result[col], expected[col], equal_nan=True) for col in expected.keys()
+    )
+
+
+def test_sweep() -> None:
+    """Each block of cells simulates its own parameter set, also once resumed"""
+
+    sets = [{"kTL1_1": 0.5}, {"kTL1_1": 2.0}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "sweep")
+
+        experiment = Experiment(config_path, cache_dir=cache_dir, cores=1, verbose=False)
+        experiment.sweep(WrapTellurium, sets, step=30, executor="serial")
+
+        swept = _trajectories(experiment)
+
+        # the sweep leaves the experiment simulating the model as loaded
+        replicates = experiment.cell_count
+        assert experiment.parameter_sets is None
+        assert {cell for _, cell in swept} == set(range(1, replicates * len(sets) + 1))
+
+        for i, parameter_set in enumerate(sets):
+            single = Experiment(config_path, cache_dir=os.path.join(tmp, f"set-{i}"), cores=1, verbose=False)
+            single.sweep(WrapTellurium, [parameter_set], step=30, executor="serial")
+
+            for (condition_id, cell), result in _trajectories(single).items():
+                assert _same(swept[(condition_id, i * replicates + cell)], result), (condition_id, cell)
+
+        assert not _same(swept[("heterogenize", 1)], swept[("heterogenize", replicates + 1)])
+
+        # Interrupt the sweep: a new Experiment resumes the second set from the cache
+        interrupted = [
+            key for key, entry in experiment.record.cache.results_dict.items() if entry["cell"] > replicates
+        ]
+        experiment.record.cache.update_cache_entries(interrupted, False)
+
+        resumed = Experiment(config_path, cache_dir=cache_dir, cores=1, verbose=False, load_index=True)
+        resumed.resume(WrapTellurium, step=30, executor="serial")
+
+        assert np.allclose(resumed.record.cache.read_parameter_sets()["kTL1_1"], [0.5, 2.0])
+        # resumed cells are read from their new results, not their old chunk's shard
+        assert not any("shard" in resumed.record.cache.results_dict[key] for key in interrupted)
+        for cell, result in _trajectories(resumed).items():
+            assert _same(result, swept[cell]), cell
+
+        # a later plain run simulates the problem's own cells only
+        experiment.run(WrapTellurium, step=30, executor="serial")
+
+        plain = _trajectories(experiment)
+        assert sorted({cell for _, cell in plain}) == list(range(1, replicates + 1))
+        assert experiment.record.cache.read_parameter_sets() is None
+        assert not _same(plain[("heterogenize", 1)], swept[("heterogenize", 1)])
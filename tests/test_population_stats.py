@@ -0,0 +1,61 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.PopulationStats import RunningMoments, QuantileSketch, PopulationAggregator
+
+rng = np.random.default_rng(0)
+cells = rng.normal(loc=[0.0, 10.0, 100.0], scale=[1.0, 2.0, 5.0], size=(5000, 3))
+
+def test_running_moments_merge() -> None:
+    """Moments streamed cell by cell and merged across batches match numpy"""
+
+    first, second = RunningMoments(), RunningMoments()
+
+    for cell in cells[:1234]:
+        first.update(cell)
+    second.update(cells[1234:])
+
+    first.merge(second)
+
+    assert first.count == len(cells)
+    assert np.allclose(first.mean, cells.mean(axis=0))
+    assert np.allclose(first.variance, cells.var(axis=0))
+
+def test_quantile_sketch() -> None:
+    """Sketch memory stays bounded and quantiles stay close to the exact values"""
+
+    sketch, other = QuantileSketch(capacity=64, seed=1), QuantileSketch(capacity=64, seed=2)
+
+    for cell in cells[:2500]:
+        sketch.update(cell)
+    for cell in cells[2500:]:
+        other.update(cell)
+    sketch.merge(other)
+
+    stored = sum(len(items) for items in sketch.levels if items is not None)
+    assert stored < 64 * len(sketch.levels), f"Sketch holds {stored} trajectories"
+
+    approx = sketch.quantiles((0.25, 0.5, 0.75))
+    exact = np.quantile(cells, (0.25, 0.5, 0.75), axis=0)
+    spread = cells.std(axis=0)
+
+    assert np.all(np.abs(approx - exact) < 0.1 * spread), f"{approx} vs {exact}"
+
+def test_population_aggregator() -> None:
+    aggregator = PopulationAggregator(quantiles=(0.5,))
+
+    for cell in cells[:100]:
+        aggregator.update("primary-condition", {
+            "LR-complex": {"simulation": cell, "time": np.array([0.0, 30.0, 60.0])},
+            "blank": {"simulation": None, "time": np.array([0.0])},
+        })
+
+    summary = aggregator.result()["primary-condition"]
+
+    assert list(summary) == ["LR-complex"], "Null observables should not be aggregated"
+    assert summary["LR-complex"]["count"].tolist() == [100]
+    assert np.allclose(summary["LR-complex"]["mean"], cells[:100].mean(axis=0))
+    assert summary["LR-complex"]["q0.5"].shape == (3,)
@@ -0,0 +1,73 @@
+import os
+import sys
+import shutil
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.file_loader import FileLoader
+from src.benchtop.ProblemSnapshot import ProblemSnapshot
+
+config_path = "./tests/data/LR-benchmark.yaml"
+snapshot_dir = "./tests/data/.snapshots"
+
+def test_snapshot_roundtrip() -> None:
+    """A second load reads the parsed problem back from its snapshot"""
+
+    assert os.path.basename(os.getcwd()) == 'Benchtop'
+
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    parsed = FileLoader(config_path, snapshot_dir=snapshot_dir)
+    parsed._petab_files()
+
+    assert len(os.listdir(snapshot_dir)) == 1
+
+    cached = FileLoader(config_path, snapshot_dir=snapshot_dir)
+    cached._petab_files()
+
+    pd.testing.assert_frame_equal(cached.parameter_file, parsed.parameter_file)
+
+    for attr in ("condition_files", "measurement_files", "observable_files"):
+        for cached_df, parsed_df in zip(getattr(cached.problems[0], attr), getattr(parsed.problems[0], attr)):
+            pd.testing.assert_frame_equal(cached_df, parsed_df)
+
+    assert cached.problems[0].sbml_files == parsed.problems[0].sbml_files
+    assert cached.problems[0].cell_count == parsed.problems[0].cell_count
+
+    # Tables mapped from the snapshot are still writable (copy-on-write pages)
+    conditions = cached.problems[0].condition_files[0]
+    conditions.iloc[0, 2] = -1
+    assert conditions.iloc[0, 2] == -1
+
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+def test_snapshot_out_of_band_buffers() -> None:
+    """Arrays are stored as aligned out-of-band buffers and keyed on file contents"""
+
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    os.makedirs(snapshot_dir)
+
+    table = os.path.join(snapshot_dir, "table.tsv")
+    with open(table, "w") as f:
+        f.write("a\tb\n1\t2.5\n")
+
+    snapshot = ProblemSnapshot(snapshot_dir, [table])
+    assert snapshot.load() is None
+
+    contents = {"values": np.arange(1000, dtype=float), "name": "table"}
+    snapshot.save(contents)
+
+    loaded = ProblemSnapshot(snapshot_dir, [table]).load()
+
+    assert loaded["name"] == "table"
+    assert np.array_equal(loaded["values"], contents["values"])
+    assert loaded["values"].ctypes.data % 64 == 0
+
+    with open(table, "a") as f:
+        f.write("3\t4.5\n")
+
+    assert ProblemSnapshot(snapshot_dir, [table]).load() is None
+
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
@@ -2,6 +2,8 @@ import os
 import sys
 sys.path.append(os.path.dirname(__file__))
 
+from types import SimpleNamespace
+
 import pandas as pd
 from unittest.mock import patch, MagicMock
 
@@ -49,4 +51,21 @@ def terst_record_constructor() -> None:
     assert type(dummy_record.results_dict) == dict
     
     assert os.path.exists("./tests/data/.cache")
- 
\ No newline at end of file
+ 
+def test_results_dictionary_prunes_unreferenced() -> None:
+    """Conditions no measurement reaches get no results entries"""
+
+    library = dict(problem)
+    library["condition_files"] = [pd.concat([
+        problem["condition_files"][0],
+        pd.DataFrame({"conditionId": ["unused-library-condition"], "cyt_prot__LIGAND_": [1]}),
+    ])]
+
+    record = Record(problem=SimpleNamespace(**library), cache_dir="./tests/data/.cache-prune")
+
+    conditions = [entry["conditionId"] for entry in record.cache.results_dict.values()]
+
+    assert sorted(set(conditions)) == ["heterogenize", "primary-condition"]
+    assert len(conditions) == 2 * problem["cell_count"]
+
+    record.cache.delete_cache()
@@ -0,0 +1,61 @@
+import os
+import sys
+import shutil
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.ResultsStore import ResultsStore
+from src.benchtop.ResultsIndex import ResultsIndex, query_archive
+
+archive_path = "./tests/data/.results-archive"
+
+def make_results(scale: float) -> dict:
+    time = np.array([0.0, 1800.0, 3600.0, 7200.0])
+    return {
+        f"id{cell}": {
+            "conditionId": "primary-condition",
+            "cell": cell,
+            "LR-complex": {"experiment": None, "simulation": scale * cell * time, "time": time},
+            "blank": {"experiment": None, "simulation": None, "time": time},
+        }
+        for cell in (1, 2)
+    }
+
+def test_query_filters() -> None:
+    """Queries filter by condition, cell, observable and time window"""
+
+    if os.path.exists(archive_path):
+        shutil.rmtree(archive_path, ignore_errors=True)
+
+    store_path = ResultsStore.write(make_results(1.0), os.path.join(archive_path, "exp-a"), name="exp-a")
+
+    index = ResultsIndex(store_path)
+
+    results = index.query(conditionId="primary-condition", cell=2,
+                          observableId="LR-complex", time_range=(0, 3600))
+
+    assert results["time"].tolist() == [0.0, 1800.0, 3600.0], f"Time window not applied: {results}"
+    assert results["simulation"].tolist() == [0.0, 3600.0, 7200.0]
+    assert set(results["cell"]) == {2}
+
+    # null formulas have no values to index
+    assert index.query(observableId="blank").empty
+
+    index.close()
+
+def test_query_archive() -> None:
+    """The same query runs across every experiment in an archive directory"""
+
+    if os.path.exists(archive_path):
+        shutil.rmtree(archive_path, ignore_errors=True)
+
+    ResultsStore.write(make_results(1.0), os.path.join(archive_path, "exp-a"), name="exp-a")
+    ResultsStore.write(make_results(2.0), os.path.join(archive_path, "exp-b"), name="exp-b")
+
+    results = query_archive(archive_path, cell=1, time_range=(7200, 7200))
+
+    assert sorted(results["experiment"]) == ["exp-a", "exp-b"]
+    assert sorted(results["simulation"]) == [7200.0, 14400.0]
+
+    shutil.rmtree(archive_path, ignore_errors=True)
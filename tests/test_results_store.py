@@ -0,0 +1,124 @@
+import os
+import sys
+import shutil
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.ResultsStore import ResultsStore
+
+store_path = "./tests/data/.results-store"
+
+def make_observable_results() -> dict:
+    return {
+        "id1": {
+            "conditionId": "heterogenize",
+            "cell": 1,
+            "blank": {"experiment": np.array(["None"], dtype=object), "simulation": None, "time": np.array([0.0, 30.0])},
+        },
+        "id2": {
+            "conditionId": "primary-condition",
+            "cell": 1,
+            "R_gene_activity": {"experiment": np.array([60.0]), "simulation": np.array([1.0]), "time": np.array([60.0])},
+        },
+        "id3": {
+            "conditionId": "primary-condition",
+            "cell": 2,
+            "R_gene_activity": {"experiment": np.array([60.0]), "simulation": np.array([2.0]), "time": np.array([60.0])},
+        },
+    }
+
+def test_store_roundtrip() -> None:
+    """Observables written to shards are read back per condition, cell and observable"""
+
+    if os.path.exists(store_path):
+        shutil.rmtree(store_path, ignore_errors=True)
+
+    ResultsStore.write(make_observable_results(), store_path, name="test-benchmark")
+
+    store = ResultsStore(store_path)
+
+    assert store.name == "test-benchmark"
+    assert set(store) == {"heterogenize", "primary-condition"}
+    assert sorted(store["primary-condition"]) == [1, 2]
+
+    observable = store["primary-condition"][2]["R_gene_activity"]
+    assert observable["simulation"].tolist() == [2.0], f"Unexpected simulation values {observable}"
+    assert observable["time"].tolist() == [60.0]
+
+    # null formulas are not stored, placeholder measurements become NaN
+    blank = store["heterogenize"][1]["blank"]
+    assert blank["simulation"] is None
+    assert np.isnan(blank["experiment"]).all()
+
+    shutil.rmtree(store_path, ignore_errors=True)
+
+def test_store_trajectories_from_cache() -> None:
+    """Entries without observables are written from their cached trajectories"""
+
+    if os.path.exists(store_path):
+        shutil.rmtree(store_path, ignore_errors=True)
+
+    class DummyCache:
+        def load(self, key):
+            return pd.DataFrame({"time": [0.0, 1.0], "species_A": [1.0, 2.0]})
+
+    index = {"id1": {"conditionId": "heterogenize", "cell": 1, "complete": True}}
+
+    ResultsStore.write(index, store_path, cache=DummyCache())
+
+    entry = ResultsStore(store_path)["heterogenize"][1]
+
+    assert entry.kind == "trajectory"
+    assert entry["species_A"].tolist() == [1.0, 2.0]
+
+    shutil.rmtree(store_path, ignore_errors=True)
+
+def test_store_summary() -> None:
+    """Population statistics are stored per condition and observable"""
+
+    if os.path.exists(store_path):
+        shutil.rmtree(store_path, ignore_errors=True)
+
+    summary = {
+        "primary-condition": {
+            "R_gene_activity": {"time": np.array([60.0]), "mean": np.array([1.5]), "std": np.array([0.5])}
+        },
+        "heterogenize": {},
+    }
+
+    ResultsStore.write(make_observable_results(), store_path, summary=summary)
+
+    stats = ResultsStore(store_path).summary("primary-condition")
+
+    assert stats["R_gene_activity"]["mean"].tolist() == [1.5]
+    assert stats["R_gene_activity"]["std"].tolist() == [0.5]
+
+    shutil.rmtree(store_path, ignore_errors=True)
+
+def test_store_replaces_only_stores() -> None:
+    """Existing stores are replaced, unrelated directories are left untouched"""
+
+    if os.path.exists(store_path):
+        shutil.rmtree(store_path, ignore_errors=True)
+
+    ResultsStore.write(make_observable_results(), store_path, name="first")
+    ResultsStore.write(make_observable_results(), store_path, name="second")
+    assert ResultsStore(store_path).name == "second"
+
+    shutil.rmtree(store_path, ignore_errors=True)
+    os.makedirs(store_path)
+    user_file = os.path.join(store_path, "notes.txt")
+    with open(user_file, "w") as f:
+        f.write("keep me")
+
+    try:
+        ResultsStore.write(make_observable_results(), store_path)
+        raise AssertionError("Writing over a directory that is not a store should fail")
+    except FileExistsError:
+        pass
+
+    assert os.listdir(store_path) == ["notes.txt"]
+
+    shutil.rmtree(store_path, ignore_errors=True)
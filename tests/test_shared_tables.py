@@ -0,0 +1,65 @@
+import os
+import sys
+import pickle
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.SharedTables import ForkShared, TableIndex, forks_share_memory, read_table
+
+measurements_path = "./tests/data/measurements.tsv"
+
+def test_compact_tables() -> None:
+    """ID columns become categoricals, chunked reads match whole reads, tables are read-only"""
+
+    assert os.path.basename(os.getcwd()) == 'Benchtop'
+
+    plain = read_table(measurements_path)
+    compact = read_table(measurements_path, compact_ids=True)
+    chunked = read_table(measurements_path, compact_ids=True, chunksize=1)
+
+    assert isinstance(compact["simulationConditionId"].dtype, pd.CategoricalDtype)
+    assert compact["simulationConditionId"].tolist() == plain["simulationConditionId"].tolist()
+    pd.testing.assert_frame_equal(chunked, compact, check_categorical=False)
+
+    try:
+        compact.loc[0, "time"] = -1
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Compact tables should be read-only")
+
+def test_table_index() -> None:
+    """Row positions are indexed by condition, observable and preequilibration"""
+
+    index = TableIndex(read_table(measurements_path, compact_ids=True))
+
+    assert index.by_condition("primary-condition").tolist() == [1, 2]
+    assert index.by_observable("LR-complex").tolist() == [2, 3]
+    assert index.is_preequilibration("heterogenize")
+    assert not index.is_preequilibration("primary-condition")
+    assert len(index.by_condition("missing")) == 0
+
+class SharedPayload(ForkShared):
+    def __init__(self) -> None:
+        self.values = np.arange(10)
+
+def test_fork_shared_pickling() -> None:
+    """Shared objects pickle as a registry token for forked workers only"""
+
+    payload = SharedPayload()
+    full_size = len(pickle.dumps(payload))
+
+    payload.share()
+    shared = pickle.dumps(payload)
+
+    if forks_share_memory():
+        assert len(shared) < full_size
+        assert pickle.loads(shared) is payload
+
+    payload.release()
+
+    copy = pickle.loads(pickle.dumps(payload))
+    assert copy is not payload
+    assert np.array_equal(copy.values, payload.values)
@@ -0,0 +1,46 @@
+import os
+import sys
+import pickle
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.SimulationResult import SimulationResult, as_result
+
+def test_simulation_result_columns() -> None:
+    """Columns are array views, results restrict and pickle without pandas"""
+
+    result = SimulationResult(
+        values=[[1.0, 10.0], [2.0, 20.0], [3.0, 30.0]],
+        time=[0.0, 30.0, 60.0],
+        columns=["species_A", "species_B"],
+    )
+
+    assert result["species_B"].tolist() == [10.0, 20.0, 30.0]
+    assert result["time"].tolist() == [0.0, 30.0, 60.0]
+    assert "species_A" in result and "species_C" not in result
+    assert result.keys() == ("time", "species_A", "species_B")
+
+    assert result.final_state() == {"species_A": 3.0, "species_B": 30.0}
+    assert result.select(["species_B"]).columns == ("species_B",)
+    assert result.last()["species_A"].tolist() == [3.0]
+
+    copy = pickle.loads(pickle.dumps(result))
+    assert np.array_equal(copy.values, result.values)
+
+    # equal column lists share one interned tuple
+    assert copy.columns is result.columns
+
+def test_simulation_result_from_output() -> None:
+    """Simulator DataFrames lose their own time column to the Worker's timepoints"""
+
+    frame = pd.DataFrame({"time": [0.0, 1.0], "species_A": [1.0, 2.0]})
+
+    result = SimulationResult.from_output(frame, time=[0.0, 30.0])
+
+    assert result.columns == ("species_A",)
+    assert result["time"].tolist() == [0.0, 30.0]
+
+    converted = as_result(frame)
+    assert converted.to_frame().equals(frame)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop import SimulatorRegistry
+from src.benchtop.AbstractSimulator import AbstractSimulator
+
+class DummySimulator(AbstractSimulator):
+    def load(self, *args, **kwargs):
+        return self.tool
+
+    def modify(self, component, value):
+        pass
+
+    def simulate(self, start, stop, step):
+        return None
+
+def test_registry_resolution() -> None:
+    """Names resolve to registered classes, classes pass through unchanged"""
+
+    assert {"tellurium", "sparced", "singlecell"} <= set(SimulatorRegistry.available())
+
+    SimulatorRegistry.register("Dummy", DummySimulator)
+
+    assert SimulatorRegistry.resolve("dummy") is DummySimulator
+    assert SimulatorRegistry.resolve(DummySimulator) is DummySimulator
+
+    try:
+        SimulatorRegistry.resolve("not-a-simulator")
+    except KeyError as e:
+        assert "available simulators" in str(e)
+    else:
+        raise AssertionError("Unknown simulators should raise a KeyError")
+
+def test_registry_is_lazy() -> None:
+    """Import paths are only imported (and validated) when resolved"""
+
+    SimulatorRegistry.register("missing", "benchtop_missing_wrapper_module:Missing")
+    SimulatorRegistry.register("not-simulator", "collections:OrderedDict")
+
+    assert "benchtop_missing_wrapper_module" not in sys.modules
+    assert "missing" in SimulatorRegistry.available()
+
+    try:
+        SimulatorRegistry.resolve("missing")
+    except ImportError:
+        pass
+    else:
+        raise AssertionError("Missing wrapper modules should fail on resolution")
+
+    try:
+        SimulatorRegistry.resolve("not-simulator")
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Classes that are not simulators should be rejected")
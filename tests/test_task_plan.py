@@ -0,0 +1,78 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.TaskPlan import TaskPlan
+
+problem = SimpleNamespace(
+    condition_files=[pd.DataFrame({
+        "conditionId": ["heterogenize", "primary-condition"],
+        "conditionName": ["base values", "some start"],
+        "cyt_prot__LIGAND_": [0, 10],
+        "nuc_gene_a__LIGAND_": [2, 2],
+    })],
+    measurement_files=[pd.DataFrame({
+        "observableId": ["blank", "R_gene_activity", "R_gene_activity"],
+        "preequilibrationConditionId": [None, "heterogenize", "heterogenize"],
+        "simulationConditionId": ["heterogenize", "primary-condition", "primary-condition"],
+        "time": [30, 20, 60],
+    })],
+)
+
+class DummyRecord:
+    problem = problem
+
+    def entry_key(self, condition_id, cell):
+        return f"{condition_id}-{cell}"
+
+    def entry_keys(self, condition_id, cells):
+        return tuple(self.entry_key(condition_id, cell) for cell in cells)
+
+def test_task_plan_compilation() -> None:
+    """Tasks carry overrides, stop time, cache keys and preequilibration keys"""
+
+    plan = TaskPlan(DummyRecord(), ["heterogenize+1-2", None, "primary-condition+1"])
+
+    assert len(plan) == 2
+
+    task = plan["primary-condition+1"]
+    assert task.names == ("cyt_prot__LIGAND_", "nuc_gene_a__LIGAND_")
+    assert task.values == (10, 2)
+    assert task.stop_time == 60.0
+    assert task.keys == ("primary-condition-1",)
+    assert task.precondition_keys == ("heterogenize-1",)
+    assert task.output_times is None
+    assert not task.preequilibration
+
+    chunk = plan["heterogenize+1-2"]
+    assert chunk.cells == (1, 2)
+    assert chunk.precondition_keys == (None, None)
+    assert chunk.preequilibration
+
+    assert [task and task.label for task in plan.tasks([None, "heterogenize+1-2"])] == \
+        [None, "heterogenize+1-2"]
+
+def test_task_plan_output_times() -> None:
+    """Sparse plans list start, measurement, extra and final times"""
+
+    plan = TaskPlan(DummyRecord(), ["primary-condition+1"], start=0.0, output_times=(40, 90))
+
+    assert plan["primary-condition+1"].output_times.tolist() == [0.0, 20.0, 40.0, 60.0]
+
+def test_task_plan_parameter_sets() -> None:
+    """Each cell of a sweep carries the values of its parameter set"""
+
+    sets = pd.DataFrame({"kTL1_1": [1.0, 0.5, 0.0], "kTC1_1": [0.1, 0.2, 0.3]})
+
+    plan = TaskPlan(DummyRecord(), ["heterogenize+1-4", "primary-condition+5-6"],
+                    parameter_sets=sets, replicates=2)
+
+    chunk = plan["heterogenize+1-4"]
+    assert chunk.parameter_names == ("kTL1_1", "kTC1_1")
+    assert chunk.parameter_values == ((1.0, 0.1), (1.0, 0.1), (0.5, 0.2), (0.5, 0.2))
+    assert plan["primary-condition+5-6"].parameter_values == ((0.0, 0.3), (0.0, 0.3))
+
+    assert TaskPlan(DummyRecord(), ["heterogenize+1"])["heterogenize+1"].parameter_values is None
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# Wrappers import the simulator interface from src/benchtop
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src", "benchtop"))
+from wrappers import tellurium_wrapper
+from wrappers.tellurium_wrapper import WrapTellurium
+
+SBML_PATH = os.path.join(os.path.dirname(__file__), "data", "LR-model.xml")
+
+
+def test_model_compiled_once() -> None:
+    """Later instances reuse the compiled model, reset to its origin"""
+
+    with tempfile.TemporaryDirectory() as model_cache_dir:
+        tellurium_wrapper._MODELS.clear()
+
+        first = WrapTellurium(SBML_PATH, model_cache_dir=model_cache_dir)
+        species = first.tool.getFloatingSpeciesIds()[0]
+        initial = first.tool[species]
+        expected = first.simulate(0, 60, 30).values
+
+        first.set_values([species], [initial + 10.0])
+        first.select([species])
+
+        second = WrapTellurium(SBML_PATH, model_cache_dir=model_cache_dir)
+
+        assert second.tool is first.tool
+        assert second.tool[species] == initial
+        assert np.allclose(second.simulate(0, 60, 30).values, expected)
+
+
+def test_compiled_state_cache() -> None:
+    """New processes restore the saved compiled state instead of compiling"""
+
+    with tempfile.TemporaryDirectory() as model_cache_dir:
+        tellurium_wrapper._MODELS.clear()
+
+        compiled = WrapTellurium(SBML_PATH, model_cache_dir=model_cache_dir)
+        expected = compiled.simulate(0, 60, 30).values
+
+        assert [name for name in os.listdir(model_cache_dir) if name.endswith(".rrstate")]
+
+        # as seen by a freshly started worker process
+        tellurium_wrapper._MODELS.clear()
+
+        restored = WrapTellurium(SBML_PATH, model_cache_dir=model_cache_dir)
+
+        assert restored.tool is not compiled.tool
+        assert restored.tool.getIntegrator().getName() == "rk45"
+        assert np.allclose(restored.simulate(0, 60, 30).values, expected)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.benchtop.TimeAlignment import TimeAlignment, nearest_indices
+
+sim_time = np.arange(0, 3630, 30, dtype=float)
+
+def test_nearest_matches_argmin() -> None:
+    """searchsorted alignment picks the same timepoints as the argmin scan"""
+
+    exp_time = np.array([0, 14, 15, 16, 59.9, 1800, 1800, 3600, 5000], dtype=float)
+
+    expected = [np.argmin(np.abs(sim_time - t)) for t in exp_time]
+
+    assert nearest_indices(sim_time, exp_time).tolist() == expected
+
+def test_alignment_methods() -> None:
+    """One alignment reduces stacked (cells x time) trajectories per measurement"""
+
+    exp_time = np.array([15.0, 1800.0, 1800.0])
+    trajectories = np.vstack([sim_time, 2 * sim_time])
+
+    nearest = TimeAlignment(sim_time, exp_time)
+    assert nearest.values(trajectories).tolist() == [[0.0, 1800.0, 1800.0], [0.0, 3600.0, 3600.0]]
+    assert nearest.time().tolist() == [0.0, 1800.0, 1800.0]
+    assert nearest.matches(sim_time) and not nearest.matches(sim_time[:-1])
+
+    # same length and endpoints, different interior points
+    shifted = sim_time.copy()
+    shifted[1] += 5.0
+    assert not nearest.matches(shifted)
+
+    try:
+        nearest_indices(np.array([]), exp_time)
+        raise AssertionError("Empty simulation grids cannot be aligned")
+    except ValueError as e:
+        assert "empty" in str(e)
+
+    linear = TimeAlignment(sim_time, exp_time, method="linear")
+    assert linear.values(trajectories).tolist() == [[15.0, 1800.0, 1800.0], [30.0, 3600.0, 3600.0]]
+    assert linear.time().tolist() == exp_time.tolist()
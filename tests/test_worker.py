@@ -7,6 +7,7 @@ import pandas as pd
 
 sys.path.append(os.path.dirname(__file__))
 from src.benchtop.Worker import Worker
+from src.benchtop.SharedTables import TableIndex
 
 cache_dir = "./tests/data/.cache/"
 if not os.path.exists(cache_dir) or len(os.listdir(cache_dir)) < 13:
@@ -161,6 +162,15 @@ def test_get_simulation_time():
         f"Expected time returned 48, got {time}"
     )
 
+    # Tasks compiled in the Worker look the times up through the measurement index
+    grunt.record.problem.measurement_index = [TableIndex(measurement_df)]
+
+    # a scan of the table itself would no longer find the condition
+    measurement_df["simulationConditionId"] = ["not_id", "renamed"]
+    time = grunt._Worker__get_simulation_time(series)
+
+    assert time == 48, f"Expected indexed time returned 48, got {time}"
+
 def test_model_state_assignment():
     # --- Setup ---
     grunt, _ = make_dummy_worker()
@@ -191,3 +201,82 @@ def test_model_state_assignment():
     print("✅ All 10 model states reassigned without error.")
 
 
+
+def test_reduce_to_observables():
+    """Observable-only mode keeps final states only for preequilibration conditions"""
+    grunt, _ = make_dummy_worker()
+
+    grunt.observable_calculator = MagicMock()
+    grunt.observable_calculator.calculate_dataset = MagicMock(
+        return_value={"good_obs": {"simulation": [3.0]}}
+    )
+
+    results = pd.DataFrame({"time": [0, 30], "good_var1": [1.0, 2.0]})
+
+    # heterogenize is the preequilibration condition of primary-condition
+    parcel = grunt._Worker__reduce_to_observables(results, "heterogenize")
+
+    assert parcel["observables"] == {"good_obs": {"simulation": [3.0]}}
+    assert parcel["state"]["good_var1"].tolist() == [2.0], \
+        f"Expected final state only, got {parcel['state']}"
+
+    parcel = grunt._Worker__reduce_to_observables(results, "primary-condition")
+
+    assert parcel["state"] is None, "Non-dependency conditions should not keep a state"
+
+def test_sparse_output_times():
+    """Sparse runs simulate only at start, measurement, extra and final times"""
+    grunt, dummy_simulator = make_dummy_worker()
+
+    measurement_df = pd.DataFrame({
+        "simulationConditionId": ["heterogenize", "heterogenize", "not_id"],
+        "time": [60, 20, 90]
+    })
+    grunt.record.problem.measurement_files = [measurement_df]
+    grunt.output_times = (40, 500)
+
+    series = pd.Series(
+        data=["heterogenize", "base values"],
+        index=["conditionId", "conditionName"]
+    )
+
+    timepoints = grunt._Worker__get_output_times(series, 0.0, 60.0)
+
+    assert timepoints.tolist() == [0.0, 20.0, 40.0, 60.0], f"Unexpected output times {timepoints}"
+
+    dummy_simulator.simulate_at = MagicMock(
+        return_value=pd.DataFrame({"good_var1": [1.0, 2.0, 3.0, 4.0]})
+    )
+
+    results = grunt._Worker__simulate(0.0, 60.0, 30.0, timepoints)
+
+    assert results["time"].tolist() == [0.0, 20.0, 40.0, 60.0]
+    dummy_simulator.simulate.assert_not_called()
+
+def test_bulk_model_state_assignment():
+    """AbstractSimulator children receive a condition as one set_values call"""
+    from src.benchtop.Worker import AbstractSimulator
+
+    class RecordingSimulator(AbstractSimulator):
+        def load(self, *args, **kwargs):
+            self.calls = []
+        def modify(self, component, value):
+            self.calls.append((component, value))
+        def simulate(self, start, stop, step):
+            pass
+
+    grunt, _ = make_dummy_worker()
+    grunt.simulator = RecordingSimulator()
+
+    bulk_calls = []
+    grunt.simulator.set_values = lambda names, values: bulk_calls.append((names, values))
+
+    grunt._Worker__setModelState(["conditionId", "var_1", "var_2"], ["cond", 1.0, 2.0])
+
+    assert bulk_calls == [(["var_1", "var_2"], [1.0, 2.0])], f"Unexpected bulk calls {bulk_calls}"
+
+    # the default bulk assignment falls back to modify per component
+    simulator = RecordingSimulator()
+    simulator.set_values(["var_1", "var_2"], [1.0, 2.0])
+
+    assert simulator.calls == [("var_1", 1.0), ("var_2", 2.0)]
@@ -21,10 +21,10 @@ import logging
 import importlib.util
 
 import numpy as np
-import pandas as pd
 
 sys.path.append(f'{os.path.dirname(os.path.dirname(__file__))}/src/benchtop/')
 from AbstractSimulator import AbstractSimulator
+from SimulationResult import SimulationResult
 
 logging.basicConfig(
     level=logging.DEBUG, # Overriden if Verbose Arg. True
@@ -67,29 +67,56 @@ class SingleCell(AbstractSimulator):
         for item in args:
             if os.path.exists(item):
                 sbml_list.append(item)
-        print(sbml_list)
+        logger.debug(f"Loading SingleCell models: {sbml_list}")
         self.tool = SC(*sbml_list)
 
-    def simulate(self, start, stop, step) -> pd.DataFrame:
+        # Column names of every simulation of this model
+        self.species_ids = tuple(self.tool.getGlobalSpeciesIds())
+
+    def simulate(self, start, stop, step) -> SimulationResult:
         """Primary simulation function using hybrid stochastic-deterministic method
 
         Parameters:
 
         Returns: 
-            - results_dataframe (pd.DataFrame): finalized results of simulation. 
+            - results (SimulationResult): finalized results of simulation, 
+              viewing the simulator's output buffer without copying it. 
+        """
+
+        results_array = np.asarray(
+            self.tool.simulate(
+                start,
+                stop, 
+                step
+                ),
+            dtype=float
+        )
+
+        time = start + step * np.arange(results_array.shape[0])
+
+        return SimulationResult(results_array, time, self.species_ids)
+
+    def set_values(self, names: list, values: list) -> None:
+        """
+        Bulk SingleCell assignment, values are validated once as an array
         """
+        for name in names:
+            if not isinstance(name, str):
+                raise TypeError(f"Expected component to be str, got {type(name)}: {name}")
 
-        results_array = self.tool.simulate(
-            start,
-            stop, 
-            step
-            )
+        array = np.asarray(values, dtype=float)
 
-        speciesIds = self.tool.getGlobalSpeciesIds()
+        if not np.isfinite(array).all():
+            bad = [name for name, value in zip(names, array) if not np.isfinite(value)]
+            raise ValueError(f"Values for {bad} are NaN or infinite")
 
-        results_df = pd.DataFrame(results_array, columns=speciesIds)
+        for name, value in zip(names, array.tolist()):
+            try:
+                self.tool.modify(name, value)
+            except Exception as e:
+                raise RuntimeError(f"Failed to modify component '{name}' with value {value}") from e
 
-        return results_df
+        logger.debug(f"Modified {len(names)} components")
 
     def modify(
             self, 
@@ -36,6 +36,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Per-process caches shared by every WrapSPARCED instance
+# model directory -> imported AMICI model module
+_MODEL_MODULES = {}
+# (path, size, mtime_ns) -> read-only species initializations
+_SPECIES_INITIALIZATIONS = {}
+# model directory -> (species index, fixed parameter index)
+_COMPONENT_INDICES = {}
+
 
 class WrapSPARCED(AbstractSimulator):
 
@@ -46,6 +54,7 @@ class WrapSPARCED(AbstractSimulator):
         # default path for testing
         self.tool.sbml_file = []
         self.tool.model = []
+        self.tool.component_indices = None
         self.tool.flagD = 1
         # If a nested tuple is passed, unpack it
         for arg in args:
@@ -59,19 +68,10 @@ class WrapSPARCED(AbstractSimulator):
                     logger.debug(f"SBML Model found: {arg}")
 
             if os.path.isdir(arg):
-                model_module = amici.import_model_module("SPARCED", arg)
-                #model_module = importlib.import_module(arg)
-                self.tool.model = model_module.getModel()
-
-                species_sheet = np.array([np.array(line.strip().split("\t")) for line in open('Species.txt', encoding='latin-1')])
-
-                species_initializations = []
-                for row in species_sheet[1:]:
-                    species_initializations.append(float(row[2]))
-                species_initializations = np.array(species_initializations)
-                species_initializations[np.argwhere(species_initializations <= 1e-6)] = 0.0
-
-                self.tool.species_initializations = species_initializations
+                # The module and species sheet are read once per process, models are per instance
+                self.tool.model_dir = os.path.abspath(arg)
+                self.tool.model = _model_module(self.tool.model_dir).getModel()
+                self.tool.species_initializations = _species_initializations('Species.txt')
                 logger.debug(f"AMICI Model found: {arg}")
 
             if type(arg) == int:
@@ -121,6 +121,58 @@ class WrapSPARCED(AbstractSimulator):
 
         return results_df
     
+    def set_values(self, names: list, values: list) -> None:
+        """
+        Assigns several species initializations and fixed parameters at once.
+        Identifier -> index maps are resolved once per model, and the fixed
+        parameter vector is written back in a single call, only if it changed.
+        """
+        species_index, parameter_index = self._component_indices()
+
+        parameters = None
+
+        for name, value in zip(names, values):
+
+            if name in species_index:
+                self.tool.species_initializations[species_index[name]] = value
+
+            elif name in parameter_index:
+                if parameters is None:
+                    parameters = np.array(self.tool.model.getFixedParameters())
+                    current = parameters.copy()
+                parameters[parameter_index[name]] = value
+
+            else:
+                raise ValueError(
+                    f"Component '{name}' not found in model species or parameters.\n"
+                    f"Available species: {list(species_index)[:5]}... ({len(species_index)} total)\n"
+                    f"Available parameters: {list(parameter_index)[:5]}... ({len(parameter_index)} total)"
+                )
+
+        if parameters is not None and not np.array_equal(parameters, current):
+            self.tool.model.setFixedParameters(parameters)
+
+        logger.debug(f"Modified {len(names)} species and parameters")
+
+    def _component_indices(self) -> tuple:
+        """Species and fixed parameter identifier -> index maps, built once per model"""
+
+        if getattr(self.tool, "component_indices", None) is None:
+            model_dir = getattr(self.tool, "model_dir", None)
+
+            indices = _COMPONENT_INDICES.get(model_dir)
+            if indices is None:
+                indices = (
+                    {name: i for i, name in enumerate(self.tool.model.getStateIds())},
+                    {name: i for i, name in enumerate(self.tool.model.getFixedParameterIds())},
+                )
+                if model_dir is not None:
+                    _COMPONENT_INDICES[model_dir] = indices
+
+            self.tool.component_indices = indices
+
+        return self.tool.component_indices
+
     def modify(
             self, 
             component: str, 
@@ -136,32 +188,35 @@ class WrapSPARCED(AbstractSimulator):
         value : int | float
             New value to assign.
         """
-        # Retrieve all identifiers
-        species_ids = self.tool.model.getStateIds()
-        parameter_ids = self.tool.model.getFixedParameterIds()
-
-        # Modify species initializations
-        if component in species_ids:
-            comp_idx = species_ids.index(component)
-            self.tool.species_initializations[comp_idx] = value
-            logger.debug(f"Modified species '{component}' (index {comp_idx}) to {value}")
-            return
-
-        # Modify parameter values
-        elif component in parameter_ids:
-            comp_idx = parameter_ids.index(component)
-            self.tool.model.setFixedParameters(
-                np.array([
-                    value if i == comp_idx else self.tool.model.getFixedParameters()[i]
-                    for i in range(len(parameter_ids))
-                ])
-            )
-            logger.debug(f"Modified parameter '{component}' (index {comp_idx}) to {value}")
-            return
-
-        else:
-            raise ValueError(
-                f"Component '{component}' not found in model species or parameters.\n"
-                f"Available species: {species_ids[:5]}... ({len(species_ids)} total)\n"
-                f"Available parameters: {parameter_ids[:5]}... ({len(parameter_ids)} total)"
+        self.set_values([component], [value])
+
+
+def _model_module(model_dir: str):
+    """Imports the compiled SPARCED AMICI module of a model directory once per process"""
+
+    if model_dir not in _MODEL_MODULES:
+        _MODEL_MODULES[model_dir] = amici.import_model_module("SPARCED", model_dir)
+
+    return _MODEL_MODULES[model_dir]
+
+
+def _species_initializations(species_path: str) -> np.ndarray:
+    """Initial species concentrations (column 3 of the species sheet, values
+    <= 1e-6 set to 0), parsed once per file version; each call returns a copy"""
+
+    stat = os.stat(species_path)
+    key = (os.path.abspath(species_path), stat.st_size, stat.st_mtime_ns)
+
+    if key not in _SPECIES_INITIALIZATIONS:
+        with open(species_path, encoding='latin-1') as f:
+            next(f)  # header
+            initializations = np.array(
+                [float(line.strip().split("\t")[2]) for line in f if line.strip()]
             )
+
+        initializations[initializations <= 1e-6] = 0.0
+        initializations.setflags(write=False)
+
+        _SPECIES_INITIALIZATIONS[key] = initializations
+
+    return _SPECIES_INITIALIZATIONS[key].copy()
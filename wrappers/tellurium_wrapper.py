@@ -14,12 +14,16 @@ Output:
 """
 import os
 import pathlib
+import hashlib
 import logging
+import platform
+import tempfile
 
-import pandas as pd
+import roadrunner
 import tellurium as te
 
 from AbstractSimulator import AbstractSimulator
+from SimulationResult import SimulationResult
 
 logging.basicConfig(
     level=logging.DEBUG, # Overriden if Verbose Arg. True
@@ -27,13 +31,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Serialized compiled models, shared by the worker processes of every experiment.
+# Opt-in: set BENCHTOP_MODEL_CACHE_DIR, e.g. to ~/.cache/benchtop/roadrunner
+MODEL_CACHE_DIR = os.environ.get("BENCHTOP_MODEL_CACHE_DIR")
+
+# SBML digest -> (compiled roadrunner instance, its default time course selections)
+_MODELS = {}
+
+# (path, size, mtime_ns) -> SBML digest
+_DIGESTS = {}
+
 
 class WrapTellurium(AbstractSimulator):
+    """Tellurium (roadrunner) simulator.
+
+    Each SBML model is compiled once per process; later instances reuse the
+    compiled roadrunner instance reset to its origin, so only one instance of a
+    model should be simulated at a time within a process. Compiled states can
+    also be saved to `model_cache_dir` (default: $BENCHTOP_MODEL_CACHE_DIR, or
+    no disk cache), new processes load them instead of compiling the model again.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def load(self, *args, **kwargs):
+    def load(self, *args, model_cache_dir=MODEL_CACHE_DIR, **kwargs):
         # default path for testing
         sbml_path = "LR-model.xml"
         solver = "rk45"
@@ -50,7 +72,7 @@ class WrapTellurium(AbstractSimulator):
             if arg == "gillespie":
                 solver = arg
 
-        self.tool = te.loadSBMLModel(sbml_path)
+        self.tool = _compiled_model(sbml_path, model_cache_dir)
         self.tool.setIntegrator(solver)
         integrator = self.tool.getIntegrator()
         integrator.absolute_tolerance = 1e-8
@@ -58,13 +80,46 @@ class WrapTellurium(AbstractSimulator):
         integrator.maximum_bisect = 10
         integrator.max_steps = 1e6
 
-    def simulate(self, start, stop, step) -> pd.DataFrame:
+    def reset(self) -> None:
+        """Restores the loaded model's initial state, keeping the compiled model"""
+        self.tool.resetToOrigin()
+
+    def set_values(self, names, values) -> None:
+        """Assigns all components in one roadrunner call, skipping unchanged values"""
+        try:
+            changed = [
+                (name, float(value)) for name, value in zip(names, values)
+                if self.tool.getValue(name) != float(value)
+            ]
+
+            if changed:
+                logger.debug(f"Assigning {len(changed)} model state variables")
+                self.tool.setValues([name for name, _ in changed], [value for _, value in changed])
+
+        except (RuntimeError, ValueError) as e:
+            raise ValueError(f"Error in setting parameter values: {e}")
+
+    def select(self, columns) -> None:
+        """Records only the selected species (concentrations) and parameters"""
+        species = set(self.tool.getFloatingSpeciesIds()) | set(self.tool.getBoundarySpeciesIds())
+        parameters = set(self.tool.getGlobalParameterIds())
+
+        selections = ["time"]
+        for col in columns:
+            if col in species:
+                selections.append(f"[{col}]")
+            elif col in parameters:
+                selections.append(col)
+
+        self.tool.timeCourseSelections = selections
+
+    def simulate(self, start, stop, step) -> SimulationResult:
         """Primary simulation function using hybrid stochastic-deterministic method
 
         Parameters:
 
         Returns: 
-            - results_dataframe (pd.DataFrame): finalized results of simulation. 
+            - results (SimulationResult): finalized results of simulation. 
         """
 
         n_points = int(((stop+step) - start) / step)
@@ -75,12 +130,37 @@ class WrapTellurium(AbstractSimulator):
             points=n_points
             )
 
-        # Clean column headers: remove surrounding square brackets
-        column_headers = [col.strip("[]") for col in results_array.colnames]
+        # Column headers are cleaned of their surrounding square brackets
+        return SimulationResult.from_output(results_array, results_array[:, 0])
 
-        results_df = pd.DataFrame(results_array, columns=column_headers)
+    def simulate_at(self, timepoints) -> SimulationResult:
+        """Simulates with output only at the requested timepoints
 
-        return results_df
+        Parameters:
+            - timepoints (np.ndarray): sorted output times, the first is the start time
+
+        Returns: 
+            - results (SimulationResult): one row per requested timepoint. 
+        """
+        integrator = self.tool.getIntegrator()
+
+        # roadrunner's rk45 reports its own steps rather than the requested times
+        if integrator.getName() == "rk45":
+            raise NotImplementedError("rk45 integrator does not support explicit output times")
+
+        # Variable step output (gillespie default) would ignore the requested times
+        variable_step = "variable_step_size" in integrator.getSettings() \
+            and integrator.variable_step_size
+        if variable_step:
+            integrator.variable_step_size = False
+
+        try:
+            results_array = self.tool.simulate(times=[float(t) for t in timepoints])
+        finally:
+            if variable_step:
+                integrator.variable_step_size = True
+
+        return SimulationResult.from_output(results_array, results_array[:, 0])
 
     def modify(
             self, 
@@ -94,4 +174,86 @@ class WrapTellurium(AbstractSimulator):
         try:
             self.tool[component] = float(value)
         except ValueError as e:
-            raise ValueError(f"Error in setting parameter value: {e}")
\ No newline at end of file
+            raise ValueError(f"Error in setting parameter value: {e}")
+
+
+def _compiled_model(sbml_path: str, model_cache_dir=MODEL_CACHE_DIR):
+    """Returns the process's compiled instance of an SBML model, reset to its origin"""
+
+    digest = _sbml_digest(sbml_path)
+
+    if digest in _MODELS:
+        model, selections = _MODELS[digest]
+        model.resetToOrigin()
+        model.timeCourseSelections = selections
+        return model
+
+    state_path = None
+    if model_cache_dir is not None:
+        state_path = os.path.join(model_cache_dir, f"{digest}.rrstate")
+
+    model = _load_state(state_path)
+
+    if model is None:
+        logger.debug(f"Compiling {sbml_path}")
+        model = te.loadSBMLModel(sbml_path)
+        _save_state(model, state_path)
+
+    _MODELS[digest] = (model, list(model.timeCourseSelections))
+
+    return model
+
+
+def _sbml_digest(sbml_path: str) -> str:
+    """Hash of the SBML contents, roadrunner version and machine the model is compiled for"""
+
+    stat = os.stat(sbml_path)
+    file_key = (os.path.abspath(sbml_path), stat.st_size, stat.st_mtime_ns)
+
+    if file_key not in _DIGESTS:
+        digest = hashlib.sha256(f"{roadrunner.__version__}\0{platform.machine()}\0".encode())
+        digest.update(pathlib.Path(sbml_path).read_bytes())
+        _DIGESTS[file_key] = digest.hexdigest()
+
+    return _DIGESTS[file_key]
+
+
+def _load_state(state_path):
+    """Compiled model restored from a saved roadrunner state, None if unavailable"""
+
+    if state_path is None or not os.path.exists(state_path):
+        return None
+
+    try:
+        model = te.roadrunner.ExtendedRoadRunner()
+        model.loadStateS(pathlib.Path(state_path).read_bytes())
+
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable roadrunner state {state_path}: {e}")
+        return None
+
+    logger.debug(f"Loaded compiled model {state_path}")
+
+    return model
+
+
+def _save_state(model, state_path) -> None:
+    """Writes the compiled model's state atomically; failures only cost a later compile"""
+
+    if state_path is None:
+        return
+
+    try:
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+        # Concurrent workers may save the same model, the last rename wins
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(state_path), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(model.saveStateS())
+
+        os.replace(tmp_path, state_path)
+
+    except (OSError, RuntimeError) as e:
+        if 'tmp_path' in locals() and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        logger.warning(f"Could not save roadrunner state {state_path}: {e}")